@@ -1,6 +1,7 @@
 from datetime import datetime
 
 from ..items.feature import Feature
+from ..db.asyncFeatureConfigDao import AsyncFeatureConfigDao
 from ..db.featureConfigDao import FeatureConfigDao
 
 
@@ -16,8 +17,19 @@ def configure_feature(feature: Feature, dao: FeatureConfigDao) -> Feature:
     Returns:
         The configured Feature object
     """
+    return dao.create_feature(_stamped(feature))
+
+
+async def configure_feature_async(
+    feature: Feature, dao: AsyncFeatureConfigDao
+) -> Feature:
+    """Async variant of configure_feature."""
+    return await dao.create_feature(_stamped(feature))
+
+
+def _stamped(feature: Feature) -> Feature:
     if feature.timestamp is None:
         feature = feature.model_copy(
             update={"timestamp": datetime.now()}
         )
-    return dao.create_feature(feature)
+    return feature
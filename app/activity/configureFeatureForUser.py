@@ -1,5 +1,6 @@
 from datetime import datetime
 
+from ..db.asyncFeatureConfigDao import AsyncFeatureConfigDao
 from ..db.featureConfigDao import FeatureConfigDao
 from ..items.featureOverride import FeatureOverride
 
@@ -26,9 +27,24 @@ def configure_feature_for_user(
     """
     if dao.get_feature(feature_name) is None:
         raise ValueError("Feature not found")
+    return dao.create_override(feature_name, _stamped(override))
+
+
+async def configure_feature_for_user_async(
+    feature_name: str,
+    override: FeatureOverride,
+    dao: AsyncFeatureConfigDao,
+) -> FeatureOverride:
+    """Async variant of configure_feature_for_user."""
+    if await dao.get_feature(feature_name) is None:
+        raise ValueError("Feature not found")
+    return await dao.create_override(feature_name, _stamped(override))
+
+
+def _stamped(override: FeatureOverride) -> FeatureOverride:
     if override.timestamp is None:
         # Set timestamp to now if not provided
         override = override.model_copy(
             update={"timestamp": datetime.now()}
         )
-    return dao.create_override(feature_name, override)
+    return override
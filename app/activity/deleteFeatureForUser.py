@@ -1,3 +1,4 @@
+from ..db.asyncFeatureConfigDao import AsyncFeatureConfigDao
 from ..db.featureConfigDao import FeatureConfigDao
 from ..items.featureOverride import FeatureOverride
 
@@ -30,3 +31,20 @@ def delete_feature_for_user(
             f"Override for feature {feature_name} and user {user_id} not found"
         )
     return deleted
+
+
+async def delete_feature_for_user_async(
+    feature_name: str,
+    user_id: str,
+    dao: AsyncFeatureConfigDao,
+) -> FeatureOverride:
+    """Async variant of delete_feature_for_user."""
+    if await dao.get_feature(feature_name) is None:
+        raise ValueError(f"Feature {feature_name} not found")
+
+    deleted = await dao.delete_override(feature_name, user_id)
+    if deleted is None:
+        raise ValueError(
+            f"Override for feature {feature_name} and user {user_id} not found"
+        )
+    return deleted
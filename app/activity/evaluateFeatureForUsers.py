@@ -0,0 +1,98 @@
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Iterable,
+    Iterator,
+    List,
+    Sequence,
+    Tuple,
+)
+
+from ..db.asyncFeatureConfigDao import AsyncFeatureConfigDao
+from ..db.featureConfigDao import FeatureConfigDao
+from ..items.feature import Feature
+
+# (user_id, value, isDefault)
+Evaluation = Tuple[str, str, bool]
+
+
+def evaluate_feature_for_users(
+    feature_name: str,
+    user_id_batches: Iterable[Sequence[str]],
+    dao: FeatureConfigDao,
+) -> Iterator[List[Evaluation]]:
+    """
+    Retrieve one feature's value for a stream of users.
+
+    The feature is looked up once, up front, and each batch of user IDs
+    takes one bulk override lookup, so memory stays bounded by the
+    batch size however many users are streamed through.
+
+    Args:
+        feature_name: The name of the feature
+        user_id_batches: Batches of user IDs, consumed lazily
+        dao: FeatureConfigDao instance for accessing the feature
+
+    Returns:
+        An iterator of one list of evaluations per batch
+
+    Raises:
+        ValueError: If the feature is not found
+    """
+    feature = dao.get_feature(feature_name)
+    if feature is None:
+        raise ValueError(f"Feature {feature_name} not found")
+
+    def evaluate() -> Iterator[List[Evaluation]]:
+        for user_ids in user_id_batches:
+            overrides = dao.get_overrides_for_users(feature_name, user_ids)
+            yield _resolve_batch(user_ids, overrides, feature)
+
+    return evaluate()
+
+
+async def evaluate_feature_for_users_async(
+    feature_name: str,
+    user_id_batches: AsyncIterable[Sequence[str]],
+    dao: AsyncFeatureConfigDao,
+) -> AsyncIterator[List[Evaluation]]:
+    """Async variant of evaluate_feature_for_users."""
+    feature = await dao.get_feature(feature_name)
+    if feature is None:
+        raise ValueError(f"Feature {feature_name} not found")
+
+    async def evaluate() -> AsyncIterator[List[Evaluation]]:
+        async for user_ids in user_id_batches:
+            overrides = await dao.get_overrides_for_users(
+                feature_name, user_ids
+            )
+            yield _resolve_batch(user_ids, overrides, feature)
+
+    return evaluate()
+
+
+def _resolve_batch(
+    user_ids: Sequence[str], overrides: dict, feature: Feature
+) -> List[Evaluation]:
+    # same rule as resolve_feature_for_user: an override wins, then the
+    # rollout variant, otherwise the feature's default value applies
+    default = feature.value
+    rollout = feature.rollout
+    results = []
+    for user_id in user_ids:
+        override = overrides[user_id]
+        if override is not None:
+            # a stored isDefault is reported as is; None means False
+            results.append(
+                (user_id, override.value, bool(override.isDefault))
+            )
+            continue
+        variant = (
+            None if rollout is None
+            else rollout.value_for(feature.feature_name, user_id)
+        )
+        if variant is None:
+            results.append((user_id, default, True))
+        else:
+            results.append((user_id, variant, False))
+    return results
@@ -0,0 +1,67 @@
+from typing import Dict, Optional, Sequence
+
+from ..db.asyncFeatureConfigDao import AsyncFeatureConfigDao
+from ..db.featureConfigDao import FeatureConfigDao
+from ..items.feature import Feature
+from ..items.featureOverride import FeatureOverride
+from .getFeatureForUser import resolve_feature_for_user
+
+
+def evaluate_features(
+    feature_names: Sequence[str],
+    user_id: str,
+    dao: FeatureConfigDao,
+) -> Dict[str, Optional[FeatureOverride]]:
+    """
+    Retrieve the values of several features for one user.
+
+    Looks up the user's overrides in one DAO call, then the features
+    of those without one in another, and resolves each name as
+    get_feature_for_user would.
+
+    Args:
+        feature_names: The names of the features
+        user_id: The user ID
+        dao: FeatureConfigDao instance for accessing the features
+
+    Returns:
+        Each distinct name mapped, in request order, to its
+        FeatureOverride, or None if the feature is not found
+    """
+    names = list(dict.fromkeys(feature_names))
+    overrides = dao.get_overrides_for_user(names, user_id)
+    features = dao.get_features(
+        [name for name in names if overrides[name] is None]
+    )
+    return _resolve_all(names, user_id, overrides, features)
+
+
+async def evaluate_features_async(
+    feature_names: Sequence[str],
+    user_id: str,
+    dao: AsyncFeatureConfigDao,
+) -> Dict[str, Optional[FeatureOverride]]:
+    """Async variant of evaluate_features."""
+    names = list(dict.fromkeys(feature_names))
+    overrides = await dao.get_overrides_for_user(names, user_id)
+    features = await dao.get_features(
+        [name for name in names if overrides[name] is None]
+    )
+    return _resolve_all(names, user_id, overrides, features)
+
+
+def _resolve_all(
+    names: Sequence[str],
+    user_id: str,
+    overrides: Dict[str, Optional[FeatureOverride]],
+    features: Dict[str, Optional[Feature]],
+) -> Dict[str, Optional[FeatureOverride]]:
+    results = {}
+    for name in names:
+        try:
+            results[name] = resolve_feature_for_user(
+                name, user_id, overrides[name], features.get(name)
+            )
+        except ValueError:
+            results[name] = None
+    return results
@@ -0,0 +1,70 @@
+from typing import AsyncIterator, Iterator, List, Union
+
+from ..db.asyncFeatureConfigDao import AsyncFeatureConfigDao
+from ..db.featureConfigDao import FeatureConfigDao
+from ..items.feature import Feature
+from ..items.featureOverride import FeatureOverride
+
+ExportItem = Union[Feature, FeatureOverride]
+
+
+def export_store(
+    dao: FeatureConfigDao, page_size: int = 1000
+) -> Iterator[List[ExportItem]]:
+    """
+    Walk every feature and its overrides, one DAO page at a time.
+
+    Features come in name order, each followed by its overrides in user
+    ID order. Pages are read lazily as the iterator is consumed, so
+    memory stays bounded by page_size. The walk is not a point-in-time
+    snapshot: writes made during it show up if they land ahead of it.
+
+    Args:
+        dao: FeatureConfigDao instance for accessing the store
+        page_size: How many items to read per DAO call
+
+    Returns:
+        An iterator of lists of features and overrides
+    """
+    after = None
+    while True:
+        features = dao.list_features(after, page_size)
+        for feature in features:
+            yield [feature]
+            user_after = None
+            while True:
+                overrides = dao.list_overrides(
+                    feature.feature_name, user_after, page_size
+                )
+                if overrides:
+                    yield overrides
+                if len(overrides) < page_size:
+                    break
+                user_after = overrides[-1].user_id
+        if len(features) < page_size:
+            return
+        after = features[-1].feature_name
+
+
+async def export_store_async(
+    dao: AsyncFeatureConfigDao, page_size: int = 1000
+) -> AsyncIterator[List[ExportItem]]:
+    """Async variant of export_store."""
+    after = None
+    while True:
+        features = await dao.list_features(after, page_size)
+        for feature in features:
+            yield [feature]
+            user_after = None
+            while True:
+                overrides = await dao.list_overrides(
+                    feature.feature_name, user_after, page_size
+                )
+                if overrides:
+                    yield overrides
+                if len(overrides) < page_size:
+                    break
+                user_after = overrides[-1].user_id
+        if len(features) < page_size:
+            return
+        after = features[-1].feature_name
@@ -0,0 +1,156 @@
+from typing import (
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from ..db.asyncFeatureConfigDao import AsyncFeatureConfigDao
+from ..db.changeLog import Change, ChangeLog
+from ..db.featureConfigDao import FeatureConfigDao
+from ..items.feature import Feature
+from ..items.featureOverride import FeatureOverride
+
+
+class ChangeSet(NamedTuple):
+    # the version to ask for changes since next
+    version: int
+    # current value of each changed feature, None if it is gone
+    features: Dict[str, Optional[Feature]]
+    # feature -> user ID -> current override, None if deleted
+    overrides: Dict[str, Dict[str, Optional[FeatureOverride]]]
+    # features whose overrides must all be reloaded
+    reload: List[str]
+
+
+def get_changes(
+    since: int,
+    change_log: ChangeLog,
+    dao: FeatureConfigDao,
+    log_id: Optional[str] = None,
+) -> ChangeSet:
+    """
+    Collect what changed after a version, with each change's value.
+
+    Several writes to one feature or override collapse into one change
+    carrying its current value, so a client applying the set to its
+    copy does O(changes) work and ends up current as of the version.
+
+    Args:
+        since: The version the client is current as of
+        change_log: ChangeLog following the DAO's writes
+        dao: FeatureConfigDao instance for reading current values
+        log_id: The log the client's version came from, if known
+
+    Returns:
+        The ChangeSet
+
+    Raises:
+        ResyncRequired: If the log no longer covers since
+    """
+    version, changes = change_log.since(since, log_id)
+    features, overrides, reload = _collapse(changes)
+    return ChangeSet(
+        version,
+        dao.get_features(features) if features else {},
+        {
+            feature_name: dao.get_overrides_for_users(feature_name, users)
+            for feature_name, users in overrides.items()
+        },
+        reload,
+    )
+
+
+async def get_changes_async(
+    since: int,
+    change_log: ChangeLog,
+    dao: AsyncFeatureConfigDao,
+    log_id: Optional[str] = None,
+    wait_seconds: float = 0,
+) -> ChangeSet:
+    """
+    Async variant of get_changes.
+
+    With wait_seconds set, a long poll: when nothing changed after since
+    it waits that long for a change before answering.
+    """
+    if wait_seconds > 0 and since == change_log.version:
+        await change_log.wait(since, wait_seconds)
+    version, changes = change_log.since(since, log_id)
+    features, overrides, reload = _collapse(changes)
+    return ChangeSet(
+        version,
+        await dao.get_features(features) if features else {},
+        {
+            feature_name: await dao.get_overrides_for_users(
+                feature_name, users
+            )
+            for feature_name, users in overrides.items()
+        },
+        reload,
+    )
+
+
+async def watch_changes_async(
+    since: Optional[int],
+    change_log: ChangeLog,
+    dao: AsyncFeatureConfigDao,
+    log_id: Optional[str] = None,
+    heartbeat_seconds: float = 15,
+) -> AsyncIterator[Optional[ChangeSet]]:
+    """
+    Yield a ChangeSet for every batch of writes, as they happen.
+
+    Starts with the changes after since, or an empty set at the current
+    version if since is None. Writes landing while a set is read are
+    batched into the next one. None is yielded after heartbeat_seconds
+    without a write.
+
+    Raises:
+        ResyncRequired: If the log no longer covers the client's version,
+            either at the start or after falling behind
+    """
+    if since is None:
+        since = change_log.version
+    changes = await get_changes_async(since, change_log, dao, log_id)
+    yield changes
+    while True:
+        version = await change_log.wait(changes.version, heartbeat_seconds)
+        if version == changes.version:
+            yield None
+            continue
+        changes = await get_changes_async(changes.version, change_log, dao)
+        yield changes
+
+
+def _collapse(
+    changes: Iterable[Change],
+) -> Tuple[List[str], Dict[str, List[str]], List[str]]:
+    """Reduce changes to the features and overrides to look up."""
+    features: Set[str] = set()
+    overrides: Dict[str, Set[str]] = {}
+    reload: Set[str] = set()
+    for change in changes:
+        if change.whole_feature:
+            reload.add(change.feature_name)
+            features.add(change.feature_name)
+        elif change.user_id is None:
+            features.add(change.feature_name)
+        else:
+            overrides.setdefault(change.feature_name, set()).add(
+                change.user_id
+            )
+    return (
+        sorted(features),
+        {
+            feature_name: sorted(users)
+            for feature_name, users in overrides.items()
+            # covered by reloading all of them
+            if feature_name not in reload
+        },
+        sorted(reload),
+    )
@@ -1,3 +1,4 @@
+from ..db.asyncFeatureConfigDao import AsyncFeatureConfigDao
 from ..db.featureConfigDao import FeatureConfigDao
 from ..items.feature import Feature
 
@@ -20,3 +21,13 @@ def get_feature(feature_name: str, dao: FeatureConfigDao) -> Feature:
     if feature is None:
         raise ValueError("Feature not found")
     return feature
+
+
+async def get_feature_async(
+    feature_name: str, dao: AsyncFeatureConfigDao
+) -> Feature:
+    """Async variant of get_feature."""
+    feature = await dao.get_feature(feature_name)
+    if feature is None:
+        raise ValueError("Feature not found")
+    return feature
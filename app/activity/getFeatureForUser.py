@@ -1,4 +1,8 @@
+from typing import Optional
+
+from ..db.asyncFeatureConfigDao import AsyncFeatureConfigDao
 from ..db.featureConfigDao import FeatureConfigDao
+from ..items.feature import Feature
 from ..items.featureOverride import FeatureOverride
 
 
@@ -22,17 +26,62 @@ def get_feature_for_user(
         ValueError: If the feature is not found
     """
     override = dao.get_override(feature_name, user_id)
+    feat = None
     if override is None:
         # check if the feature exists at all
         feat = dao.get_feature(feature_name)
+    return resolve_feature_for_user(feature_name, user_id, override, feat)
+
+
+async def get_feature_for_user_async(
+    feature_name: str,
+    user_id: str,
+    dao: AsyncFeatureConfigDao,
+) -> FeatureOverride:
+    """Async variant of get_feature_for_user."""
+    override = await dao.get_override(feature_name, user_id)
+    feat = None
+    if override is None:
+        feat = await dao.get_feature(feature_name)
+    return resolve_feature_for_user(feature_name, user_id, override, feat)
+
+
+def resolve_feature_for_user(
+    feature_name: str,
+    user_id: str,
+    override: Optional[FeatureOverride],
+    feat: Optional[Feature],
+) -> FeatureOverride:
+    """
+    Decide a user's value from their override and the feature.
+
+    An override wins; without one, a user the feature's rollout reaches
+    gets its variant, and everyone else the feature's value, the only
+    case reported as isDefault.
+
+    Args:
+        feature_name: The name of the feature
+        user_id: The user ID
+        override: The user's override, if any
+        feat: The feature; only consulted when there is no override
+
+    Returns:
+        The FeatureOverride object
+
+    Raises:
+        ValueError: If there is no override and the feature is not found
+    """
+    if override is None:
         if feat is None:
             raise ValueError(f"Feature {feature_name} not found")
-        # we use the feature's default value instead
+        # the rollout variant the user hashes into, if any, otherwise
+        # the feature's default value
+        variant = feat.rollout_value(user_id)
         override = FeatureOverride(
             feature_name=feature_name,
             user_id=user_id,
-            value=feat.value,
-            isDefault=True,
+            value=feat.value if variant is None else variant,
+            isDefault=variant is None,
         )
     else:
         if override.isDefault is None:
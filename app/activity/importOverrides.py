@@ -0,0 +1,93 @@
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from ..db.asyncFeatureConfigDao import AsyncFeatureConfigDao
+from ..db.featureConfigDao import FeatureConfigDao
+from ..items.featureOverride import FeatureOverride
+from ..items.overrideChange import OverrideChange
+
+
+def import_overrides(
+    feature_name: str,
+    changes: Iterable[OverrideChange],
+    dao: FeatureConfigDao,
+) -> Tuple[int, int]:
+    """
+    Set or delete many users' overrides of a feature in one write.
+
+    The changes are gathered into one batch in memory before it is
+    applied, so callers bound how many they pass.
+
+    Args:
+        feature_name: The name of the feature to override
+        changes: Validated changes; a later change to the same user
+                 replaces an earlier one
+        dao: FeatureConfigDao instance for persisting the overrides
+
+    Returns:
+        How many overrides were written and how many deleted
+
+    Raises:
+        ValueError: If the feature does not exist
+    """
+    if dao.get_feature(feature_name) is None:
+        raise ValueError("Feature not found")
+    return apply_overrides(feature_name, changes, dao)
+
+
+async def import_overrides_async(
+    feature_name: str,
+    changes: Iterable[OverrideChange],
+    dao: AsyncFeatureConfigDao,
+) -> Tuple[int, int]:
+    """Async variant of import_overrides."""
+    if await dao.get_feature(feature_name) is None:
+        raise ValueError("Feature not found")
+    return await apply_overrides_async(feature_name, changes, dao)
+
+
+def apply_overrides(
+    feature_name: str,
+    changes: Iterable[OverrideChange],
+    dao: FeatureConfigDao,
+) -> Tuple[int, int]:
+    """
+    import_overrides for a feature the caller has already found.
+
+    Features are never deleted, so one check, e.g. made before reading
+    a long request body, still holds when the batch is written.
+    """
+    return dao.bulk_write_overrides(
+        feature_name, _overrides(feature_name, changes)
+    )
+
+
+async def apply_overrides_async(
+    feature_name: str,
+    changes: Iterable[OverrideChange],
+    dao: AsyncFeatureConfigDao,
+) -> Tuple[int, int]:
+    """Async variant of apply_overrides."""
+    return await dao.bulk_write_overrides(
+        feature_name, _overrides(feature_name, changes)
+    )
+
+
+def _overrides(
+    feature_name: str, changes: Iterable[OverrideChange]
+) -> Dict[str, Optional[FeatureOverride]]:
+    # the whole batch is stamped with one time
+    now = datetime.now()
+    overrides = {}
+    for change in changes:
+        overrides[change.user_id] = None if change.delete else (
+            FeatureOverride.model_construct(
+                feature_name=feature_name,
+                user_id=change.user_id,
+                value=change.value,
+                justification=change.justification,
+                isDefault=None,
+                timestamp=change.timestamp or now,
+            )
+        )
+    return overrides
@@ -0,0 +1,122 @@
+import base64
+import binascii
+from typing import Generic, List, NamedTuple, Optional, TypeVar
+
+from ..db.asyncFeatureConfigDao import AsyncFeatureConfigDao
+from ..db.featureConfigDao import FeatureConfigDao
+from ..items.feature import Feature
+from ..items.featureOverride import FeatureOverride
+
+T = TypeVar("T")
+
+
+class InvalidCursor(ValueError):
+    """Raised for a cursor that no listing handed out."""
+
+
+class Page(NamedTuple, Generic[T]):
+    """One page of a listing and the cursor to the next, if any."""
+
+    items: List[T]
+    next_cursor: Optional[str]
+
+
+def encode_cursor(key: str) -> str:
+    """Make the opaque cursor that resumes a listing after key."""
+    return base64.urlsafe_b64encode(key.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[str]:
+    """
+    Return the key a cursor resumes after, or None to start over.
+
+    Raises:
+        InvalidCursor: If the cursor was not made by encode_cursor
+    """
+    if cursor is None:
+        return None
+    try:
+        key = base64.b64decode(cursor, altchars=b"-_", validate=True)
+        return key.decode("utf-8")
+    except (binascii.Error, ValueError):
+        raise InvalidCursor("Invalid cursor")
+
+
+def list_features(
+    cursor: Optional[str], limit: int, dao: FeatureConfigDao
+) -> Page[Feature]:
+    """
+    List features in name order, one page at a time.
+
+    Args:
+        cursor: next_cursor of the previous page, or None for the first
+        limit: Most features to return
+        dao: FeatureConfigDao instance for accessing the features
+
+    Returns:
+        The page, whose next_cursor is None on the last one
+
+    Raises:
+        InvalidCursor: If the cursor is invalid
+    """
+    # one extra tells whether another page follows
+    features = dao.list_features(decode_cursor(cursor), limit + 1)
+    return _page(features, limit, lambda f: f.feature_name)
+
+
+async def list_features_async(
+    cursor: Optional[str], limit: int, dao: AsyncFeatureConfigDao
+) -> Page[Feature]:
+    """Async variant of list_features."""
+    features = await dao.list_features(decode_cursor(cursor), limit + 1)
+    return _page(features, limit, lambda f: f.feature_name)
+
+
+def list_overrides(
+    feature_name: str,
+    cursor: Optional[str],
+    limit: int,
+    dao: FeatureConfigDao,
+) -> Page[FeatureOverride]:
+    """
+    List a feature's overrides in user ID order, one page at a time.
+
+    Args:
+        feature_name: The name of the feature
+        cursor: next_cursor of the previous page, or None for the first
+        limit: Most overrides to return
+        dao: FeatureConfigDao instance for accessing the overrides
+
+    Returns:
+        The page, whose next_cursor is None on the last one
+
+    Raises:
+        InvalidCursor: If the cursor is invalid
+        ValueError: If the feature is not found
+    """
+    after = decode_cursor(cursor)
+    if dao.get_feature(feature_name) is None:
+        raise ValueError(f"Feature {feature_name} not found")
+    overrides = dao.list_overrides(feature_name, after, limit + 1)
+    return _page(overrides, limit, lambda o: o.user_id)
+
+
+async def list_overrides_async(
+    feature_name: str,
+    cursor: Optional[str],
+    limit: int,
+    dao: AsyncFeatureConfigDao,
+) -> Page[FeatureOverride]:
+    """Async variant of list_overrides."""
+    after = decode_cursor(cursor)
+    if await dao.get_feature(feature_name) is None:
+        raise ValueError(f"Feature {feature_name} not found")
+    overrides = await dao.list_overrides(feature_name, after, limit + 1)
+    return _page(overrides, limit, lambda o: o.user_id)
+
+
+def _page(items: list, limit: int, key) -> Page:
+    if len(items) <= limit:
+        return Page(items, None)
+    items = items[:limit]
+    return Page(items, encode_cursor(key(items[-1])))
@@ -0,0 +1,131 @@
+import asyncio
+from concurrent.futures import Executor
+from functools import partial
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .asyncFeatureConfigDao import AsyncFeatureConfigDao
+from .featureConfigDao import FeatureConfigDao
+from ..items.feature import Feature
+from ..items.featureOverride import FeatureOverride
+
+
+class AsyncDaoAdapter(AsyncFeatureConfigDao):
+    """
+    Exposes a synchronous FeatureConfigDao as an AsyncFeatureConfigDao.
+
+    Calls that the wrapped DAO reports as non-blocking (through
+    blocking_reads and blocking_writes) run inline on the event loop;
+    the rest run on executor, or the loop's default executor when None.
+    """
+
+    def __init__(
+        self,
+        dao: FeatureConfigDao,
+        executor: Optional[Executor] = None,
+    ):
+        self.dao = dao
+        self.executor = executor
+
+    async def create_feature(self, feature: Feature) -> Feature:
+        return await self._write(self.dao.create_feature, feature)
+
+    async def get_feature(self, feature_name: str) -> Optional[Feature]:
+        return await self._read(self.dao.get_feature, feature_name)
+
+    async def create_override(
+        self,
+        feature_name: str,
+        override: FeatureOverride,
+    ) -> FeatureOverride:
+        return await self._write(
+            self.dao.create_override, feature_name, override
+        )
+
+    async def get_override(
+        self,
+        feature_name: str,
+        user_id: str,
+    ) -> Optional[FeatureOverride]:
+        return await self._read(
+            self.dao.get_override, feature_name, user_id
+        )
+
+    async def delete_override(
+        self,
+        feature_name: str,
+        user_id: str,
+    ) -> Optional[FeatureOverride]:
+        return await self._write(
+            self.dao.delete_override, feature_name, user_id
+        )
+
+    async def list_features(
+        self, after: Optional[str] = None, limit: int = 100
+    ) -> List[Feature]:
+        return await self._read(self.dao.list_features, after, limit)
+
+    async def list_overrides(
+        self,
+        feature_name: str,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[FeatureOverride]:
+        return await self._read(
+            self.dao.list_overrides, feature_name, after, limit
+        )
+
+    async def bulk_write_overrides(
+        self,
+        feature_name: str,
+        changes: Mapping[str, Optional[FeatureOverride]],
+    ) -> Tuple[int, int]:
+        return await self._write(
+            self.dao.bulk_write_overrides, feature_name, changes
+        )
+
+    async def get_features(
+        self, feature_names: Sequence[str]
+    ) -> Dict[str, Optional[Feature]]:
+        return await self._read(self.dao.get_features, feature_names)
+
+    async def get_overrides_for_user(
+        self, feature_names: Sequence[str], user_id: str
+    ) -> Dict[str, Optional[FeatureOverride]]:
+        return await self._read(
+            self.dao.get_overrides_for_user, feature_names, user_id
+        )
+
+    async def get_overrides_for_users(
+        self, feature_name: str, user_ids: Sequence[str]
+    ) -> Dict[str, Optional[FeatureOverride]]:
+        return await self._read(
+            self.dao.get_overrides_for_users, feature_name, user_ids
+        )
+
+    async def close(self) -> None:
+        await self._run(self.dao.close)
+
+    def stats(self) -> dict:
+        return self.dao.stats()
+
+    async def _read(self, method, *args):
+        if self.dao.blocking_reads:
+            return await self._run(method, *args)
+        return method(*args)
+
+    async def _write(self, method, *args):
+        if self.dao.blocking_writes:
+            return await self._run(method, *args)
+        return method(*args)
+
+    async def _run(self, method, *args):
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, partial(method, *args)
+        )
+
+
+def as_async_dao(dao) -> AsyncFeatureConfigDao:
+    """Return dao itself if it is already async, else an adapter for it."""
+    if isinstance(dao, AsyncFeatureConfigDao):
+        return dao
+    return AsyncDaoAdapter(dao)
@@ -0,0 +1,111 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+from ..items.feature import Feature
+from ..items.featureOverride import FeatureOverride
+
+
+class AsyncFeatureConfigDao(ABC):
+    """
+    Abstract Data Access Object for feature configurations, for use from
+    an event loop.
+
+    Implementations must not block the loop: work that really waits on
+    disk or a database belongs on an executor.
+    """
+
+    @abstractmethod
+    async def create_feature(self, feature: Feature) -> Feature:
+        """Create or update a global feature flag."""
+        pass
+
+    @abstractmethod
+    async def get_feature(self, feature_name: str) -> Optional[Feature]:
+        """Get a feature by name."""
+        pass
+
+    @abstractmethod
+    async def create_override(
+        self, feature_name: str, override: FeatureOverride
+    ) -> FeatureOverride:
+        """Create a user-specific override."""
+        pass
+
+    @abstractmethod
+    async def get_override(
+        self, feature_name: str, user_id: str
+    ) -> Optional[FeatureOverride]:
+        """Get an override for a specific user."""
+        pass
+
+    @abstractmethod
+    async def delete_override(
+        self, feature_name: str, user_id: str
+    ) -> Optional[FeatureOverride]:
+        """Delete a user-specific override."""
+        pass
+
+    @abstractmethod
+    async def list_features(
+        self, after: Optional[str] = None, limit: int = 100
+    ) -> List[Feature]:
+        """List up to limit features in name order, starting after a name."""
+        pass
+
+    @abstractmethod
+    async def list_overrides(
+        self,
+        feature_name: str,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[FeatureOverride]:
+        """List up to limit overrides of a feature in user ID order."""
+        pass
+
+    async def bulk_write_overrides(
+        self,
+        feature_name: str,
+        changes: Mapping[str, Optional[FeatureOverride]],
+    ) -> Tuple[int, int]:
+        """Set (or, for None, delete) many users' overrides of a feature."""
+        written = deleted = 0
+        for user_id, override in changes.items():
+            if override is not None:
+                await self.create_override(feature_name, override)
+                written += 1
+            elif await self.delete_override(feature_name, user_id):
+                deleted += 1
+        return written, deleted
+
+    async def get_features(
+        self, feature_names: Sequence[str]
+    ) -> Dict[str, Optional[Feature]]:
+        """Get several features by name, None for those not found."""
+        return {
+            name: await self.get_feature(name) for name in feature_names
+        }
+
+    async def get_overrides_for_user(
+        self, feature_names: Sequence[str], user_id: str
+    ) -> Dict[str, Optional[FeatureOverride]]:
+        """Get one user's overrides of several features, None if absent."""
+        return {
+            name: await self.get_override(name, user_id)
+            for name in feature_names
+        }
+
+    async def get_overrides_for_users(
+        self, feature_name: str, user_ids: Sequence[str]
+    ) -> Dict[str, Optional[FeatureOverride]]:
+        """Get several users' overrides of one feature, None if absent."""
+        return {
+            user_id: await self.get_override(feature_name, user_id)
+            for user_id in user_ids
+        }
+
+    async def close(self) -> None:
+        """Flush pending writes and release resources."""
+        pass
+
+    def stats(self) -> dict:
+        """Report implementation-specific runtime statistics."""
+        return {}
@@ -0,0 +1,423 @@
+"""
+Compact binary snapshot format, opened with mmap and decoded lazily.
+
+Layout (little-endian):
+
+    header          magic, version, counts and section offsets
+    override blocks one contiguous block per feature; each record is a
+                    u32 length followed by the fixed fields and the
+                    UTF-8 user id
+    string blob     UTF-8 bytes of every interned string (names, values,
+                    descriptions, justifications, rollouts as JSON)
+    string index    u64 offset of each string, plus one end offset
+    group index     one fixed-size entry per feature: its Feature fields
+                    (if the feature exists) and where its overrides live
+
+Version 1 files, whose group entries have no rollout, are still read.
+Features are decoded on open; each feature's overrides are decoded on
+first access. Convert to and from the JSON format with:
+
+    python -m app.db.binarySnapshot to-binary features.json features.bin
+    python -m app.db.binarySnapshot to-json features.bin features.json
+"""
+import argparse
+import logging
+import mmap
+import os
+import struct
+from array import array
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from .featurePersistence import (
+    FeatureState,
+    JsonSnapshotPersistence,
+    LazyOverrideGroup,
+    read_json_snapshot,
+    save_json_snapshot,
+)
+from ..items.feature import Feature
+from ..items.featureOverride import FeatureOverride
+from ..items.rollout import Rollout
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"FFSNAP01"
+VERSION = 2
+NO_STRING = 0xFFFFFFFF
+
+# magic, version, group_count, string_count, reserved,
+# strings_off, string_index_off, group_index_off
+HEADER = struct.Struct("<8sIIIIQQQ")
+# name, value, description, flags, timestamp, utc offset,
+# records_off, records_len, record_count, rollout
+GROUP = struct.Struct("<IIIBqiQQII")
+# the same without rollout
+GROUP_V1 = struct.Struct("<IIIBqiQQI")
+RECORD_LENGTH = struct.Struct("<I")
+# feature name, value, justification, flags, timestamp, utc offset
+# (the user id follows)
+OVERRIDE = struct.Struct("<IIIBqi")
+
+HAS_FEATURE = 1
+HAS_TIMESTAMP = 2
+HAS_UTC_OFFSET = 4
+HAS_IS_DEFAULT = 8
+IS_DEFAULT = 16
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def _encode_timestamp(value: Optional[datetime]) -> Tuple[int, int, int]:
+    """Return (flags, microseconds since epoch, utc offset seconds)."""
+    if value is None:
+        return 0, 0, 0
+    offset = value.utcoffset()
+    micros = (value.replace(tzinfo=None) - EPOCH) // MICROSECOND
+    if offset is None:
+        return HAS_TIMESTAMP, micros, 0
+    return (
+        HAS_TIMESTAMP | HAS_UTC_OFFSET,
+        micros,
+        int(offset.total_seconds()),
+    )
+
+
+def _decode_timestamp(
+    flags: int, micros: int, offset: int
+) -> Optional[datetime]:
+    if not flags & HAS_TIMESTAMP:
+        return None
+    value = EPOCH + timedelta(microseconds=micros)
+    if flags & HAS_UTC_OFFSET:
+        value = value.replace(tzinfo=timezone(timedelta(seconds=offset)))
+    return value
+
+
+class BinarySnapshotReader:
+    """Read-only view over a binary snapshot held in a buffer."""
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        (
+            magic,
+            version,
+            self.group_count,
+            self.string_count,
+            _,
+            _,
+            string_index_off,
+            self._group_index_off,
+        ) = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version not in (1, VERSION):
+            raise ValueError("Not a binary feature snapshot")
+        self._group = GROUP if version == VERSION else GROUP_V1
+        self._string_offsets = array("Q")
+        self._string_offsets.frombytes(
+            buffer[
+                string_index_off:
+                string_index_off + 8 * (self.string_count + 1)
+            ]
+        )
+        self._strings: Dict[int, str] = {}
+
+    @classmethod
+    def open(cls, path: str) -> "BinarySnapshotReader":
+        """Memory-map a snapshot file."""
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def string(self, sid: int) -> Optional[str]:
+        if sid == NO_STRING:
+            return None
+        value = self._strings.get(sid)
+        if value is None:
+            offsets = self._string_offsets
+            value = self._strings[sid] = str(
+                self._buffer[offsets[sid]:offsets[sid + 1]], "utf-8"
+            )
+        return value
+
+    def groups(
+        self,
+    ) -> Iterator[Tuple[str, Optional[Feature], int, int, int]]:
+        """Yield (name, feature, records_off, records_len, record_count)."""
+        string = self.string
+        group = self._group
+        for i in range(self.group_count):
+            (
+                name_sid,
+                value_sid,
+                description_sid,
+                flags,
+                micros,
+                offset,
+                records_off,
+                records_len,
+                count,
+                *rollout_sid,
+            ) = group.unpack_from(
+                self._buffer, self._group_index_off + i * group.size
+            )
+            name = string(name_sid)
+            feature = None
+            if flags & HAS_FEATURE:
+                rollout = string(rollout_sid[0]) if rollout_sid else None
+                feature = Feature.model_construct(
+                    feature_name=name,
+                    value=string(value_sid),
+                    feature_description=string(description_sid),
+                    timestamp=_decode_timestamp(flags, micros, offset),
+                    rollout=(
+                        None if rollout is None
+                        else Rollout.model_validate_json(rollout)
+                    ),
+                )
+            yield name, feature, records_off, records_len, count
+
+    def overrides(
+        self, records_off: int, records_len: int
+    ) -> Dict[str, FeatureOverride]:
+        """Decode one feature's block of override records."""
+        buffer = self._buffer
+        string = self.string
+        unpack_length = RECORD_LENGTH.unpack_from
+        unpack_override = OVERRIDE.unpack_from
+        construct = FeatureOverride.model_construct
+        fixed = RECORD_LENGTH.size + OVERRIDE.size
+        result = {}
+        pos = records_off
+        end = records_off + records_len
+        while pos < end:
+            (length,) = unpack_length(buffer, pos)
+            (
+                name_sid,
+                value_sid,
+                justification_sid,
+                flags,
+                micros,
+                offset,
+            ) = unpack_override(buffer, pos + RECORD_LENGTH.size)
+            user_id = str(
+                buffer[pos + fixed:pos + RECORD_LENGTH.size + length],
+                "utf-8",
+            )
+            result[user_id] = construct(
+                feature_name=string(name_sid),
+                user_id=user_id,
+                value=string(value_sid),
+                justification=string(justification_sid),
+                isDefault=(
+                    bool(flags & IS_DEFAULT)
+                    if flags & HAS_IS_DEFAULT
+                    else None
+                ),
+                timestamp=_decode_timestamp(flags, micros, offset),
+            )
+            pos += RECORD_LENGTH.size + length
+        return result
+
+    def state(self) -> FeatureState:
+        """Decode features now and each feature's overrides on demand."""
+        features = {}
+        overrides = {}
+        for name, feature, records_off, records_len, count in self.groups():
+            if feature is not None:
+                features[name] = feature
+            if count:
+                overrides[name] = LazyOverrideGroup(
+                    partial(self.overrides, records_off, records_len),
+                    count,
+                )
+        return FeatureState(features, overrides)
+
+
+def encode_binary_snapshot(
+    groups: Iterable[
+        Tuple[str, Optional[Feature], Iterable[FeatureOverride]]
+    ],
+    out,
+) -> None:
+    """
+    Stream a binary snapshot to a seekable binary file object.
+
+    Args:
+        groups: (feature_name, feature or None, overrides) per feature
+        out: File object positioned at the start of an empty file
+    """
+    strings: Dict[str, int] = {}
+
+    def sid(value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        return index
+
+    pack_length = RECORD_LENGTH.pack
+    pack_override = OVERRIDE.pack
+    out.write(bytes(HEADER.size))
+    entries = []
+    for name, feature, overrides in groups:
+        records_off = out.tell()
+        count = 0
+        chunk = bytearray()
+        for override in overrides:
+            flags, micros, offset = _encode_timestamp(override.timestamp)
+            if override.isDefault is not None:
+                flags |= HAS_IS_DEFAULT
+                if override.isDefault:
+                    flags |= IS_DEFAULT
+            user_id = override.user_id.encode("utf-8")
+            chunk += pack_length(OVERRIDE.size + len(user_id))
+            chunk += pack_override(
+                sid(override.feature_name),
+                sid(override.value),
+                sid(override.justification),
+                flags,
+                micros,
+                offset,
+            )
+            chunk += user_id
+            count += 1
+            if len(chunk) >= 1 << 20:
+                out.write(chunk)
+                chunk.clear()
+        out.write(chunk)
+        records_len = out.tell() - records_off
+        if feature is None:
+            flags, micros, offset = 0, 0, 0
+            value_sid = description_sid = rollout_sid = NO_STRING
+        else:
+            flags, micros, offset = _encode_timestamp(feature.timestamp)
+            flags |= HAS_FEATURE
+            value_sid = sid(feature.value)
+            description_sid = sid(feature.feature_description)
+            rollout_sid = sid(
+                None if feature.rollout is None
+                else feature.rollout.model_dump_json()
+            )
+        entries.append(
+            GROUP.pack(
+                sid(name),
+                value_sid,
+                description_sid,
+                flags,
+                micros,
+                offset,
+                records_off,
+                records_len,
+                count,
+                rollout_sid,
+            )
+        )
+
+    strings_off = out.tell()
+    offsets = array("Q")
+    position = strings_off
+    for value in strings:
+        encoded = value.encode("utf-8")
+        offsets.append(position)
+        out.write(encoded)
+        position += len(encoded)
+    offsets.append(position)
+    string_index_off = position + (-position % 8)
+    out.write(bytes(string_index_off - position))
+    out.write(offsets.tobytes())
+    group_index_off = out.tell()
+    for entry in entries:
+        out.write(entry)
+    out.seek(0)
+    out.write(
+        HEADER.pack(
+            MAGIC,
+            VERSION,
+            len(entries),
+            len(strings),
+            0,
+            strings_off,
+            string_index_off,
+            group_index_off,
+        )
+    )
+
+
+def _state_groups(state: FeatureState):
+    for name in sorted(state.features.keys() | state.overrides.keys()):
+        group = state.overrides.get(name)
+        yield (
+            name,
+            state.features.get(name),
+            group.values() if group is not None else (),
+        )
+
+
+def save_binary_snapshot(path: str, state: FeatureState) -> None:
+    """Write a binary snapshot file atomically (temp file + rename)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        encode_binary_snapshot(_state_groups(state), f)
+    os.replace(tmp_path, path)
+
+
+def load_binary_snapshot(path: str) -> FeatureState:
+    """
+    Memory-map a binary snapshot file.
+
+    A missing or corrupted file yields an empty state so the service can
+    always start.
+    """
+    try:
+        state = BinarySnapshotReader.open(path).state()
+        logger.info("Loaded binary snapshot from file: %s", path)
+        return state
+    except FileNotFoundError:
+        logger.debug(
+            "Snapshot file not found at %s - starting fresh",
+            path,
+        )
+    except (ValueError, struct.error):
+        logger.warning(
+            "Snapshot file at %s is corrupted or empty - "
+            "discarding and starting fresh",
+            path,
+        )
+    return FeatureState({}, {})
+
+
+class BinarySnapshotPersistence(JsonSnapshotPersistence):
+    """Rewrites a binary snapshot file on every mutation."""
+
+    load_snapshot = staticmethod(load_binary_snapshot)
+    save_snapshot = staticmethod(save_binary_snapshot)
+
+    def __init__(self, cache_file: str = "/tmp/features.bin"):
+        super().__init__(cache_file)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Convert feature snapshots between JSON and binary."
+    )
+    parser.add_argument("direction", choices=("to-binary", "to-json"))
+    parser.add_argument("source")
+    parser.add_argument("destination")
+    args = parser.parse_args(argv)
+    # unlike the service, which starts empty from a bad snapshot, refuse
+    # to write one: it could replace a good destination with nothing
+    try:
+        if args.direction == "to-binary":
+            state = read_json_snapshot(args.source)
+            save_binary_snapshot(args.destination, state)
+        else:
+            state = BinarySnapshotReader.open(args.source).state()
+            save_json_snapshot(args.destination, state)
+    except (OSError, ValueError, struct.error) as e:
+        parser.exit(1, f"Cannot convert {args.source}: {e}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,70 +1,181 @@
-from time import time
 import logging
-from typing import Optional, Dict
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import (
+    Callable, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple,
+)
 
 from .featureConfigDao import FeatureConfigDao
-from .inMemoryFeatureConfigDao import InMemoryFeatureConfigDao
+from .invalidationBus import InvalidationBus, InvalidationHandler
+from .sharedCache import SharedCache
+from .sieveCache import MISSING, SieveCache
 from ..items.feature import Feature
 from ..items.featureOverride import FeatureOverride
 
 logger = logging.getLogger(__name__)
 
+# Cached in place of a feature or override the base DAO does not have
+_ABSENT = object()
+
+# Rough per-entry cost of the cache's own bookkeeping, in bytes
+ENTRY_OVERHEAD = 200
+
+
+class _Flight:
+    """One in-progress base DAO lookup that concurrent misses share."""
+
+    __slots__ = ("seen", "generation", "value", "error", "done")
+
+    def __init__(self, seen: int, generation: int):
+        self.seen = seen
+        self.generation = generation
+        self.value = None
+        self.error: Optional[BaseException] = None
+        self.done = threading.Event()
+
+
+def _ratio(part: int, whole: int) -> float:
+    return part / whole if whole else 0.0
+
+
+def estimate_entry_size(key: Hashable, value) -> int:
+    """Approximate the memory a cached feature or override holds."""
+    size = ENTRY_OVERHEAD + sys.getsizeof(key)
+    if isinstance(key, tuple):
+        size += sum(sys.getsizeof(part) for part in key)
+    if value is not _ABSENT:
+        for field in value.__dict__.values():
+            size += sys.getsizeof(field)
+    return size
+
 
 class CachedFeatureConfigDao(FeatureConfigDao):
     """
-    A caching wrapper around InMemoryFeatureConfigDao with TTL support.
+    A caching wrapper around any FeatureConfigDao with TTL support.
 
     Caches feature and override lookups to improve performance.
     Cache entries automatically expire after the configured TTL.
     Write operations invalidate related cache entries.
+
+    Features (keyed by name) and overrides (keyed by (feature, user))
+    share one SieveCache bounded by max_entries and, if set, max_bytes.
+    Reads take no lock. A fill that raced with a write is discarded
+    rather than caching the pre-write value.
+
+    Lookups that find nothing are cached too, for negative_ttl_seconds,
+    since most users have no override; writes evict them like any other
+    entry. Setting negative_ttl_seconds to 0 disables them.
+
+    Concurrent misses on one key share a single base DAO lookup. With
+    stale_while_revalidate_seconds set, an entry that expired less than
+    that long ago is still served while one background lookup refreshes
+    it, so a hot key's expiry never stalls requests.
+
+    Every entry is tagged with its feature's generation, and a lookup
+    only hits entries of the current one, so invalidate_feature() drops
+    a feature and all its cached overrides, present or absent, in O(1).
+
+    When processes share the base store, an invalidation_bus carries each
+    write's invalidation to the other processes' caches, so the TTL only
+    bounds staleness if an invalidation is lost.
+
+    A shared_cache adds a second tier behind this one that every process
+    on the host reads through: misses look there before the base DAO,
+    fills populate both tiers, and writes invalidate both. This cache
+    can then stay small while cold workers warm from their peers.
     """
 
     def __init__(
         self,
-        base_dao: InMemoryFeatureConfigDao,
+        base_dao: FeatureConfigDao,
         ttl_seconds: int = 300,
+        invalidation_bus: Optional[InvalidationBus] = None,
+        max_entries: int = 100_000,
+        max_bytes: Optional[int] = None,
+        negative_ttl_seconds: float = 30,
+        stale_while_revalidate_seconds: float = 0,
+        shared_cache: Optional[SharedCache] = None,
     ):
         self.base_dao = base_dao
+        self.shared_cache = shared_cache
         self.ttl = ttl_seconds
-        self.feature_cache: Dict[str, Feature] = {}
-        self.feature_cache_times: Dict[str, float] = {}
-        self.override_cache: Dict[tuple, FeatureOverride] = {}
-        self.override_cache_times: Dict[tuple, float] = {}
+        self.negative_ttl = negative_ttl_seconds
+        self.stale_ttl = stale_while_revalidate_seconds
+        self.invalidation_bus = invalidation_bus
+        self.cache = SieveCache(
+            max_entries,
+            max_bytes,
+            estimate_entry_size if max_bytes is not None else None,
+        )
+        # Approximate: counted without a lock
+        self.positive_hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.coalesced = 0
+        self.shared_hits = 0
+        self.shared_misses = 0
+        # Bumped after every write reaches the base DAO
+        self._invalidations = 0
+        self._invalidation_lock = threading.Lock()
+        # Per-feature generation; features never invalidated are at 0
+        self._generations: Dict[str, int] = {}
+        self._listeners: List[InvalidationHandler] = []
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._flights_lock = threading.Lock()
+        self._refresher: Optional[ThreadPoolExecutor] = None
+        if stale_while_revalidate_seconds > 0:
+            self._refresher = ThreadPoolExecutor(
+                max_workers=2, thread_name_prefix="cache-refresh"
+            )
+        if invalidation_bus is not None:
+            invalidation_bus.start(self._apply_remote_invalidation)
         logger.info(
             "Initialized CachedFeatureConfigDao with TTL=%d seconds",
             ttl_seconds,
         )
 
+    @property
+    def blocking_reads(self) -> bool:
+        return self.shared_cache is not None or self.base_dao.blocking_reads
+
+    @property
+    def blocking_writes(self) -> bool:
+        return self.base_dao.blocking_writes
+
     def create_feature(self, feature: Feature) -> Feature:
         """Create feature and invalidate cache."""
         created = self.base_dao.create_feature(feature)
+        self._invalidate_shared(feature.feature_name)
         self._invalidate_feature_cache(feature.feature_name)
+        self._broadcast(feature.feature_name)
         return created
 
     def get_feature(self, feature_name: str) -> Optional[Feature]:
         """Get feature from cache or base DAO."""
-        if self._is_feature_cache_valid(feature_name):
+        generation = self._generations.get(feature_name, 0)
+        cached = self.cache.get(feature_name, tag=generation)
+        if cached is not MISSING:
             logger.debug(
                 "Cache hit for feature: %s",
                 feature_name,
             )
-            return self.feature_cache.get(feature_name)
+            return self._hit(cached)
 
         logger.debug(
             "Cache miss for feature: %s - fetching from DAO",
             feature_name,
         )
-        feature = self.base_dao.get_feature(feature_name)
-        if feature:
-            self.feature_cache[feature_name] = feature
-            self.feature_cache_times[feature_name] = time()
-            logger.debug(
-                "Feature cached: %s",
+        return self._miss(
+            feature_name,
+            generation,
+            self._loader(
+                partial(self.base_dao.get_feature, feature_name),
                 feature_name,
-            )
-        else:
-            self._invalidate_feature_cache(feature_name)
-        return feature
+            ),
+        )
 
     def create_override(
         self,
@@ -73,7 +184,9 @@ class CachedFeatureConfigDao(FeatureConfigDao):
     ) -> FeatureOverride:
         """Create override and invalidate cache."""
         created = self.base_dao.create_override(feature_name, override)
+        self._invalidate_shared(feature_name, override.user_id)
         self._invalidate_override_cache(feature_name, override.user_id)
+        self._broadcast(feature_name, override.user_id)
         return created
 
     def get_override(
@@ -83,60 +196,394 @@ class CachedFeatureConfigDao(FeatureConfigDao):
     ) -> Optional[FeatureOverride]:
         """Get override from cache or base DAO."""
         cache_key = (feature_name, user_id)
-        if self._is_override_cache_valid(cache_key):
+        generation = self._generations.get(feature_name, 0)
+        cached = self.cache.get(cache_key, tag=generation)
+        if cached is not MISSING:
             logger.debug(
                 "Cache hit for override: %s user %s",
                 feature_name,
                 user_id,
             )
-            return self.override_cache.get(cache_key)
+            return self._hit(cached)
 
         logger.debug(
             "Cache miss for override: %s user %s - fetching from DAO",
             feature_name,
             user_id,
         )
-        override = self.base_dao.get_override(feature_name, user_id)
-        if override:
-            self.override_cache[cache_key] = override
-            self.override_cache_times[cache_key] = time()
-            logger.debug(
-                "Override cached: %s user %s",
+        return self._miss(
+            cache_key,
+            generation,
+            self._loader(
+                partial(self.base_dao.get_override, feature_name, user_id),
                 feature_name,
                 user_id,
-            )
-        else:
-            self._invalidate_override_cache(feature_name, user_id)
-        return override
+            ),
+        )
 
     def delete_override(
         self,
         feature_name: str,
         user_id: str,
     ) -> Optional[FeatureOverride]:
-        """Delete override and invalidate cache."""
+        """Delete override and invalidate cache, if there was one."""
         deleted = self.base_dao.delete_override(feature_name, user_id)
+        if deleted is None:
+            # nothing changed, so nothing to invalidate or announce
+            return None
+        self._invalidate_shared(feature_name, user_id)
         self._invalidate_override_cache(feature_name, user_id)
+        self._broadcast(feature_name, user_id)
         return deleted
 
-    def _is_feature_cache_valid(self, feature_name: str) -> bool:
-        """Check if feature cache entry is still valid."""
-        if feature_name not in self.feature_cache_times:
-            return False
-        return (time() - self.feature_cache_times[feature_name]) < self.ttl
+    def list_features(
+        self, after: Optional[str] = None, limit: int = 100
+    ) -> List[Feature]:
+        """List features straight from the base DAO."""
+        return self.base_dao.list_features(after, limit)
+
+    def list_overrides(
+        self,
+        feature_name: str,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[FeatureOverride]:
+        """List overrides straight from the base DAO."""
+        return self.base_dao.list_overrides(feature_name, after, limit)
+
+    def bulk_write_overrides(
+        self,
+        feature_name: str,
+        changes: Mapping[str, Optional[FeatureOverride]],
+    ) -> Tuple[int, int]:
+        """Apply the batch, then invalidate the feature once for all of it."""
+        counts = self.base_dao.bulk_write_overrides(feature_name, changes)
+        if counts != (0, 0):
+            self.invalidate_feature(feature_name)
+        return counts
+
+    def get_features(
+        self, feature_names: Sequence[str]
+    ) -> Dict[str, Optional[Feature]]:
+        """Get features from cache, loading the misses in one call."""
+        return self._get_many(
+            feature_names,
+            lambda name: name,
+            self.base_dao.get_features,
+            self.base_dao.get_feature,
+        )
+
+    def get_overrides_for_user(
+        self, feature_names: Sequence[str], user_id: str
+    ) -> Dict[str, Optional[FeatureOverride]]:
+        """Get a user's overrides from cache, loading misses in one call."""
+        return self._get_many(
+            feature_names,
+            lambda name: (name, user_id),
+            partial(self.base_dao.get_overrides_for_user, user_id=user_id),
+            partial(self.base_dao.get_override, user_id=user_id),
+            user_id,
+        )
+
+    def get_overrides_for_users(
+        self, feature_name: str, user_ids: Sequence[str]
+    ) -> Dict[str, Optional[FeatureOverride]]:
+        """
+        Get many users' overrides straight from the base DAO.
+
+        Meant for bulk scans over many users, each read once, which
+        would only evict the working set if they went through the cache.
+        """
+        return self.base_dao.get_overrides_for_users(feature_name, user_ids)
+
+    def invalidate_feature(self, feature_name: str) -> None:
+        """
+        Drop a feature and every cached override of it, here and on peers.
+
+        Moves the feature to a new generation instead of scanning the
+        cache; the old entries are reclaimed by eviction.
+        """
+        self._invalidate_shared(feature_name, whole_feature=True)
+        self._invalidate_whole_feature(feature_name)
+        self._broadcast(feature_name, whole_feature=True)
+
+    def add_invalidation_listener(
+        self, listener: InvalidationHandler
+    ) -> None:
+        """
+        Call listener with every invalidation this cache applies.
+
+        Covers local writes and those received from peers, so caches
+        derived from this one can follow it.
+        """
+        self._listeners.append(listener)
+
+    def close(self) -> None:
+        """Leave the invalidation bus and close the base DAO."""
+        if self._refresher is not None:
+            self._refresher.shutdown()
+        if self.invalidation_bus is not None:
+            self.invalidation_bus.close()
+        if self.shared_cache is not None:
+            self.shared_cache.close()
+        self.base_dao.close()
+
+    def stats(self) -> dict:
+        """Report each cache tier's, the base DAO's and the bus's stats."""
+        cache = self.cache.stats()
+        hits = self.positive_hits + self.negative_hits + self.stale_hits
+        cache.update(
+            positive_hits=self.positive_hits,
+            negative_hits=self.negative_hits,
+            stale_hits=self.stale_hits,
+            misses=self.misses,
+            coalesced=self.coalesced,
+            hit_ratio=_ratio(hits, hits + self.misses + self.coalesced),
+        )
+        stats = {"base": self.base_dao.stats(), "cache": cache}
+        if self.shared_cache is not None:
+            shared = self.shared_cache.stats()
+            shared.update(
+                hits=self.shared_hits,
+                misses=self.shared_misses,
+                hit_ratio=_ratio(
+                    self.shared_hits, self.shared_hits + self.shared_misses
+                ),
+            )
+            stats["shared_cache"] = shared
+        if self.invalidation_bus is not None:
+            stats["invalidation_bus"] = self.invalidation_bus.stats()
+        return stats
+
+    def _loader(
+        self,
+        load: Callable[[], object],
+        feature_name: str,
+        user_id: Optional[str] = None,
+    ) -> Callable[[], object]:
+        """Wrap a base DAO lookup to read through the shared tier"""
+        if self.shared_cache is None:
+            return load
+        return partial(self._load_shared, load, feature_name, user_id)
+
+    def _load_shared(
+        self,
+        load: Callable[[], object],
+        feature_name: str,
+        user_id: Optional[str],
+    ):
+        shared = self.shared_cache
+        value = shared.get(feature_name, user_id)
+        if value is not MISSING:
+            self.shared_hits += 1
+            return value
+        self.shared_misses += 1
+        generation = shared.generation(feature_name)
+        value = load()
+        if value is not None:
+            shared.put(feature_name, user_id, value, self.ttl, generation)
+        elif self.negative_ttl > 0:
+            shared.put(
+                feature_name, user_id, None, self.negative_ttl, generation
+            )
+        return value
+
+    def _get_many(
+        self,
+        feature_names: Sequence[str],
+        key_of: Callable[[str], Hashable],
+        load_many: Callable[[Sequence[str]], Dict[str, object]],
+        load_one: Callable[[str], object],
+        user_id: Optional[str] = None,
+    ) -> dict:
+        """
+        Look up each name's key, loading every miss in one base call.
+
+        Misses skip single-flight and stale-while-revalidate, which
+        would split the batch back into single lookups. With a shared
+        tier, misses read it key by key before the base DAO.
+        """
+        found = {}
+        missing = []
+        for name in feature_names:
+            cached = self.cache.get(
+                key_of(name), tag=self._generations.get(name, 0)
+            )
+            if cached is MISSING:
+                missing.append(name)
+            else:
+                found[name] = self._hit(cached)
+        if missing:
+            self.misses += len(missing)
+            seen = self._invalidations
+            generations = {
+                name: self._generations.get(name, 0) for name in missing
+            }
+            if self.shared_cache is None:
+                loaded = load_many(missing)
+            else:
+                loaded = {
+                    name: self._load_shared(
+                        partial(load_one, name), name, user_id
+                    )
+                    for name in missing
+                }
+            for name in missing:
+                self._fill(key_of(name), loaded[name], seen, generations[name])
+            found.update(loaded)
+        return {name: found[name] for name in feature_names}
+
+    def _hit(self, cached):
+        if cached is _ABSENT:
+            self.negative_hits += 1
+            return None
+        self.positive_hits += 1
+        return cached
+
+    def _miss(
+        self, key: Hashable, generation: int, load: Callable[[], object]
+    ):
+        """Serve a stale entry while refreshing it, or load it now"""
+        if self.stale_ttl > 0:
+            stale = self.cache.get_stale(
+                key, self.stale_ttl, tag=generation
+            )
+            if stale is not MISSING:
+                self.stale_hits += 1
+                flight, leader = self._join(key, generation)
+                if leader:
+                    self._refresher.submit(self._refresh, key, load, flight)
+                return None if stale is _ABSENT else stale
+        flight, leader = self._join(key, generation)
+        if not leader:
+            self.coalesced += 1
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        return self._lead(key, load, flight)
+
+    def _join(self, key: Hashable, generation: int):
+        """
+        Return (the lookup running for key, whether the caller leads it).
+
+        A miss joins the lookup already running for its key unless a
+        write has landed since that lookup began, since its result may
+        predate the write.
+        """
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            if flight is not None and flight.seen == self._invalidations:
+                return flight, False
+            flight = self._flights[key] = _Flight(
+                self._invalidations, generation
+            )
+            return flight, True
+
+    def _lead(
+        self, key: Hashable, load: Callable[[], object], flight: _Flight
+    ):
+        """Read key from the base DAO, cache it and wake any followers"""
+        self.misses += 1
+        try:
+            flight.value = load()
+            self._fill(key, flight.value, flight.seen, flight.generation)
+            logger.debug("Cached %s", key)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._flights_lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.done.set()
+
+    def _refresh(
+        self, key: Hashable, load: Callable[[], object], flight: _Flight
+    ) -> None:
+        try:
+            self._lead(key, load, flight)
+        except Exception as e:
+            logger.error("Error refreshing %s: %s", key, e)
+
+    def _fill(
+        self, key: Hashable, value, seen: int, generation: int
+    ) -> None:
+        """
+        Cache a value read from the base DAO, or its absence if None.
+
+        seen is the invalidation count observed before the read. If a
+        write landed since, the value may predate it, so it is dropped;
+        checking again after storing closes the window where a write
+        lands between the check and the store.
+        """
+        if value is None:
+            if self.negative_ttl <= 0:
+                return
+            value, ttl = _ABSENT, self.negative_ttl
+        else:
+            ttl = self.ttl
+        if self._invalidations != seen:
+            return
+        self.cache.put(key, value, ttl, tag=generation)
+        if self._invalidations != seen:
+            self.cache.pop(key)
+
+    def _broadcast(
+        self,
+        feature_name: str,
+        user_id: Optional[str] = None,
+        whole_feature: bool = False,
+    ) -> None:
+        if self.invalidation_bus is not None:
+            self.invalidation_bus.publish(
+                feature_name, user_id, whole_feature
+            )
+
+    def _apply_remote_invalidation(
+        self,
+        feature_name: str,
+        user_id: Optional[str],
+        whole_feature: bool,
+    ) -> None:
+        """Drop entries another process's write made stale."""
+        if whole_feature:
+            self._invalidate_whole_feature(feature_name)
+        elif user_id is None:
+            self._invalidate_feature_cache(feature_name)
+        else:
+            self._invalidate_override_cache(feature_name, user_id)
+
+    def _invalidate_shared(
+        self,
+        feature_name: str,
+        user_id: Optional[str] = None,
+        whole_feature: bool = False,
+    ) -> None:
+        # peers share the tier, so only the writing process clears it
+        if self.shared_cache is not None:
+            self.shared_cache.invalidate(
+                feature_name, user_id, whole_feature
+            )
 
-    def _is_override_cache_valid(self, cache_key: tuple) -> bool:
-        """Check if override cache entry is still valid."""
-        if cache_key not in self.override_cache_times:
-            return False
-        return (
-            time() - self.override_cache_times[cache_key]
-        ) < self.ttl
+    def _bump_invalidations(self) -> None:
+        with self._invalidation_lock:
+            self._invalidations += 1
+
+    def _invalidate_whole_feature(self, feature_name: str) -> None:
+        with self._invalidation_lock:
+            self._invalidations += 1
+            self._generations[feature_name] = (
+                self._generations.get(feature_name, 0) + 1
+            )
+        self._notify(feature_name, None, True)
 
     def _invalidate_feature_cache(self, feature_name: str) -> None:
         """Remove feature from cache."""
-        self.feature_cache.pop(feature_name, None)
-        self.feature_cache_times.pop(feature_name, None)
+        self._bump_invalidations()
+        self.cache.pop(feature_name)
+        self._notify(feature_name, None, False)
 
     def _invalidate_override_cache(
         self,
@@ -144,6 +591,18 @@ class CachedFeatureConfigDao(FeatureConfigDao):
         user_id: str,
     ) -> None:
         """Remove override from cache."""
-        cache_key = (feature_name, user_id)
-        self.override_cache.pop(cache_key, None)
-        self.override_cache_times.pop(cache_key, None)
+        self._bump_invalidations()
+        self.cache.pop((feature_name, user_id))
+        self._notify(feature_name, user_id, False)
+
+    def _notify(
+        self,
+        feature_name: str,
+        user_id: Optional[str],
+        whole_feature: bool,
+    ) -> None:
+        for listener in self._listeners:
+            try:
+                listener(feature_name, user_id, whole_feature)
+            except Exception as e:
+                logger.error("Error in invalidation listener: %s", e)
@@ -0,0 +1,168 @@
+import asyncio
+import threading
+import uuid
+from collections import deque
+from itertools import islice
+from typing import Deque, Dict, List, NamedTuple, Optional, Tuple
+
+
+# A wait() in progress: the loop it runs on and the future it awaits
+Waiter = Tuple[asyncio.AbstractEventLoop, asyncio.Future]
+
+
+class ResyncRequired(Exception):
+    """The change log no longer holds every change a client missed."""
+
+
+class Change(NamedTuple):
+    version: int
+    feature_name: str
+    # None for the feature itself
+    user_id: Optional[str]
+    # every override of the feature may have changed
+    whole_feature: bool
+
+
+class ChangeLog:
+    """
+    Bounded log of recent writes, numbered by a version counter.
+
+    Feed it the invalidations of the CachedFeatureConfigDao it follows:
+    each one becomes the next version. It records which feature or
+    override a write touched, not the value written, so a reader looks
+    values up after reading the log and always gets one at least as new
+    as the write, however writes on different threads interleave.
+
+    Only the last max_entries changes are kept; a client that is further
+    behind, or holds a version from another log (a restarted or different
+    process, told apart by log_id), must resynchronize in full.
+
+    It also tags every feature and override with the version of the
+    last write to it, for ETags. Overrides are tagged individually up
+    to max_tagged_overrides; past that they are all forgotten at once
+    and every tag moves to the current version.
+    """
+
+    def __init__(
+        self, max_entries: int = 10_000, max_tagged_overrides: int = 1_000_000
+    ):
+        self.log_id = uuid.uuid4().hex
+        self.version = 0
+        self.max_tagged_overrides = max_tagged_overrides
+        self._entries: Deque[Change] = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+        self._waiters: List[Waiter] = []
+        # Every tag is at least the floor; keys never written since it
+        # was last raised are tagged with it
+        self._floor = 0
+        self._feature_versions: Dict[str, int] = {}
+        self._override_versions: Dict[Tuple[str, str], int] = {}
+
+    def record(
+        self,
+        feature_name: str,
+        user_id: Optional[str] = None,
+        whole_feature: bool = False,
+    ) -> None:
+        """Log a write to the feature or override as the next version."""
+        with self._lock:
+            self.version += 1
+            self._entries.append(
+                Change(self.version, feature_name, user_id, whole_feature)
+            )
+            if user_id is None or whole_feature:
+                # also tags its overrides, which tag() takes the max with
+                self._feature_versions[feature_name] = self.version
+            else:
+                if len(self._override_versions) >= self.max_tagged_overrides:
+                    # raised before clearing, for tag() reading unlocked
+                    self._floor = self.version
+                    self._override_versions.clear()
+                self._override_versions[feature_name, user_id] = self.version
+            waiters, self._waiters = self._waiters, []
+        # writes run on executor and bus threads as well as the loop
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_wake, future)
+
+    def since(
+        self, version: int, log_id: Optional[str] = None
+    ) -> Tuple[int, List[Change]]:
+        """
+        Return the current version and the changes made after version.
+
+        Takes O(changes returned), however long the log.
+
+        Raises:
+            ResyncRequired: If log_id names another log, or changes made
+                after version were dropped from this one
+        """
+        with self._lock:
+            missed = self.version - version
+            if (
+                (log_id is not None and log_id != self.log_id)
+                or missed < 0
+                or missed > len(self._entries)
+            ):
+                raise ResyncRequired(
+                    f"Version {version} is not in the change log"
+                )
+            changes = list(islice(reversed(self._entries), missed))
+            current = self.version
+        changes.reverse()
+        return current, changes
+
+    def tag(self, feature_name: str, user_id: Optional[str] = None) -> int:
+        """
+        Return the version of the last write the key's value depends on.
+
+        A user's value depends on their override and on the feature,
+        whose value is the default. Takes no lock: the dictionaries are
+        read before the floor, so a concurrent reset can only raise the
+        tag, never return one a client saw before the write.
+        """
+        version = self._feature_versions.get(feature_name, 0)
+        if user_id is not None:
+            version = max(
+                version,
+                self._override_versions.get((feature_name, user_id), 0),
+            )
+        return max(version, self._floor)
+
+    async def wait(self, version: int, timeout: float) -> int:
+        """
+        Wait up to timeout seconds for a change after version.
+
+        Returns:
+            The current version, which equals version on a timeout
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        waiter = (loop, future)
+        with self._lock:
+            if self.version != version:
+                return self.version
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        return self.version
+
+    def stats(self) -> dict:
+        return {
+            "log_id": self.log_id,
+            "version": self.version,
+            "entries": len(self._entries),
+            "max_entries": self._entries.maxlen,
+            "waiters": len(self._waiters),
+            "tagged_overrides": len(self._override_versions),
+        }
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
@@ -1,11 +1,30 @@
+import threading
 from abc import ABC, abstractmethod
-from typing import Optional
+from bisect import bisect_left, bisect_right
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
 from ..items.feature import Feature
 from ..items.featureOverride import FeatureOverride
 
 
 class FeatureConfigDao(ABC):
-    """Abstract Data Access Object for feature configurations."""
+    """
+    Abstract Data Access Object for feature configurations.
+
+    blocking_reads and blocking_writes tell async callers whether a call
+    may wait on disk or a database and so must leave the event loop.
+    """
+
+    blocking_reads = True
+    blocking_writes = True
 
     @abstractmethod
     def create_feature(self, feature: Feature) -> Feature:
@@ -37,3 +56,172 @@ class FeatureConfigDao(ABC):
     ) -> Optional[FeatureOverride]:
         """Delete a user-specific override."""
         pass
+
+    @abstractmethod
+    def list_features(
+        self, after: Optional[str] = None, limit: int = 100
+    ) -> List[Feature]:
+        """
+        List up to limit features in name order, starting after a name.
+
+        Paging by the last name seen rather than an offset stays stable
+        under concurrent writes: no feature that exists throughout is
+        skipped or repeated.
+        """
+        pass
+
+    @abstractmethod
+    def list_overrides(
+        self,
+        feature_name: str,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[FeatureOverride]:
+        """List up to limit overrides of a feature in user ID order."""
+        pass
+
+    def bulk_write_overrides(
+        self,
+        feature_name: str,
+        changes: Mapping[str, Optional[FeatureOverride]],
+    ) -> Tuple[int, int]:
+        """
+        Set or delete many users' overrides of one feature.
+
+        changes maps each user ID to its new override, or None to delete
+        it. Implementations apply the batch atomically and persist it at
+        once; this default applies it one write at a time.
+
+        Returns:
+            How many overrides were written and how many deleted
+        """
+        written = deleted = 0
+        for user_id, override in changes.items():
+            if override is not None:
+                self.create_override(feature_name, override)
+                written += 1
+            elif self.delete_override(feature_name, user_id) is not None:
+                deleted += 1
+        return written, deleted
+
+    def get_features(
+        self, feature_names: Sequence[str]
+    ) -> Dict[str, Optional[Feature]]:
+        """Get several features by name, None for those not found."""
+        return {name: self.get_feature(name) for name in feature_names}
+
+    def get_overrides_for_user(
+        self, feature_names: Sequence[str], user_id: str
+    ) -> Dict[str, Optional[FeatureOverride]]:
+        """Get one user's overrides of several features, None if absent."""
+        return {
+            name: self.get_override(name, user_id) for name in feature_names
+        }
+
+    def get_overrides_for_users(
+        self, feature_name: str, user_ids: Sequence[str]
+    ) -> Dict[str, Optional[FeatureOverride]]:
+        """Get several users' overrides of one feature, None if absent."""
+        return {
+            user_id: self.get_override(feature_name, user_id)
+            for user_id in user_ids
+        }
+
+    def close(self) -> None:
+        """Flush pending writes and release resources."""
+        pass
+
+    def stats(self) -> dict:
+        """Report implementation-specific runtime statistics."""
+        return {}
+
+
+class SortedKeyIndex:
+    """
+    Sorted keys of named dicts, for paging through them by key.
+
+    source(name) returns the dict a name stands for. Its keys are sorted
+    on its first page and then kept sorted as its owner reports each key
+    added() or removed(), after changing the dict, so every page costs
+    O(log n + limit) and a change O(n) at worst, a memmove rather than a
+    re-sort. Replacing a value needs no call. Reports are idempotent, so
+    one that races with the first sort is harmless.
+    """
+
+    def __init__(self, source: Callable[[Any], Optional[Mapping[str, Any]]]):
+        self._source = source
+        # dict name -> its sorted keys, once paged
+        self._sorted: Dict[Any, List[str]] = {}
+        self._locks: Dict[Any, threading.Lock] = {}
+
+    def added(self, name: Any, key: str) -> None:
+        """Note that key was added to a dict."""
+        with self._lock(name):
+            keys = self._sorted.get(name)
+            if keys is not None:
+                position = bisect_left(keys, key)
+                if position == len(keys) or keys[position] != key:
+                    keys.insert(position, key)
+
+    def removed(self, name: Any, key: str) -> None:
+        """Note that key was removed from a dict."""
+        with self._lock(name):
+            keys = self._sorted.get(name)
+            if keys is not None:
+                position = bisect_left(keys, key)
+                if position < len(keys) and keys[position] == key:
+                    del keys[position]
+
+    def updated(
+        self, name: Any, added: Sequence[str], removed: Sequence[str]
+    ) -> None:
+        """Note many added and removed keys at once, in O(n + k log n)."""
+        with self._lock(name):
+            keys = self._sorted.get(name)
+            if keys is None:
+                return
+            new = []
+            for key in added:
+                position = bisect_left(keys, key)
+                if position == len(keys) or keys[position] != key:
+                    new.append(key)
+            if removed:
+                gone = set(removed)
+                keys = self._sorted[name] = [
+                    key for key in keys if key not in gone
+                ]
+            if new:
+                new.sort()
+                keys += new
+                # two sorted runs, which the sort merges in O(n)
+                keys.sort()
+
+    def page(
+        self, name: Any, after: Optional[str], limit: int
+    ) -> List[Any]:
+        """Return the values of the limit smallest keys above after."""
+        with self._lock(name):
+            # read under the lock, so a change made after this read is
+            # reported after this sort
+            items = self._source(name)
+            if not items:
+                return []
+            keys = self._sorted.get(name)
+            if keys is None:
+                keys = self._sorted[name] = sorted(items)
+            page = []
+            position = 0 if after is None else bisect_right(keys, after)
+            end = len(keys)
+            while position < end and len(page) < limit:
+                # None if removed and not reported yet
+                value = items.get(keys[position])
+                if value is not None:
+                    page.append(value)
+                position += 1
+            return page
+
+    def _lock(self, name: Any) -> threading.Lock:
+        lock = self._locks.get(name)
+        if lock is None:
+            lock = self._locks.setdefault(name, threading.Lock())
+        return lock
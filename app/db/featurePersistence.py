@@ -0,0 +1,354 @@
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from typing import (
+    Callable, Dict, Iterable, Iterator, NamedTuple, Optional, Sequence,
+    Union,
+)
+
+from ..items.feature import Feature
+from ..items.featureOverride import FeatureOverride
+
+logger = logging.getLogger(__name__)
+
+PUT_FEATURE = "put_feature"
+PUT_OVERRIDE = "put_override"
+DELETE_OVERRIDE = "delete_override"
+
+
+class LazyOverrideGroup(Mapping):
+    """
+    Overrides for one feature, decoded from a snapshot on first access.
+
+    items() and values() decode a throwaway copy while the group is not
+    loaded, so writing a snapshot does not pin every group in memory.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Dict[str, FeatureOverride]],
+        size: int,
+    ):
+        self._loader = loader
+        self._size = size
+        self._data: Optional[Dict[str, FeatureOverride]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._data is not None
+
+    def materialize(self) -> Dict[str, FeatureOverride]:
+        """Decode the group once and return the dict backing it."""
+        data = self._data
+        if data is None:
+            with self._lock:
+                if self._data is None:
+                    self._data = self._loader()
+                data = self._data
+        return data
+
+    def unloaded_copy(self) -> "LazyOverrideGroup":
+        """Return a fresh, unloaded group over the same snapshot data."""
+        return LazyOverrideGroup(self._loader, self._size)
+
+    def __getitem__(self, user_id: str) -> FeatureOverride:
+        return self.materialize()[user_id]
+
+    def get(self, user_id: str, default=None):
+        return self.materialize().get(user_id, default)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.materialize())
+
+    def __len__(self) -> int:
+        data = self._data
+        return self._size if data is None else len(data)
+
+    def items(self):
+        data = self._data
+        return (self._loader() if data is None else data).items()
+
+    def values(self):
+        data = self._data
+        return (self._loader() if data is None else data).values()
+
+
+def override_group(
+    overrides: Dict[str, Dict[str, FeatureOverride]],
+    feature_name: str,
+    create: bool = False,
+) -> Optional[Dict[str, FeatureOverride]]:
+    """
+    Return the mutable override dict for a feature.
+
+    Lazily loaded groups are materialized and swapped in as plain dicts,
+    so callers must hold whatever lock orders writes to overrides.
+    """
+    group = overrides.get(feature_name)
+    if group is None:
+        if create:
+            group = overrides[feature_name] = {}
+        return group
+    if isinstance(group, LazyOverrideGroup):
+        group = overrides[feature_name] = group.materialize()
+    return group
+
+
+class FeatureState(NamedTuple):
+    """Point-in-time view of every feature and override."""
+
+    features: Dict[str, Feature]
+    overrides: Dict[str, Dict[str, FeatureOverride]]
+    # DAO version the view reflects
+    version: int = 0
+
+
+# Returns a point-in-time copy of the live state, optionally restricted
+# to the given feature names
+SnapshotFn = Callable[[Optional[Iterable[str]]], FeatureState]
+
+
+class Mutation(NamedTuple):
+    """A single write applied to the feature store."""
+
+    op: str
+    feature_name: str
+    user_id: Optional[str] = None
+    item: Optional[Union[Feature, FeatureOverride]] = None
+
+    def to_record(self) -> dict:
+        """Serialize the mutation to a JSON-compatible dict."""
+        record = {"op": self.op, "feature_name": self.feature_name}
+        if self.user_id is not None:
+            record["user_id"] = self.user_id
+        if self.item is not None:
+            record["item"] = self.item.model_dump(mode="json")
+        return record
+
+    @classmethod
+    def from_record(cls, record: dict) -> "Mutation":
+        """Rebuild a mutation from a dict produced by to_record."""
+        op = record["op"]
+        item = record.get("item")
+        if op == PUT_FEATURE:
+            item = Feature(**item)
+        elif op == PUT_OVERRIDE:
+            item = FeatureOverride(**item)
+        elif op != DELETE_OVERRIDE:
+            raise ValueError(f"Unknown mutation op {op}")
+        return cls(op, record["feature_name"], record.get("user_id"), item)
+
+
+def apply_mutation(state: FeatureState, mutation: Mutation) -> None:
+    """Apply a mutation to a FeatureState in place."""
+    if mutation.op == PUT_FEATURE:
+        state.features[mutation.feature_name] = mutation.item
+    elif mutation.op == PUT_OVERRIDE:
+        override_group(state.overrides, mutation.feature_name, True)[
+            mutation.item.user_id
+        ] = mutation.item
+    elif mutation.op == DELETE_OVERRIDE:
+        group = override_group(state.overrides, mutation.feature_name)
+        if group is not None:
+            group.pop(mutation.user_id, None)
+
+
+def read_json_snapshot(path: str) -> FeatureState:
+    """
+    Read a JSON snapshot file, raising if it is missing or corrupted.
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If it is not a valid snapshot
+    """
+    with open(path, "r") as f:
+        data = json.load(f)
+    return FeatureState(
+        features={
+            k: Feature(**v)
+            for k, v in data.get("features", {}).items()
+        },
+        overrides={
+            k: {
+                u: FeatureOverride(**o)
+                for u, o in v.items()
+            }
+            for k, v in data.get("overrides", {}).items()
+        },
+    )
+
+
+def load_json_snapshot(path: str) -> FeatureState:
+    """
+    Load a JSON snapshot file.
+
+    A missing or corrupted file yields an empty state so the service can
+    always start.
+    """
+    try:
+        state = read_json_snapshot(path)
+        logger.info("Loaded cache from file: %s ", path)
+        return state
+    except FileNotFoundError:
+        logger.debug(
+            "Cache file not found at %s - starting fresh",
+            path,
+        )
+    except json.JSONDecodeError:
+        logger.warning(
+            "Cache file at %s is corrupted or empty - "
+            "discarding and starting fresh",
+            path,
+        )
+    return FeatureState({}, {})
+
+
+def save_json_snapshot(path: str, state: FeatureState) -> None:
+    """Write a JSON snapshot file atomically (temp file + rename)."""
+    data = {
+        "features": {
+            k: v.model_dump(mode="json")
+            for k, v in state.features.items()
+        },
+        "overrides": {
+            k: {u: o.model_dump(mode="json") for u, o in v.items()}
+            for k, v in state.overrides.items()
+        },
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+class SnapshotStats:
+    """Duration and version of the snapshots a persistence has written."""
+
+    def __init__(self):
+        self.count = 0
+        self.last_version: Optional[int] = None
+        self.last_duration_seconds: Optional[float] = None
+        self.max_duration_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, version: int, started: float) -> None:
+        """Record a snapshot that began at perf_counter() time started."""
+        duration = time.perf_counter() - started
+        with self._lock:
+            self.count += 1
+            self.last_version = version
+            self.last_duration_seconds = duration
+            self.max_duration_seconds = max(
+                self.max_duration_seconds, duration
+            )
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "last_version": self.last_version,
+            "last_duration_seconds": self.last_duration_seconds,
+            "max_duration_seconds": self.max_duration_seconds,
+        }
+
+
+class FeaturePersistence(ABC):
+    """
+    Strategy used by InMemoryFeatureConfigDao to make its state durable.
+
+    The DAO calls open() once on startup and persist() after every
+    mutation it applies to its in-memory state. If persist() returns an
+    Event the DAO waits for it before acknowledging the write.
+
+    Implementations that record mutations (logs) set ordered, and the DAO
+    then calls persist() while still holding the lock that ordered the
+    mutation; they must not call the snapshot function from persist().
+    Implementations that re-read the live state through the snapshot
+    function are called after that lock is released.
+
+    blocking is False for implementations whose persist() never waits on
+    I/O, so async callers may write on the event loop.
+    """
+
+    ordered = False
+    blocking = True
+
+    def __init__(self):
+        self.snapshot_stats = SnapshotStats()
+
+    @abstractmethod
+    def open(self, snapshot: SnapshotFn) -> FeatureState:
+        """
+        Load the persisted state.
+
+        Args:
+            snapshot: Returns a point-in-time copy of the live state (or
+                      of some features), for implementations that write
+                      snapshots later on
+
+        Returns:
+            The state to start serving from
+        """
+        pass
+
+    def persist(self, mutation: Mutation) -> Optional[threading.Event]:
+        """
+        Make a mutation that was just applied durable.
+
+        Returns:
+            None once the mutation is durable, or an Event that is set
+            when it becomes durable
+        """
+        self.persist_batch([mutation])
+        return None
+
+    @abstractmethod
+    def persist_batch(self, mutations: Sequence[Mutation]) -> None:
+        """Make several mutations durable with as few writes as possible."""
+        pass
+
+    def close(self) -> None:
+        """Release any files or threads held by the persistence."""
+        pass
+
+
+class JsonSnapshotPersistence(FeaturePersistence):
+    """Rewrites the whole JSON snapshot file on every mutation."""
+
+    load_snapshot = staticmethod(load_json_snapshot)
+    save_snapshot = staticmethod(save_json_snapshot)
+
+    def __init__(self, cache_file: str = "/tmp/features.json"):
+        super().__init__()
+        self.cache_file = cache_file
+        self._snapshot: Optional[SnapshotFn] = None
+        self._save_lock = threading.Lock()
+
+    def open(self, snapshot: SnapshotFn) -> FeatureState:
+        self._snapshot = snapshot
+        return self.load_snapshot(self.cache_file)
+
+    def persist_batch(self, mutations: Sequence[Mutation]) -> None:
+        """Persist to file for durability"""
+        # The snapshot is taken inside the lock so the last file written
+        # always reflects every mutation persisted before it
+        with self._save_lock:
+            try:
+                started = time.perf_counter()
+                state = self._snapshot()
+                self.save_snapshot(self.cache_file, state)
+                self.snapshot_stats.record(state.version, started)
+                logger.debug(
+                    "Cache saved to file: %s",
+                    self.cache_file,
+                )
+            except Exception as e:
+                logger.error(
+                    "Error saving cache to file %s: %s",
+                    self.cache_file,
+                    e,
+                )
@@ -0,0 +1,175 @@
+import logging
+import threading
+import time
+from typing import List, Optional, Sequence
+
+from .featurePersistence import (
+    FeaturePersistence,
+    FeatureState,
+    Mutation,
+    SnapshotFn,
+    SnapshotStats,
+)
+
+logger = logging.getLogger(__name__)
+
+SYNC = "sync"
+BATCHED = "batched"
+ASYNC = "async"
+DURABILITY_LEVELS = (SYNC, BATCHED, ASYNC)
+
+
+class _Batch(threading.Event):
+    """
+    Mutations collected for a single flush, set once it is done.
+
+    Waiting on a batch whose flush failed raises the flush's error, so a
+    write is never acknowledged as durable when it is not.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.mutations: List[Mutation] = []
+        self.error: Optional[BaseException] = None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        flushed = super().wait(timeout)
+        if flushed and self.error is not None:
+            raise self.error
+        return flushed
+
+
+class GroupCommitPersistence(FeaturePersistence):
+    """
+    Write-behind wrapper that batches mutations into group commits.
+
+    A background flusher collects every mutation persisted within
+    flush_interval_seconds (or until max_batch_size are queued) and hands
+    them to the wrapped persistence as one persist_batch() call.
+
+    Durability levels:
+        sync: persist inline on the writing thread (no batching)
+        batched: the write is acknowledged after its batch is flushed
+        async: the write is acknowledged as soon as it is queued
+    """
+
+    def __init__(
+        self,
+        inner: FeaturePersistence,
+        durability: str = BATCHED,
+        flush_interval_seconds: float = 0.005,
+        max_batch_size: int = 1000,
+    ):
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(f"Unknown durability level {durability}")
+        self.inner = inner
+        self.durability = durability
+        self.flush_interval = flush_interval_seconds
+        self.max_batch_size = max_batch_size
+        self.flushes = 0
+        self._pending = _Batch()
+        self._closing = False
+        self._cond = threading.Condition()
+        self._flusher: Optional[threading.Thread] = None
+
+    @property
+    def snapshot_stats(self) -> SnapshotStats:
+        return self.inner.snapshot_stats
+
+    @property
+    def ordered(self) -> bool:
+        return self.inner.ordered
+
+    @property
+    def blocking(self) -> bool:
+        # async durability only queues the mutation
+        return self.durability != ASYNC
+
+    def open(self, snapshot: SnapshotFn) -> FeatureState:
+        state = self.inner.open(snapshot)
+        if self.durability != SYNC:
+            self._flusher = threading.Thread(
+                target=self._run,
+                name="persistence-flusher",
+                daemon=True,
+            )
+            self._flusher.start()
+        return state
+
+    def persist(self, mutation: Mutation) -> Optional[threading.Event]:
+        if self.durability == SYNC:
+            return self.inner.persist(mutation)
+        with self._cond:
+            if self._closing:
+                raise RuntimeError("Persistence is closed")
+            batch = self._pending
+            batch.mutations.append(mutation)
+            queued = len(batch.mutations)
+            if queued == 1 or queued >= self.max_batch_size:
+                self._cond.notify()
+        if self.durability == BATCHED:
+            return batch
+        return None
+
+    def persist_batch(self, mutations: Sequence[Mutation]) -> None:
+        # the mutations may span batches, any of which may fail
+        pending = []
+        for mutation in mutations:
+            batch = self.persist(mutation)
+            if batch is not None and (not pending or pending[-1] is not batch):
+                pending.append(batch)
+        for batch in pending:
+            batch.wait()
+
+    def flush(self) -> None:
+        """Block until everything queued so far has been flushed."""
+        with self._cond:
+            batch = self._pending
+            if not batch.mutations:
+                return
+            self._cond.notify()
+        batch.wait()
+
+    def close(self) -> None:
+        """Drain the queue, stop the flusher and close the inner store."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.inner.close()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending.mutations and not self._closing:
+                    self._cond.wait()
+                if not self._pending.mutations:
+                    return
+                deadline = time.monotonic() + self.flush_interval
+                while (
+                    len(self._pending.mutations) < self.max_batch_size
+                    and not self._closing
+                ):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._pending
+                self._pending = _Batch()
+            self._flush(batch)
+
+    def _flush(self, batch: _Batch) -> None:
+        try:
+            self.inner.persist_batch(batch.mutations)
+            self.flushes += 1
+            logger.debug("Flushed %d mutations", len(batch.mutations))
+        except Exception as e:
+            batch.error = e
+            logger.error(
+                "Error flushing %d mutations: %s",
+                len(batch.mutations),
+                e,
+            )
+        finally:
+            batch.set()
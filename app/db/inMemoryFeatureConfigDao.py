@@ -1,8 +1,21 @@
 # app/db/inMemoryFeatureConfigDao.py
-import json
 import logging
-from typing import Optional, Dict
-from .featureConfigDao import FeatureConfigDao
+import threading
+from typing import (
+    Iterable, List, Mapping, Optional, Dict, Sequence, Set, Tuple,
+)
+from .featureConfigDao import FeatureConfigDao, SortedKeyIndex
+from .featurePersistence import (
+    DELETE_OVERRIDE,
+    PUT_FEATURE,
+    PUT_OVERRIDE,
+    FeaturePersistence,
+    FeatureState,
+    JsonSnapshotPersistence,
+    LazyOverrideGroup,
+    Mutation,
+    override_group,
+)
 from ..items.feature import Feature
 from ..items.featureOverride import FeatureOverride
 
@@ -10,18 +23,56 @@ logger = logging.getLogger(__name__)
 
 
 class InMemoryFeatureConfigDao(FeatureConfigDao):
-    def __init__(self, cache_file: str = "/tmp/features.json"):
+    """
+    FeatureConfigDao holding every feature and override in dicts.
+
+    Reads never take a lock: they are single dict lookups, and writers
+    only ever replace values or swap in copied dicts. Writers serialize
+    per feature on one of stripe_count striped locks, so writes to
+    different features proceed in parallel.
+    """
+
+    blocking_reads = False
+
+    def __init__(
+        self,
+        cache_file: str = "/tmp/features.json",
+        persistence: Optional[FeaturePersistence] = None,
+        stripe_count: int = 64,
+    ):
         self.features: Dict[str, Feature] = {}
         self.overrides: Dict[str, Dict[str, FeatureOverride]] = {}
         self.cache_file = cache_file
         self.last_cache_time = None
+        self.persistence = persistence or JsonSnapshotPersistence(
+            cache_file
+        )
+        # Bumped on every mutation; snapshots record the version they saw
+        self.version = 0
+        # Override dicts still referenced by a snapshot; writers copy them
+        # before their first mutation instead of waiting for the snapshot
+        self._shared: Set[str] = set()
+        self._stripes = [threading.Lock() for _ in range(stripe_count)]
+        self._sequence_lock = threading.Lock()
+        # for listings: features under None, overrides under their name
+        self._keys = SortedKeyIndex(self._listed)
         self._load_from_file()
 
     def create_feature(self, feature: Feature) -> Feature:
-        self.features[feature.feature_name] = feature
-        self._save_to_file()
+        mutation = Mutation(PUT_FEATURE, feature.feature_name, item=feature)
+        with self._stripe(feature.feature_name):
+            new = feature.feature_name not in self.features
+            self.features[feature.feature_name] = feature
+            if new:
+                self._keys.added(None, feature.feature_name)
+            pending = self._record(mutation)
+        self._finish(mutation, pending)
         return feature
 
+    @property
+    def blocking_writes(self) -> bool:
+        return self.persistence.blocking
+
     def get_feature(self, feature_name: str) -> Optional[Feature]:
         return self.features.get(feature_name)
 
@@ -30,10 +81,15 @@ class InMemoryFeatureConfigDao(FeatureConfigDao):
         feature_name: str,
         override: FeatureOverride,
     ) -> FeatureOverride:
-        if feature_name not in self.overrides:
-            self.overrides[feature_name] = {}
-        self.overrides[feature_name][override.user_id] = override
-        self._save_to_file()
+        mutation = Mutation(PUT_OVERRIDE, feature_name, item=override)
+        with self._stripe(feature_name):
+            group = self._writable_group(feature_name, create=True)
+            new = override.user_id not in group
+            group[override.user_id] = override
+            if new:
+                self._keys.added(feature_name, override.user_id)
+            pending = self._record(mutation)
+        self._finish(mutation, pending)
         return override
 
     def get_override(
@@ -43,70 +99,192 @@ class InMemoryFeatureConfigDao(FeatureConfigDao):
     ) -> Optional[FeatureOverride]:
         return self.overrides.get(feature_name, {}).get(user_id)
 
+    def get_overrides_for_users(
+        self, feature_name: str, user_ids: Sequence[str]
+    ) -> Dict[str, Optional[FeatureOverride]]:
+        group = self.overrides.get(feature_name, {})
+        return {user_id: group.get(user_id) for user_id in user_ids}
+
     def delete_override(
         self,
         feature_name: str,
         user_id: str,
     ) -> Optional[FeatureOverride]:
-        override = self.overrides.get(feature_name, {}).pop(user_id, None)
-        if override:
-            self._save_to_file()
+        mutation = Mutation(DELETE_OVERRIDE, feature_name, user_id)
+        with self._stripe(feature_name):
+            group = self._writable_group(feature_name)
+            override = group.pop(user_id, None) if group else None
+            if override is None:
+                return None
+            self._keys.removed(feature_name, user_id)
+            pending = self._record(mutation)
+        self._finish(mutation, pending)
         return override
 
-    def _save_to_file(self):
-        """Persist to file for durability"""
-        try:
-            data = {
-                "features": {
-                    k: v.model_dump(mode="json")
-                    for k, v in self.features.items()
-                },
-                "overrides": {
-                    k: {u: o.model_dump(mode="json") for u, o in v.items()}
-                    for k, v in self.overrides.items()
-                },
+    def list_features(
+        self, after: Optional[str] = None, limit: int = 100
+    ) -> List[Feature]:
+        return self._keys.page(None, after, limit)
+
+    def list_overrides(
+        self,
+        feature_name: str,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[FeatureOverride]:
+        return self._keys.page(feature_name, after, limit)
+
+    def bulk_write_overrides(
+        self,
+        feature_name: str,
+        changes: Mapping[str, Optional[FeatureOverride]],
+    ) -> Tuple[int, int]:
+        """
+        Apply the batch atomically and persist it in one write.
+
+        The batch is applied to a copy of the feature's overrides that is
+        then swapped in, so readers see all of it or none of it.
+        """
+        mutations = []
+        written = deleted = 0
+        added = []
+        removed = []
+        with self._stripe(feature_name):
+            group = dict(override_group(self.overrides, feature_name) or {})
+            for user_id, override in changes.items():
+                if override is not None:
+                    if user_id not in group:
+                        added.append(user_id)
+                    group[user_id] = override
+                    mutations.append(
+                        Mutation(PUT_OVERRIDE, feature_name, item=override)
+                    )
+                    written += 1
+                elif group.pop(user_id, None) is not None:
+                    mutations.append(
+                        Mutation(DELETE_OVERRIDE, feature_name, user_id)
+                    )
+                    removed.append(user_id)
+                    deleted += 1
+            if not mutations:
+                return 0, 0
+            self.overrides[feature_name] = group
+            self._shared.discard(feature_name)
+            self._keys.updated(feature_name, added, removed)
+            with self._sequence_lock:
+                self.version += 1
+            if self.persistence.ordered:
+                self.persistence.persist_batch(mutations)
+        if not self.persistence.ordered:
+            self.persistence.persist_batch(mutations)
+        return written, deleted
+
+    def close(self) -> None:
+        """Flush and release the persistence backend."""
+        self.persistence.close()
+
+    def stats(self) -> dict:
+        """Report the store version and persistence snapshot stats."""
+        return {
+            "version": self.version,
+            "features": len(self.features),
+            "snapshots": self.persistence.snapshot_stats.as_dict(),
+        }
+
+    def snapshot_state(
+        self, feature_names: Optional[Iterable[str]] = None
+    ) -> FeatureState:
+        """
+        Return an immutable point-in-time view of features and overrides.
+
+        Only the top-level dicts are copied. Each feature's override dict
+        is shared with the view under that feature's stripe lock, and the
+        next writer to touch it copies it first, so serializing the view
+        never blocks readers or writers. The view is consistent per
+        feature; must not be called while holding a stripe lock.
+
+        Args:
+            feature_names: Restrict the view to these features; all
+                           features when omitted
+        """
+        version = self.version
+        if feature_names is None:
+            features = dict(self.features)
+            names = list(self.overrides)
+        else:
+            feature_names = list(feature_names)
+            features = {
+                k: self.features[k]
+                for k in feature_names
+                if k in self.features
             }
-            with open(self.cache_file, "w") as f:
-                json.dump(data, f)
-            logger.debug(
-                "Cache saved to file: %s",
-                self.cache_file,
-            )
-        except Exception as e:
-            logger.error(
-                "Error saving cache to file %s: %s",
-                self.cache_file,
-                e,
-            )
+            names = feature_names
+        by_stripe: Dict[int, List[str]] = {}
+        for name in names:
+            by_stripe.setdefault(self._stripe_index(name), []).append(name)
+        overrides = {}
+        for index, stripe_names in by_stripe.items():
+            with self._stripes[index]:
+                for name in stripe_names:
+                    group = self.overrides.get(name)
+                    if group is None:
+                        continue
+                    if (
+                        isinstance(group, LazyOverrideGroup)
+                        and not group.loaded
+                    ):
+                        # decoded straight from the immutable snapshot file
+                        group = group.unloaded_copy()
+                    else:
+                        self._shared.add(name)
+                    overrides[name] = group
+        return FeatureState(features, overrides, version)
+
+    def _listed(self, name: Optional[str]):
+        """Return what a listing pages through: features, or overrides"""
+        return self.features if name is None else self.overrides.get(name)
+
+    def _stripe_index(self, feature_name: str) -> int:
+        return hash(feature_name) % len(self._stripes)
+
+    def _stripe(self, feature_name: str) -> threading.Lock:
+        """Return the lock that serializes writes to a feature"""
+        return self._stripes[self._stripe_index(feature_name)]
+
+    def _writable_group(
+        self, feature_name: str, create: bool = False
+    ) -> Optional[Dict[str, FeatureOverride]]:
+        """Return an override dict no snapshot references, for writing"""
+        group = override_group(self.overrides, feature_name, create)
+        if group is not None and feature_name in self._shared:
+            group = self.overrides[feature_name] = dict(group)
+            self._shared.discard(feature_name)
+        return group
+
+    def _record(self, mutation: Mutation) -> Optional[threading.Event]:
+        """
+        Sequence a mutation while its stripe lock is still held.
+
+        Persistences that need per-feature write order (logs) are handed
+        the mutation here; the rest are handed it by _finish.
+        """
+        with self._sequence_lock:
+            self.version += 1
+        if self.persistence.ordered:
+            return self.persistence.persist(mutation)
+        return None
+
+    def _finish(
+        self, mutation: Mutation, pending: Optional[threading.Event]
+    ) -> None:
+        """Persist outside the stripe lock and wait for durability"""
+        if not self.persistence.ordered:
+            pending = self.persistence.persist(mutation)
+        if pending is not None:
+            pending.wait()
 
     def _load_from_file(self):
-        """Load from persistent file on startup"""
-        try:
-            with open(self.cache_file, "r") as f:
-                data = json.load(f)
-                self.features = {
-                    k: Feature(**v)
-                    for k, v in data.get("features", {}).items()
-                }
-                self.overrides = {
-                    k: {
-                        u: FeatureOverride(**o)
-                        for u, o in v.items()
-                    }
-                    for k, v in data.get("overrides", {}).items()
-                }
-                logger.info(
-                    "Loaded cache from file: %s ",
-                    self.cache_file
-                )
-        except FileNotFoundError:
-            logger.debug(
-                "Cache file not found at %s - starting fresh",
-                self.cache_file,
-            )
-        except json.JSONDecodeError:
-            logger.warning(
-                "Cache file at %s is corrupted or empty - "
-                "discarding and starting fresh",
-                self.cache_file,
-            )
+        """Load from persistent storage on startup"""
+        state = self.persistence.open(self.snapshot_state)
+        self.features = state.features
+        self.overrides = state.overrides
@@ -0,0 +1,161 @@
+import json
+import logging
+import os
+import socket
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Called with (feature_name, user_id, whole_feature); user_id is None for
+# the feature itself, and whole_feature drops all its overrides too
+InvalidationHandler = Callable[[str, Optional[str], bool], None]
+
+
+class InvalidationBus(ABC):
+    """
+    Broadcasts cache invalidations between processes sharing a store.
+
+    Each process starts the bus with a handler, and publishes an
+    invalidation after every write it makes. Every other process's
+    handler is then called with it; the publisher's own is not.
+    """
+
+    @abstractmethod
+    def start(self, handler: InvalidationHandler) -> None:
+        """Begin delivering peers' invalidations to handler."""
+        pass
+
+    @abstractmethod
+    def publish(
+        self,
+        feature_name: str,
+        user_id: Optional[str] = None,
+        whole_feature: bool = False,
+    ) -> None:
+        """Tell every peer to drop its cached entry."""
+        pass
+
+    def close(self) -> None:
+        """Stop receiving and leave the bus."""
+        pass
+
+    def stats(self) -> dict:
+        """Report implementation-specific runtime statistics."""
+        return {}
+
+
+class UnixSocketInvalidationBus(InvalidationBus):
+    """
+    Invalidation bus over Unix datagram sockets in a shared directory.
+
+    Each process binds one socket in directory and publishes by sending
+    a datagram to every other socket there, so delivery takes one local
+    send per peer and no broker. Sockets left by processes that died
+    are removed the first time a send to them is refused.
+    """
+
+    def __init__(
+        self,
+        directory: str = "/tmp/featureflags-invalidation",
+        send_timeout_seconds: float = 0.1,
+    ):
+        self.directory = directory
+        self.send_timeout = send_timeout_seconds
+        self.path = os.path.join(
+            directory, f"{os.getpid()}-{uuid.uuid4().hex[:8]}.sock"
+        )
+        self.sent = 0
+        self.received = 0
+        self.dropped = 0
+        self._handler: Optional[InvalidationHandler] = None
+        self._socket: Optional[socket.socket] = None
+        self._sender: Optional[socket.socket] = None
+        self._closing = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, handler: InvalidationHandler) -> None:
+        self._handler = handler
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._socket.bind(self.path)
+        os.chmod(self.path, 0o600)
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sender.settimeout(self.send_timeout)
+        self._thread = threading.Thread(
+            target=self._receive,
+            name="cache-invalidation",
+            daemon=True,
+        )
+        self._thread.start()
+        logger.info("Joined invalidation bus at %s", self.path)
+
+    def publish(
+        self,
+        feature_name: str,
+        user_id: Optional[str] = None,
+        whole_feature: bool = False,
+    ) -> None:
+        if self._sender is None:
+            return
+        message = json.dumps(
+            [feature_name, user_id, whole_feature]
+        ).encode("utf-8")
+        for name in os.listdir(self.directory):
+            peer = os.path.join(self.directory, name)
+            if peer == self.path or not name.endswith(".sock"):
+                continue
+            try:
+                self._sender.sendto(message, peer)
+                self.sent += 1
+            except (ConnectionRefusedError, FileNotFoundError):
+                # its process is gone
+                try:
+                    os.unlink(peer)
+                except FileNotFoundError:
+                    pass
+            except OSError as e:
+                self.dropped += 1
+                logger.warning(
+                    "Could not send invalidation to %s: %s", peer, e
+                )
+
+    def close(self) -> None:
+        if self._socket is None:
+            return
+        self._closing = True
+        # wake the receiving thread
+        self._sender.sendto(b"", self.path)
+        self._thread.join()
+        self._socket.close()
+        self._sender.close()
+        self._socket = self._sender = None
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> dict:
+        return {
+            "sent": self.sent,
+            "received": self.received,
+            "dropped": self.dropped,
+        }
+
+    def _receive(self) -> None:
+        while True:
+            data = self._socket.recv(65536)
+            if self._closing:
+                return
+            try:
+                feature_name, user_id, whole_feature = json.loads(data)
+            except ValueError:
+                logger.warning("Ignoring malformed invalidation %r", data)
+                continue
+            self.received += 1
+            try:
+                self._handler(feature_name, user_id, whole_feature)
+            except Exception as e:
+                logger.error("Error applying invalidation: %s", e)
@@ -0,0 +1,85 @@
+import threading
+from typing import Dict, Hashable, Optional
+
+from .sieveCache import SieveCache
+
+
+def _feature_of(key: Hashable) -> str:
+    return key if isinstance(key, str) else key[0]
+
+
+class ResponseCache:
+    """
+    Encoded response bodies for the read endpoints.
+
+    Holds the final bytes served for each feature, keyed by name, and
+    each user's evaluation of it, keyed by (feature, user), so a hit
+    skips validation and JSON encoding altogether.
+
+    Feed it the invalidations of the CachedFeatureConfigDao it fronts.
+    A feature write drops the feature and every evaluation of it, since
+    users without an override get its default; like the DAO cache it
+    does so in O(1) by moving the feature to a new generation. An
+    override write drops only that user's evaluation.
+    """
+
+    def __init__(self, max_entries: int = 100_000, ttl_seconds: float = 300):
+        self.ttl = ttl_seconds
+        self.cache = SieveCache(max_entries)
+        # Approximate: counted without a lock
+        self.hits = 0
+        self.misses = 0
+        # Bumped by every invalidation; put() compares it to the count
+        # seen before rendering
+        self.invalidations = 0
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        body = self.cache.get(
+            key, None, tag=self._generations.get(_feature_of(key), 0)
+        )
+        if body is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return body
+
+    def put(self, key: Hashable, body: bytes, seen: int) -> None:
+        """
+        Cache body for key unless an invalidation landed since seen.
+
+        seen is the invalidation count read before the data behind body
+        was looked up, so a body that may predate a write is dropped.
+        """
+        if self.invalidations != seen:
+            return
+        self.cache.put(
+            key,
+            body,
+            self.ttl,
+            tag=self._generations.get(_feature_of(key), 0),
+        )
+        if self.invalidations != seen:
+            self.cache.pop(key)
+
+    def invalidate(
+        self,
+        feature_name: str,
+        user_id: Optional[str] = None,
+        whole_feature: bool = False,
+    ) -> None:
+        """Drop the bodies a write to the feature or override changed."""
+        with self._lock:
+            self.invalidations += 1
+            if user_id is None or whole_feature:
+                self._generations[feature_name] = (
+                    self._generations.get(feature_name, 0) + 1
+                )
+        if user_id is not None and not whole_feature:
+            self.cache.pop((feature_name, user_id))
+
+    def stats(self) -> dict:
+        stats = self.cache.stats()
+        stats.update(hits=self.hits, misses=self.misses)
+        return stats
@@ -0,0 +1,216 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Set
+
+from .featurePersistence import (
+    FeaturePersistence,
+    FeatureState,
+    Mutation,
+    SnapshotFn,
+    load_json_snapshot,
+    save_json_snapshot,
+)
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+
+
+def shard_for(feature_name: str, shard_count: int) -> int:
+    """Map a feature name to its shard with a hash stable across runs."""
+    return zlib.crc32(feature_name.encode("utf-8")) % shard_count
+
+
+class ShardedSnapshotPersistence(FeaturePersistence):
+    """
+    Stores features in shard_count snapshot files, bucketed by name hash.
+
+    A write rewrites (temp file + rename) only the shards holding the
+    features it touched, and startup loads every shard in parallel on a
+    thread pool. Each shard uses the same format as a whole-store
+    snapshot, so JSON and binary shards are both supported.
+
+    The directory's manifest records the shard count it was written
+    with. Opening it with another count loads every shard file present
+    and re-shards them before any write is accepted; until that is done,
+    a feature's copy in the shard it hashes to wins over one left
+    elsewhere by an interrupted re-shard.
+    """
+
+    def __init__(
+        self,
+        directory: str = "/tmp/features.shards",
+        shard_count: int = 64,
+        load_workers: int = 8,
+        suffix: str = ".json",
+        load_snapshot: Callable[[str], FeatureState] = load_json_snapshot,
+        save_snapshot: Callable[
+            [str, FeatureState], None
+        ] = save_json_snapshot,
+    ):
+        super().__init__()
+        self.directory = directory
+        self.shard_count = shard_count
+        self.load_workers = load_workers
+        self.suffix = suffix
+        self.load_snapshot = load_snapshot
+        self.save_snapshot = save_snapshot
+        self.shard_writes = 0
+        self._snapshot: Optional[SnapshotFn] = None
+        self._members: Dict[int, Set[str]] = {}
+        self._members_lock = threading.Lock()
+        self._shard_locks = [threading.Lock() for _ in range(shard_count)]
+
+    def shard_path(self, shard: int) -> str:
+        return os.path.join(self.directory, f"shard-{shard:04d}{self.suffix}")
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.directory, MANIFEST)
+
+    def open(self, snapshot: SnapshotFn) -> FeatureState:
+        self._snapshot = snapshot
+        os.makedirs(self.directory, exist_ok=True)
+        shards = self._shard_files()
+        with ThreadPoolExecutor(self.load_workers) as pool:
+            loaded = dict(
+                zip(shards, pool.map(self.load_snapshot, shards.values()))
+            )
+        state = FeatureState({}, {})
+        misplaced = False
+        # copies in other shards first, so the home shard's copy wins
+        for home in (False, True):
+            for i, shard in loaded.items():
+                for name in shard.features.keys() | shard.overrides.keys():
+                    if (shard_for(name, self.shard_count) == i) != home:
+                        continue
+                    misplaced |= not home
+                    _take(state, shard, name)
+        for name in state.features.keys() | state.overrides.keys():
+            self._members.setdefault(
+                shard_for(name, self.shard_count), set()
+            ).add(name)
+        logger.info(
+            "Loaded %d shards from %s",
+            len(shards),
+            self.directory,
+        )
+        written_count = self._read_manifest()
+        if misplaced or any(i >= self.shard_count for i in shards):
+            logger.warning(
+                "Re-sharding %s from %s to %d shards",
+                self.directory,
+                written_count,
+                self.shard_count,
+            )
+            self._reshard(state, shards)
+        elif written_count != self.shard_count:
+            self._write_manifest()
+        return state
+
+    def persist_batch(self, mutations: Sequence[Mutation]) -> None:
+        touched: Set[int] = set()
+        with self._members_lock:
+            for mutation in mutations:
+                shard = shard_for(mutation.feature_name, self.shard_count)
+                self._members.setdefault(shard, set()).add(
+                    mutation.feature_name
+                )
+                touched.add(shard)
+        for shard in sorted(touched):
+            self._write_shard(shard)
+
+    def _shard_files(self) -> Dict[int, str]:
+        """Every shard file in the directory, whatever the count."""
+        pattern = re.compile(rf"shard-(\d+){re.escape(self.suffix)}")
+        shards = {}
+        for entry in os.listdir(self.directory):
+            match = pattern.fullmatch(entry)
+            if match:
+                shards[int(match.group(1))] = os.path.join(
+                    self.directory, entry
+                )
+        return dict(sorted(shards.items()))
+
+    def _read_manifest(self) -> Optional[int]:
+        try:
+            with open(self.manifest_path, "r") as f:
+                return json.load(f)["shard_count"]
+        except FileNotFoundError:
+            return None
+
+    def _write_manifest(self) -> None:
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"shard_count": self.shard_count}, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _reshard(self, state: FeatureState, shards: Dict[int, str]) -> None:
+        """
+        Rewrite every shard for shard_count, then drop the others.
+
+        Each step replaces whole files and leaves a directory from which
+        open() loads the same state, so an interrupted re-shard is
+        simply redone on the next start.
+        """
+        for shard in range(self.shard_count):
+            members = self._members.get(shard, set())
+            if not members and shard not in shards:
+                continue
+            self.save_snapshot(
+                self.shard_path(shard),
+                FeatureState(
+                    {
+                        name: state.features[name]
+                        for name in members
+                        if name in state.features
+                    },
+                    {
+                        name: state.overrides[name]
+                        for name in members
+                        if name in state.overrides
+                    },
+                ),
+            )
+        self._write_manifest()
+        for shard, path in shards.items():
+            if shard >= self.shard_count:
+                os.remove(path)
+
+    def _write_shard(self, shard: int) -> None:
+        """Rewrite one shard from a copy of just its features"""
+        with self._shard_locks[shard]:
+            with self._members_lock:
+                members: List[str] = list(self._members[shard])
+            path = self.shard_path(shard)
+            try:
+                started = time.perf_counter()
+                state = self._snapshot(members)
+                self.save_snapshot(path, state)
+                self.shard_writes += 1
+                self.snapshot_stats.record(state.version, started)
+                logger.debug("Shard saved to file: %s", path)
+            except Exception as e:
+                logger.error(
+                    "Error saving shard to file %s: %s",
+                    path,
+                    e,
+                )
+
+
+def _take(state: FeatureState, shard: FeatureState, name: str) -> None:
+    """Copy one feature and its overrides from a shard into state."""
+    for target, source in (
+        (state.features, shard.features),
+        (state.overrides, shard.overrides),
+    ):
+        if name in source:
+            target[name] = source[name]
+        else:
+            target.pop(name, None)
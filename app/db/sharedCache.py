@@ -0,0 +1,305 @@
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import List, Optional, Union
+
+from .sieveCache import MISSING
+from ..items.feature import Feature
+from ..items.featureOverride import FeatureOverride
+
+logger = logging.getLogger(__name__)
+
+CachedValue = Union[Feature, FeatureOverride, None]
+
+
+class SharedCache(ABC):
+    """
+    Second cache tier shared by every process on a host.
+
+    Sits between each process's own cache and the base DAO, so a lookup
+    one worker paid for is a hit for the others, and a freshly started
+    worker warms from it instead of the store. Entries are keyed by
+    (feature_name, user_id), with user_id None for the feature itself;
+    a cached None means the base DAO had nothing there.
+
+    Fills are guarded by a per-feature generation that every write
+    bumps: read generation() before reading the base DAO and pass it to
+    put(), which drops the value if a write landed in between.
+    """
+
+    @abstractmethod
+    def get(self, feature_name: str, user_id: Optional[str] = None):
+        """Return the live cached value, which may be None, or MISSING."""
+        pass
+
+    @abstractmethod
+    def generation(self, feature_name: str) -> int:
+        """Return the feature's current generation."""
+        pass
+
+    @abstractmethod
+    def put(
+        self,
+        feature_name: str,
+        user_id: Optional[str],
+        value: CachedValue,
+        ttl_seconds: float,
+        generation: int,
+    ) -> None:
+        """Cache value unless the feature moved past generation."""
+        pass
+
+    @abstractmethod
+    def invalidate(
+        self,
+        feature_name: str,
+        user_id: Optional[str] = None,
+        whole_feature: bool = False,
+    ) -> None:
+        """Drop the entry a write changed, or all the feature's entries."""
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        """Report implementation-specific runtime statistics."""
+        return {}
+
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS entries (
+        feature_name TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        value TEXT,
+        expires_at REAL NOT NULL,
+        PRIMARY KEY (feature_name, user_id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at)",
+    """
+    CREATE TABLE IF NOT EXISTS generations (
+        feature_name TEXT PRIMARY KEY,
+        generation INTEGER NOT NULL
+    ) WITHOUT ROWID
+    """,
+    # the number of rows in entries, kept by the triggers below so a
+    # purge need not count them
+    """
+    CREATE TABLE IF NOT EXISTS entry_count (
+        id INTEGER PRIMARY KEY CHECK (id = 0),
+        entries INTEGER NOT NULL
+    )
+    """,
+    "INSERT OR IGNORE INTO entry_count SELECT 0, COUNT(*) FROM entries",
+    """
+    CREATE TRIGGER IF NOT EXISTS entries_inserted AFTER INSERT ON entries
+    BEGIN
+        UPDATE entry_count SET entries = entries + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS entries_deleted AFTER DELETE ON entries
+    BEGIN
+        UPDATE entry_count SET entries = entries - 1;
+    END
+    """,
+)
+
+# The feature itself is stored under user_id "", which no override has
+FEATURE_ROW = ""
+
+SELECT_ENTRY = (
+    "SELECT value FROM entries "
+    "WHERE feature_name = ? AND user_id = ? AND expires_at > ?"
+)
+SELECT_GENERATION = (
+    "SELECT generation FROM generations WHERE feature_name = ?"
+)
+# an upsert rather than INSERT OR REPLACE, whose implicit delete would
+# not fire entries_deleted
+PUT_ENTRY = (
+    "INSERT INTO entries "
+    "(feature_name, user_id, value, expires_at) "
+    "SELECT ?, ?, ?, ? WHERE COALESCE("
+    "(SELECT generation FROM generations WHERE feature_name = ?), 0) = ? "
+    "ON CONFLICT (feature_name, user_id) DO UPDATE SET "
+    "value = excluded.value, expires_at = excluded.expires_at"
+)
+BUMP_GENERATION = (
+    "INSERT INTO generations (feature_name, generation) VALUES (?, 1) "
+    "ON CONFLICT (feature_name) DO UPDATE SET generation = generation + 1"
+)
+DELETE_FEATURE_ENTRIES = "DELETE FROM entries WHERE feature_name = ?"
+DELETE_ENTRY = "DELETE FROM entries WHERE feature_name = ? AND user_id = ?"
+DELETE_EXPIRED = "DELETE FROM entries WHERE expires_at <= ?"
+COUNT_ENTRIES = "SELECT entries FROM entry_count"
+DELETE_SOONEST = (
+    "DELETE FROM entries WHERE rowid IN "
+    "(SELECT rowid FROM entries ORDER BY expires_at LIMIT ?)"
+)
+
+
+class SqliteSharedCache(SharedCache):
+    """
+    SharedCache in a SQLite database on local disk, ideally a tmpfs.
+
+    Values are stored as their JSON. Every purge_interval-th fill purges
+    expired entries and, past max_entries, the ones expiring soonest;
+    expires_at is indexed and triggers keep the entry count, so a purge
+    touches only the rows it deletes.
+    Errors reading or filling the cache are logged and treated as
+    misses, so the tier can only slow lookups down, never fail them.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "/dev/shm/featureflags-cache.db",
+        max_entries: int = 1_000_000,
+        purge_interval: int = 1000,
+        busy_timeout_ms: int = 1000,
+    ):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.purge_interval = purge_interval
+        self.busy_timeout_ms = busy_timeout_ms
+        self.errors = 0
+        self._puts = 0
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        conn = self._connection()
+        # in one transaction, so no process's writes slip in between
+        # seeding entry_count and creating its triggers
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for statement in SCHEMA:
+                conn.execute(statement)
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+        logger.info("Opened shared cache: %s", db_path)
+
+    def get(self, feature_name: str, user_id: Optional[str] = None):
+        try:
+            row = self._connection().execute(
+                SELECT_ENTRY,
+                (feature_name, user_id or FEATURE_ROW, time.time()),
+            ).fetchone()
+        except sqlite3.Error as e:
+            self._error("read", e)
+            return MISSING
+        if row is None:
+            return MISSING
+        if row[0] is None:
+            return None
+        if user_id is None:
+            return Feature.model_validate_json(row[0])
+        return FeatureOverride.model_validate_json(row[0])
+
+    def generation(self, feature_name: str) -> int:
+        try:
+            row = self._connection().execute(
+                SELECT_GENERATION, (feature_name,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            self._error("read", e)
+            # a generation no row has, so the fill is dropped
+            return -1
+        return 0 if row is None else row[0]
+
+    def put(
+        self,
+        feature_name: str,
+        user_id: Optional[str],
+        value: CachedValue,
+        ttl_seconds: float,
+        generation: int,
+    ) -> None:
+        self._puts += 1
+        try:
+            with self._connection() as conn:
+                conn.execute(
+                    PUT_ENTRY,
+                    (
+                        feature_name,
+                        user_id or FEATURE_ROW,
+                        None if value is None else value.model_dump_json(),
+                        time.time() + ttl_seconds,
+                        feature_name,
+                        generation,
+                    ),
+                )
+                if self._puts % self.purge_interval == 0:
+                    self._purge(conn)
+        except sqlite3.Error as e:
+            self._error("fill", e)
+
+    def invalidate(
+        self,
+        feature_name: str,
+        user_id: Optional[str] = None,
+        whole_feature: bool = False,
+    ) -> None:
+        try:
+            with self._connection() as conn:
+                conn.execute(BUMP_GENERATION, (feature_name,))
+                if whole_feature:
+                    conn.execute(DELETE_FEATURE_ENTRIES, (feature_name,))
+                else:
+                    conn.execute(
+                        DELETE_ENTRY, (feature_name, user_id or FEATURE_ROW)
+                    )
+        except sqlite3.Error as e:
+            # left to expire; other processes may read it until then
+            self._error("invalidation", e)
+
+    def close(self) -> None:
+        """Close every pooled connection."""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def stats(self) -> dict:
+        try:
+            (entries,) = self._connection().execute(
+                COUNT_ENTRIES
+            ).fetchone()
+        except sqlite3.Error:
+            entries = None
+        return {"entries": entries, "errors": self.errors}
+
+    def _purge(self, conn: sqlite3.Connection) -> None:
+        conn.execute(DELETE_EXPIRED, (time.time(),))
+        (entries,) = conn.execute(COUNT_ENTRIES).fetchone()
+        if entries > self.max_entries:
+            conn.execute(DELETE_SOONEST, (entries - self.max_entries,))
+
+    def _error(self, operation: str, error: sqlite3.Error) -> None:
+        self.errors += 1
+        logger.warning("Shared cache %s failed: %s", operation, error)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=self.busy_timeout_ms / 1000,
+                cached_statements=64,
+                # only this thread uses it; close() may run elsewhere
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            # a cache: losing it in a crash costs only misses
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
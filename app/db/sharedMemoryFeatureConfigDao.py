@@ -0,0 +1,329 @@
+import fcntl
+import logging
+import os
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import (
+    Client,
+    Connection,
+    Listener,
+    answer_challenge,
+    deliver_challenge,
+)
+from typing import Dict, List, Mapping, Optional, Sequence, TextIO, Tuple
+
+from .featureConfigDao import FeatureConfigDao, SortedKeyIndex
+from .sharedMemoryTable import SharedMemoryGeneration, SharedMemoryTableReader
+from ..items.feature import Feature
+from ..items.featureOverride import FeatureOverride
+
+logger = logging.getLogger(__name__)
+
+WRITE_METHODS = (
+    "create_feature",
+    "create_override",
+    "delete_override",
+    "bulk_write_overrides",
+)
+
+
+def acquire_ownership(lock_file: str) -> Optional[TextIO]:
+    """
+    Try to become the process that owns writes to the shared table.
+
+    Returns the locked file, which must stay open for as long as this
+    process is the owner, or None if another live process holds it. The
+    lock is released by the kernel if the owner dies.
+    """
+    f = open(lock_file, "a")
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        f.close()
+        return None
+    return f
+
+
+def authkey_path(address: str) -> str:
+    """Where the owner listening on address keeps its connection key"""
+    return f"{address}.key"
+
+
+def _write_authkey(address: str) -> bytes:
+    """Create a fresh key, readable only by this user, for address"""
+    key = os.urandom(32)
+    path = authkey_path(address)
+    tmp = f"{path}.tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    os.replace(tmp, path)
+    return key
+
+
+def _read_authkey(address: str) -> bytes:
+    with open(authkey_path(address), "rb") as f:
+        return f.read()
+
+
+class SharedMemoryWriteServer:
+    """
+    Owner side: applies writes forwarded by reader processes.
+
+    Listens on a Unix socket readable only by this user, and only
+    accepts clients that prove they hold the key the owner wrote next to
+    it, since requests are pickled. Each connection gets a thread that
+    calls the named write method on dao, waits until store's shared
+    table publishes it, and replies with (result, store version).
+
+    Each publish re-encodes the whole store, coalescing the writes made
+    meanwhile. If the owner dies, no other process takes over: forwarded
+    writes fail until the workers restart, while reads keep serving the
+    last published generation.
+    """
+
+    def __init__(
+        self,
+        dao: FeatureConfigDao,
+        store,
+        address: str,
+        publish_timeout_seconds: float = 5.0,
+    ):
+        self.dao = dao
+        self.store = store
+        self.address = address
+        self.publish_timeout = publish_timeout_seconds
+        if os.path.exists(address):
+            os.unlink(address)
+        self._authkey = _write_authkey(address)
+        # the key is checked on each connection's own thread, so a
+        # client that never answers cannot stall accept()
+        self._listener = Listener(address, family="AF_UNIX")
+        os.chmod(address, 0o600)
+        self._closing = False
+        self._thread = threading.Thread(
+            target=self._accept,
+            name="shared-memory-writes",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        self._closing = True
+        try:
+            # wake the accept() call
+            Client(self.address, family="AF_UNIX").close()
+        except OSError:
+            pass
+        self._thread.join()
+        self._listener.close()
+
+    def _accept(self) -> None:
+        while True:
+            conn = self._listener.accept()
+            if self._closing:
+                conn.close()
+                return
+            threading.Thread(
+                target=self._serve, args=(conn,), daemon=True
+            ).start()
+
+    def _serve(self, conn: Connection) -> None:
+        with conn:
+            try:
+                # the server half of Client(authkey=...)'s handshake
+                deliver_challenge(conn, self._authkey)
+                answer_challenge(conn, self._authkey)
+            except (AuthenticationError, EOFError, OSError) as e:
+                logger.warning("Rejected a write connection: %s", e)
+                return
+            while True:
+                try:
+                    method, args = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    if method not in WRITE_METHODS:
+                        raise ValueError(f"Unknown write {method}")
+                    result = getattr(self.dao, method)(*args)
+                    self._wait_published(method)
+                    conn.send((True, result, self.store.version))
+                except Exception as e:
+                    logger.error("Forwarded %s failed: %s", method, e)
+                    conn.send((False, _forwarded_error(method, e), 0))
+
+    def _wait_published(self, method: str) -> None:
+        """Wait until readers can see the write just made"""
+        if not self.store.persistence.wait_published(self.publish_timeout):
+            logger.warning(
+                "Forwarded %s not published within %.1fs",
+                method,
+                self.publish_timeout,
+            )
+
+
+class SharedMemoryFeatureConfigDao(FeatureConfigDao):
+    """
+    FeatureConfigDao for processes that read the owner's shared table.
+
+    Reads decode straight from the newest published generation, so every
+    process shares one copy of the data. Writes are forwarded to the
+    owner, which replies once a generation containing them is published,
+    so a process always reads its own writes.
+    """
+
+    blocking_reads = False
+
+    def __init__(
+        self,
+        table_name: str = "featureflags",
+        write_address: str = "/tmp/featureflags.sock",
+    ):
+        self.table = SharedMemoryTableReader(table_name)
+        self.write_address = write_address
+        self._local = threading.local()
+        self._connections: List[Connection] = []
+        self._connections_lock = threading.Lock()
+        # sorted keys of one generation, which never changes
+        self._keys: Tuple[
+            Optional[SharedMemoryGeneration], Optional[SortedKeyIndex]
+        ] = (None, None)
+
+    @property
+    def version(self) -> int:
+        return self.table.header()[1]
+
+    def create_feature(self, feature: Feature) -> Feature:
+        return self._forward("create_feature", feature)
+
+    def get_feature(self, feature_name: str) -> Optional[Feature]:
+        current = self.table.current()
+        if current is None:
+            return None
+        return current.features.get(feature_name)
+
+    def create_override(
+        self,
+        feature_name: str,
+        override: FeatureOverride,
+    ) -> FeatureOverride:
+        return self._forward("create_override", feature_name, override)
+
+    def get_override(
+        self,
+        feature_name: str,
+        user_id: str,
+    ) -> Optional[FeatureOverride]:
+        current = self.table.current()
+        if current is None:
+            return None
+        group = current.overrides.get(feature_name)
+        return None if group is None else group.get(user_id)
+
+    def get_overrides_for_users(
+        self, feature_name: str, user_ids: Sequence[str]
+    ) -> Dict[str, Optional[FeatureOverride]]:
+        current = self.table.current()
+        group = None if current is None else current.overrides.get(
+            feature_name
+        )
+        if group is None:
+            return dict.fromkeys(user_ids)
+        return {user_id: group.get(user_id) for user_id in user_ids}
+
+    def delete_override(
+        self,
+        feature_name: str,
+        user_id: str,
+    ) -> Optional[FeatureOverride]:
+        return self._forward("delete_override", feature_name, user_id)
+
+    def list_features(
+        self, after: Optional[str] = None, limit: int = 100
+    ) -> List[Feature]:
+        current = self.table.current()
+        if current is None:
+            return []
+        return self._index(current).page(None, after, limit)
+
+    def list_overrides(
+        self,
+        feature_name: str,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[FeatureOverride]:
+        current = self.table.current()
+        if current is None:
+            return []
+        return self._index(current).page(feature_name, after, limit)
+
+    def bulk_write_overrides(
+        self,
+        feature_name: str,
+        changes: Mapping[str, Optional[FeatureOverride]],
+    ) -> Tuple[int, int]:
+        return self._forward("bulk_write_overrides", feature_name, changes)
+
+    def close(self) -> None:
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+        self.table.close()
+
+    def stats(self) -> dict:
+        generation, version = self.table.header()
+        return {"version": version, "generation": generation}
+
+    def _index(self, current: SharedMemoryGeneration) -> SortedKeyIndex:
+        generation, index = self._keys
+        if generation is not current:
+            index = SortedKeyIndex(
+                lambda name: current.features if name is None
+                else current.overrides.get(name)
+            )
+            self._keys = (current, index)
+        return index
+
+    def _forward(self, method: str, *args):
+        """Run a write in the owner and wait until it is published"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # read the key per connection: a restarted owner has a new one
+            conn = self._local.conn = Client(
+                self.write_address,
+                family="AF_UNIX",
+                authkey=_read_authkey(self.write_address),
+            )
+            with self._connections_lock:
+                self._connections.append(conn)
+        try:
+            conn.send((method, args))
+            ok, result, version = conn.recv()
+        except (EOFError, OSError):
+            # reconnect on the next write, e.g. after the owner restarts
+            self._local.conn = None
+            with self._connections_lock:
+                self._connections.remove(conn)
+            conn.close()
+            raise
+        if not ok:
+            raise result
+        if self.table.header()[1] < version:
+            logger.warning("Version %d not published yet", version)
+        return result
+
+
+def _forwarded_error(method: str, error: Exception) -> Exception:
+    """
+    Rebuild an owner-side error so it can be sent back and re-raised.
+
+    ValueError and LookupError keep their type, so a forwarded write
+    fails the same way, and maps to the same status, as a local one;
+    anything else becomes a RuntimeError.
+    """
+    for kind in (ValueError, LookupError):
+        if isinstance(error, kind):
+            return kind(str(error))
+    return RuntimeError(f"Owner rejected {method}: {error}")
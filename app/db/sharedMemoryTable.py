@@ -0,0 +1,346 @@
+"""
+Feature table published into POSIX shared memory for multi-process reads.
+
+One owner process publishes each generation of the store as a binary
+snapshot (see binarySnapshot) in its own segment, "<name>-<generation>".
+A small control segment, "<name>-control", holds a versioned header
+naming the current generation:
+
+    magic, sequence, generation, store version
+
+The header is written as a seqlock: sequence is odd while the owner is
+updating it, so readers retry instead of seeing a torn header. Readers
+map the current segment read-only and decode from it in place; when the
+header names a newer generation they map that one instead. The owner
+unlinks a generation as soon as its successor is published; readers
+that still map it keep a valid mapping until they move on.
+"""
+import io
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional, Sequence, Tuple
+
+try:
+    # SharedMemory's own shm_open, to map segments without it
+    from _posixshmem import shm_open
+except ImportError:
+    # not CPython on a POSIX system
+    shm_open = None
+
+from .binarySnapshot import (
+    BinarySnapshotReader,
+    _state_groups,
+    encode_binary_snapshot,
+)
+from .featurePersistence import (
+    FeaturePersistence,
+    FeatureState,
+    Mutation,
+    SnapshotFn,
+    SnapshotStats,
+)
+
+logger = logging.getLogger(__name__)
+
+CONTROL_MAGIC = b"FFSHM001"
+# magic, sequence, generation, store version
+CONTROL = struct.Struct("<8sQQQ")
+SEQUENCE = struct.Struct("<Q")
+SEQUENCE_OFFSET = 8
+PAYLOAD = struct.Struct("<QQ")
+PAYLOAD_OFFSET = 16
+
+
+def _map_readonly(name: str) -> mmap.mmap:
+    """
+    Map an existing segment read-only.
+
+    Readers map segments directly rather than through SharedMemory,
+    which in Python 3.11 registers them with the resource tracker, and
+    the tracker unlinks them when the reader exits even though the owner
+    is still publishing them.
+    """
+    if shm_open is None:
+        raise RuntimeError("Shared memory tables need POSIX shared memory")
+    fd = shm_open("/" + name, os.O_RDONLY, mode=0o600)
+    try:
+        return mmap.mmap(
+            fd, os.fstat(fd).st_size, prot=mmap.PROT_READ
+        )
+    finally:
+        os.close(fd)
+
+
+def _create(name: str, size: int) -> SharedMemory:
+    try:
+        return SharedMemory(name, create=True, size=size)
+    except FileExistsError:
+        # left behind by an owner that died
+        SharedMemory(name).unlink()
+        return SharedMemory(name, create=True, size=size)
+
+
+def _unlink(shm: SharedMemory) -> None:
+    shm.close()
+    shm.unlink()
+
+
+class SharedMemoryTable:
+    """Owner side: publishes generations of the store."""
+
+    def __init__(self, name: str = "featureflags"):
+        self.name = name
+        self.generation = 0
+        self.version = 0
+        self.published_bytes = 0
+        self._segment: Optional[SharedMemory] = None
+        self._remove_stale()
+        self._control = _create(f"{name}-control", CONTROL.size)
+        CONTROL.pack_into(self._control.buf, 0, CONTROL_MAGIC, 0, 0, 0)
+        self._lock = threading.Lock()
+
+    def publish(self, state: FeatureState) -> None:
+        """Encode state into a new generation and make it current."""
+        buffer = io.BytesIO()
+        encode_binary_snapshot(_state_groups(state), buffer)
+        data = buffer.getbuffer()
+        with self._lock:
+            generation = self.generation + 1
+            segment = _create(f"{self.name}-{generation}", len(data))
+            segment.buf[:len(data)] = data
+            self._write_header(generation, state.version)
+            previous, self._segment = self._segment, segment
+            self.generation = generation
+            self.version = state.version
+            self.published_bytes = len(data)
+        del data
+        if previous is not None:
+            _unlink(previous)
+        logger.debug(
+            "Published generation %d (%d bytes) to shared memory %s",
+            generation,
+            self.published_bytes,
+            self.name,
+        )
+
+    def close(self) -> None:
+        """Unlink every segment; readers keep what they have mapped."""
+        with self._lock:
+            # readers stop looking for generations and keep their last
+            self._write_header(0, self.version)
+            if self._segment is not None:
+                _unlink(self._segment)
+                self._segment = None
+            _unlink(self._control)
+
+    def _write_header(self, generation: int, version: int) -> None:
+        buf = self._control.buf
+        (sequence,) = SEQUENCE.unpack_from(buf, SEQUENCE_OFFSET)
+        SEQUENCE.pack_into(buf, SEQUENCE_OFFSET, sequence + 1)
+        PAYLOAD.pack_into(buf, PAYLOAD_OFFSET, generation, version)
+        SEQUENCE.pack_into(buf, SEQUENCE_OFFSET, sequence + 2)
+
+    def _remove_stale(self) -> None:
+        """Unlink the segments of an owner that died without closing"""
+        try:
+            control = SharedMemory(f"{self.name}-control")
+        except FileNotFoundError:
+            return
+        magic, _, generation, _ = CONTROL.unpack_from(control.buf, 0)
+        if magic == CONTROL_MAGIC and generation:
+            try:
+                SharedMemory(f"{self.name}-{generation}").unlink()
+            except FileNotFoundError:
+                pass
+        control.unlink()
+        control.close()
+        logger.info("Removed stale shared memory table %s", self.name)
+
+
+class SharedMemoryGeneration:
+    """
+    One mapped generation, decoded lazily like a binary snapshot.
+
+    The segment is unmapped when the last reference to the generation
+    (including its lazy override groups) goes away, so requests still
+    using a superseded generation keep a valid mapping.
+    """
+
+    def __init__(self, segment: mmap.mmap, generation: int):
+        self.segment = segment
+        self.generation = generation
+        state = BinarySnapshotReader(segment).state()
+        self.features = state.features
+        self.overrides = state.overrides
+
+
+class SharedMemoryTableReader:
+    """Reader side: maps whichever generation the header names."""
+
+    def __init__(self, name: str = "featureflags", timeout: float = 10.0):
+        self.name = name
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                self._control = _map_readonly(f"{name}-control")
+                break
+            except FileNotFoundError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+        self._current: Optional[SharedMemoryGeneration] = None
+        self._lock = threading.Lock()
+
+    def header(self) -> Tuple[int, int]:
+        """Return a consistent (generation, version) pair."""
+        buf = self._control
+        while True:
+            (before,) = SEQUENCE.unpack_from(buf, SEQUENCE_OFFSET)
+            if not before % 2:
+                generation, version = PAYLOAD.unpack_from(
+                    buf, PAYLOAD_OFFSET
+                )
+                if SEQUENCE.unpack_from(buf, SEQUENCE_OFFSET)[0] == before:
+                    return generation, version
+            time.sleep(0)
+
+    def current(self) -> Optional[SharedMemoryGeneration]:
+        """Return the newest published generation, mapping it if new."""
+        current = self._current
+        generation, _ = self.header()
+        if current is not None and current.generation == generation:
+            return current
+        with self._lock:
+            while generation and (
+                self._current is None
+                or self._current.generation != generation
+            ):
+                try:
+                    segment = _map_readonly(f"{self.name}-{generation}")
+                except FileNotFoundError:
+                    # superseded while we looked, or the owner withdrew
+                    # the table; read the header again
+                    generation, _ = self.header()
+                    continue
+                self._current = SharedMemoryGeneration(segment, generation)
+            return self._current
+
+    def close(self) -> None:
+        with self._lock:
+            self._current = None
+            self._control.close()
+
+
+class SharedMemoryPersistence(FeaturePersistence):
+    """
+    Publishes the store to a SharedMemoryTable after each write.
+
+    Wraps the persistence that makes the store durable. Publishing
+    re-encodes the whole store, so it runs on a background thread that
+    coalesces every write made since the last generation into the next.
+    """
+
+    def __init__(self, inner: FeaturePersistence, table: SharedMemoryTable):
+        self.inner = inner
+        self.table = table
+        self._snapshot: Optional[SnapshotFn] = None
+        # writes marked for publishing, and how many of them are published
+        self._requested = 0
+        self._published = 0
+        self._closing = False
+        self._cond = threading.Condition()
+        self._publisher: Optional[threading.Thread] = None
+
+    @property
+    def snapshot_stats(self) -> SnapshotStats:
+        return self.inner.snapshot_stats
+
+    @property
+    def ordered(self) -> bool:
+        return self.inner.ordered
+
+    @property
+    def blocking(self) -> bool:
+        return self.inner.blocking
+
+    def open(self, snapshot: SnapshotFn) -> FeatureState:
+        self._snapshot = snapshot
+        state = self.inner.open(snapshot)
+        self.table.publish(state)
+        self._publisher = threading.Thread(
+            target=self._run,
+            name="shared-memory-publisher",
+            daemon=True,
+        )
+        self._publisher.start()
+        return state
+
+    def persist(self, mutation: Mutation) -> Optional[threading.Event]:
+        pending = self.inner.persist(mutation)
+        self._mark_dirty()
+        return pending
+
+    def persist_batch(self, mutations: Sequence[Mutation]) -> None:
+        self.inner.persist_batch(mutations)
+        self._mark_dirty()
+
+    def flush(self) -> None:
+        """Block until every write so far is in a published generation."""
+        self.wait_published()
+
+    def wait_published(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every write so far is in a published generation.
+
+        Returns False if timeout seconds pass first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            target = self._requested
+            while self._published < target and self._publisher.is_alive():
+                remaining = 0.1
+                if deadline is not None:
+                    remaining = min(remaining, deadline - time.monotonic())
+                    if remaining <= 0:
+                        return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self) -> None:
+        """Close the inner store, then withdraw the shared table."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        if self._publisher is not None:
+            self._publisher.join()
+        self.inner.close()
+        self.table.close()
+
+    def _mark_dirty(self) -> None:
+        with self._cond:
+            self._requested += 1
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while (
+                    self._published == self._requested
+                    and not self._closing
+                ):
+                    self._cond.wait()
+                target = self._requested
+                if self._published == target:
+                    return
+            try:
+                self.table.publish(self._snapshot())
+            except Exception as e:
+                logger.error("Error publishing to shared memory: %s", e)
+            with self._cond:
+                self._published = target
+                self._cond.notify_all()
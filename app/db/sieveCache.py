@@ -0,0 +1,174 @@
+import threading
+import time
+from typing import Callable, Dict, Hashable, Optional
+
+MISSING = object()
+
+
+class _Entry:
+    __slots__ = (
+        "key", "value", "expires_at", "size", "tag", "visited", "newer",
+        "older",
+    )
+
+    def __init__(self, key, value, expires_at: float, size: int, tag):
+        self.key = key
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+        self.tag = tag
+        self.visited = False
+        self.newer: Optional["_Entry"] = None
+        self.older: Optional["_Entry"] = None
+
+
+class SieveCache:
+    """
+    Bounded TTL cache evicting with SIEVE.
+
+    Entries sit in one queue in insertion order, with one dict indexing
+    them by key. A hit only sets the entry's visited bit, so lookups take
+    no lock and never reorder the queue. To make room, a hand sweeps from
+    the oldest entry towards the newest, clearing visited bits and
+    evicting the first entry without one, so an entry hit since the hand
+    last passed survives and a one-off scan of new keys evicts itself.
+    Every operation is amortized O(1).
+
+    The cache is bounded by max_entries and, when sizeof is given, by
+    max_bytes as estimated by sizeof(key, value).
+
+    Entries can carry a tag, and lookups passing a different tag miss.
+    Tagging entries with a generation number lets callers invalidate a
+    whole group of entries in O(1) by moving to the next generation;
+    the orphaned entries are never hit again, so eviction reclaims them.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 100_000,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Hashable, object], int]] = None,
+    ):
+        if max_bytes is not None and sizeof is None:
+            raise ValueError("max_bytes requires sizeof")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.bytes = 0
+        self.evictions = 0
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._newest: Optional[_Entry] = None
+        self._oldest: Optional[_Entry] = None
+        self._hand: Optional[_Entry] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not MISSING
+
+    def get(self, key: Hashable, default=MISSING, tag=None):
+        """Return the live value for key, or default."""
+        entry = self._entries.get(key)
+        if (
+            entry is None
+            or entry.tag != tag
+            or entry.expires_at <= time.monotonic()
+        ):
+            return default
+        entry.visited = True
+        return entry.value
+
+    def get_stale(
+        self,
+        key: Hashable,
+        max_stale_seconds: float,
+        default=MISSING,
+        tag=None,
+    ):
+        """Return the value for key if it expired at most that long ago."""
+        entry = self._entries.get(key)
+        if (
+            entry is None
+            or entry.tag != tag
+            or entry.expires_at + max_stale_seconds <= time.monotonic()
+        ):
+            return default
+        entry.visited = True
+        return entry.value
+
+    def put(
+        self, key: Hashable, value, ttl_seconds: float, tag=None
+    ) -> None:
+        """Insert or replace key, evicting as needed to stay in budget."""
+        expires_at = time.monotonic() + ttl_seconds
+        size = self.sizeof(key, value) if self.sizeof else 0
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.bytes += size - entry.size
+                entry.value = value
+                entry.expires_at = expires_at
+                entry.size = size
+                entry.tag = tag
+            else:
+                entry = _Entry(key, value, expires_at, size, tag)
+                self._entries[key] = entry
+                self.bytes += size
+                entry.older = self._newest
+                if self._newest is not None:
+                    self._newest.newer = entry
+                self._newest = entry
+                if self._oldest is None:
+                    self._oldest = entry
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None
+                and self.bytes > self.max_bytes
+                and len(self._entries) > 1
+            ):
+                self._evict()
+
+    def pop(self, key: Hashable) -> None:
+        """Remove key if present."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._unlink(entry)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = {}
+            self._newest = self._oldest = self._hand = None
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "evictions": self.evictions,
+        }
+
+    def _evict(self) -> None:
+        entry = self._hand or self._oldest
+        while entry.visited:
+            entry.visited = False
+            entry = entry.newer or self._oldest
+        self._hand = entry.newer
+        del self._entries[entry.key]
+        self._unlink(entry)
+        self.evictions += 1
+
+    def _unlink(self, entry: _Entry) -> None:
+        if self._hand is entry:
+            self._hand = entry.newer
+        if entry.newer is not None:
+            entry.newer.older = entry.older
+        else:
+            self._newest = entry.older
+        if entry.older is not None:
+            entry.older.newer = entry.newer
+        else:
+            self._oldest = entry.newer
+        entry.newer = entry.older = None
+        self.bytes -= entry.size
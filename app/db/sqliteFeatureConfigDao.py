@@ -0,0 +1,327 @@
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .featureConfigDao import FeatureConfigDao
+from ..items.feature import Feature
+from ..items.featureOverride import FeatureOverride
+from ..items.rollout import Rollout
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS features (
+        feature_name TEXT PRIMARY KEY,
+        value TEXT NOT NULL,
+        feature_description TEXT,
+        timestamp TEXT,
+        rollout TEXT
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS overrides (
+        feature_name TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        value TEXT NOT NULL,
+        justification TEXT,
+        is_default INTEGER,
+        timestamp TEXT,
+        PRIMARY KEY (feature_name, user_id)
+    ) WITHOUT ROWID
+    """,
+)
+
+# Statements are kept constant so each connection's statement cache
+# prepares them once and reuses them.
+FEATURE_COLUMNS = (
+    "feature_name, value, feature_description, timestamp, rollout"
+)
+UPSERT_FEATURE = (
+    f"INSERT OR REPLACE INTO features ({FEATURE_COLUMNS}) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+SELECT_FEATURE = (
+    f"SELECT {FEATURE_COLUMNS} FROM features WHERE feature_name = ?"
+)
+UPSERT_OVERRIDE = (
+    "INSERT OR REPLACE INTO overrides "
+    "(feature_name, user_id, value, justification, is_default, timestamp) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+OVERRIDE_COLUMNS = (
+    "feature_name, user_id, value, justification, is_default, timestamp"
+)
+SELECT_OVERRIDE = (
+    f"SELECT {OVERRIDE_COLUMNS} FROM overrides "
+    "WHERE feature_name = ? AND user_id = ?"
+)
+DELETE_OVERRIDE = (
+    "DELETE FROM overrides WHERE feature_name = ? AND user_id = ? "
+    f"RETURNING {OVERRIDE_COLUMNS}"
+)
+LIST_FEATURES = (
+    f"SELECT {FEATURE_COLUMNS} FROM features "
+    "WHERE feature_name > ? ORDER BY feature_name LIMIT ?"
+)
+LIST_OVERRIDES = (
+    f"SELECT {OVERRIDE_COLUMNS} FROM overrides "
+    "WHERE feature_name = ? AND user_id > ? ORDER BY user_id LIMIT ?"
+)
+
+# Bulk lookups bind at most this many keys per statement
+BULK_CHUNK_SIZE = 500
+
+
+def _chunks(keys: Sequence[str]):
+    for start in range(0, len(keys), BULK_CHUNK_SIZE):
+        chunk = keys[start:start + BULK_CHUNK_SIZE]
+        yield chunk, ", ".join("?" * len(chunk))
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return None if value is None else value.isoformat()
+
+
+def _timestamp(value: Optional[str]) -> Optional[datetime]:
+    return None if value is None else datetime.fromisoformat(value)
+
+
+def _feature_from_row(row) -> Feature:
+    return Feature.model_construct(
+        feature_name=row[0],
+        value=row[1],
+        feature_description=row[2],
+        timestamp=_timestamp(row[3]),
+        rollout=None if row[4] is None else Rollout.model_validate_json(
+            row[4]
+        ),
+    )
+
+
+def _override_from_row(row) -> FeatureOverride:
+    return FeatureOverride.model_construct(
+        feature_name=row[0],
+        user_id=row[1],
+        value=row[2],
+        justification=row[3],
+        isDefault=None if row[4] is None else bool(row[4]),
+        timestamp=_timestamp(row[5]),
+    )
+
+
+class SqliteFeatureConfigDao(FeatureConfigDao):
+    """
+    FeatureConfigDao backed by a SQLite database in WAL mode.
+
+    Each thread gets its own connection, which suits FastAPI running sync
+    endpoints on a threadpool: WAL lets readers proceed while a writer
+    commits, and per-thread connections avoid sharing a connection
+    across threads. Lookups go through the (feature_name, user_id)
+    primary key, so neither reads nor writes grow with the dataset.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "/tmp/features.db",
+        synchronous: str = "NORMAL",
+        busy_timeout_ms: int = 5000,
+    ):
+        self.db_path = db_path
+        self.synchronous = synchronous
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        with self._connection() as conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+            columns = {
+                row[1]
+                for row in conn.execute("PRAGMA table_info(features)")
+            }
+            if "rollout" not in columns:
+                # a database from before rollouts
+                conn.execute("ALTER TABLE features ADD COLUMN rollout TEXT")
+        logger.info("Opened SQLite feature store: %s", db_path)
+
+    def create_feature(self, feature: Feature) -> Feature:
+        with self._connection() as conn:
+            conn.execute(
+                UPSERT_FEATURE,
+                (
+                    feature.feature_name,
+                    feature.value,
+                    feature.feature_description,
+                    _isoformat(feature.timestamp),
+                    None if feature.rollout is None
+                    else feature.rollout.model_dump_json(),
+                ),
+            )
+        return feature
+
+    def get_feature(self, feature_name: str) -> Optional[Feature]:
+        row = self._connection().execute(
+            SELECT_FEATURE, (feature_name,)
+        ).fetchone()
+        return None if row is None else _feature_from_row(row)
+
+    def create_override(
+        self,
+        feature_name: str,
+        override: FeatureOverride,
+    ) -> FeatureOverride:
+        with self._connection() as conn:
+            conn.execute(
+                UPSERT_OVERRIDE,
+                (
+                    feature_name,
+                    override.user_id,
+                    override.value,
+                    override.justification,
+                    override.isDefault,
+                    _isoformat(override.timestamp),
+                ),
+            )
+        return override
+
+    def get_override(
+        self,
+        feature_name: str,
+        user_id: str,
+    ) -> Optional[FeatureOverride]:
+        row = self._connection().execute(
+            SELECT_OVERRIDE, (feature_name, user_id)
+        ).fetchone()
+        return None if row is None else _override_from_row(row)
+
+    def delete_override(
+        self,
+        feature_name: str,
+        user_id: str,
+    ) -> Optional[FeatureOverride]:
+        with self._connection() as conn:
+            rows = conn.execute(
+                DELETE_OVERRIDE, (feature_name, user_id)
+            ).fetchall()
+        return _override_from_row(rows[0]) if rows else None
+
+    def list_features(
+        self, after: Optional[str] = None, limit: int = 100
+    ) -> List[Feature]:
+        rows = self._connection().execute(
+            LIST_FEATURES, (after or "", limit)
+        )
+        return [_feature_from_row(row) for row in rows]
+
+    def list_overrides(
+        self,
+        feature_name: str,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[FeatureOverride]:
+        rows = self._connection().execute(
+            LIST_OVERRIDES, (feature_name, after or "", limit)
+        )
+        return [_override_from_row(row) for row in rows]
+
+    def bulk_write_overrides(
+        self,
+        feature_name: str,
+        changes: Mapping[str, Optional[FeatureOverride]],
+    ) -> Tuple[int, int]:
+        upserts = [
+            (
+                feature_name,
+                override.user_id,
+                override.value,
+                override.justification,
+                override.isDefault,
+                _isoformat(override.timestamp),
+            )
+            for override in changes.values()
+            if override is not None
+        ]
+        deletes = [
+            (feature_name, user_id)
+            for user_id, override in changes.items()
+            if override is None
+        ]
+        # one transaction, so readers see all of the batch or none
+        with self._connection() as conn:
+            conn.executemany(UPSERT_OVERRIDE, upserts)
+            deleted = conn.executemany(
+                "DELETE FROM overrides WHERE feature_name = ? AND user_id = ?",
+                deletes,
+            ).rowcount
+        return len(upserts), max(deleted, 0)
+
+    def get_features(
+        self, feature_names: Sequence[str]
+    ) -> Dict[str, Optional[Feature]]:
+        found = {}
+        conn = self._connection()
+        for chunk, placeholders in _chunks(feature_names):
+            for row in conn.execute(
+                f"SELECT {FEATURE_COLUMNS} FROM features "
+                f"WHERE feature_name IN ({placeholders})",
+                chunk,
+            ):
+                found[row[0]] = _feature_from_row(row)
+        return {name: found.get(name) for name in feature_names}
+
+    def get_overrides_for_user(
+        self, feature_names: Sequence[str], user_id: str
+    ) -> Dict[str, Optional[FeatureOverride]]:
+        found = {}
+        conn = self._connection()
+        for chunk, placeholders in _chunks(feature_names):
+            for row in conn.execute(
+                f"SELECT {OVERRIDE_COLUMNS} FROM overrides "
+                f"WHERE feature_name IN ({placeholders}) AND user_id = ?",
+                (*chunk, user_id),
+            ):
+                found[row[0]] = _override_from_row(row)
+        return {name: found.get(name) for name in feature_names}
+
+    def get_overrides_for_users(
+        self, feature_name: str, user_ids: Sequence[str]
+    ) -> Dict[str, Optional[FeatureOverride]]:
+        found = {}
+        conn = self._connection()
+        for chunk, placeholders in _chunks(user_ids):
+            for row in conn.execute(
+                f"SELECT {OVERRIDE_COLUMNS} FROM overrides "
+                f"WHERE feature_name = ? AND user_id IN ({placeholders})",
+                (feature_name, *chunk),
+            ):
+                found[row[1]] = _override_from_row(row)
+        return {user_id: found.get(user_id) for user_id in user_ids}
+
+    def close(self) -> None:
+        """Close every pooled connection."""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=self.busy_timeout_ms / 1000,
+                cached_statements=64,
+                # only this thread uses it; close() may run elsewhere
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={self.synchronous}")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
@@ -0,0 +1,237 @@
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from typing import Callable, Optional, Sequence
+
+from .featurePersistence import (
+    FeaturePersistence,
+    FeatureState,
+    Mutation,
+    SnapshotFn,
+    apply_mutation,
+    load_json_snapshot,
+    save_json_snapshot,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class WriteAheadLogPersistence(FeaturePersistence):
+    """
+    Appends one JSON line per mutation to a log next to the snapshot.
+
+    Once the log passes compact_max_bytes or compact_max_records it is
+    rotated and a background thread folds it into a fresh snapshot, so a
+    write costs O(1) regardless of how many features and overrides exist.
+    Startup replays the snapshot, then any log left over from an
+    interrupted compaction, then the live log.
+    """
+
+    ordered = True
+
+    def __init__(
+        self,
+        snapshot_file: str = "/tmp/features.json",
+        log_file: Optional[str] = None,
+        compact_max_bytes: int = 64 * 1024 * 1024,
+        compact_max_records: int = 100_000,
+        fsync: bool = False,
+        load_snapshot: Callable[[str], FeatureState] = load_json_snapshot,
+        save_snapshot: Callable[
+            [str, FeatureState], None
+        ] = save_json_snapshot,
+    ):
+        super().__init__()
+        self.snapshot_file = snapshot_file
+        self.log_file = log_file or f"{snapshot_file}.log"
+        self.compacting_file = f"{self.log_file}.compacting"
+        self.compact_max_bytes = compact_max_bytes
+        self.compact_max_records = compact_max_records
+        self.fsync = fsync
+        self.load_snapshot = load_snapshot
+        self.save_snapshot = save_snapshot
+        self.log_bytes = 0
+        self.log_records = 0
+        self.compactions = 0
+        self._snapshot: Optional[SnapshotFn] = None
+        self._log = None
+        self._lock = threading.Lock()
+        self._compaction_thread: Optional[threading.Thread] = None
+
+    def open(self, snapshot: SnapshotFn) -> FeatureState:
+        self._snapshot = snapshot
+        state = self.load_snapshot(self.snapshot_file)
+        replayed = self._replay(self.compacting_file, state)
+        replayed += self._replay(self.log_file, state)
+        # a write torn by a crash was never acknowledged; drop it, or the
+        # next record would be appended to it and lost with it
+        self._truncate_torn_tail(self.log_file)
+        if os.path.exists(self.compacting_file):
+            # A previous compaction was interrupted; finish it before the
+            # next rotation overwrites the file
+            self.save_snapshot(self.snapshot_file, state)
+            os.remove(self.compacting_file)
+        if replayed:
+            logger.info(
+                "Replayed %d log records on top of %s",
+                replayed,
+                self.snapshot_file,
+            )
+        self._log = open(self.log_file, "ab")
+        self.log_bytes = self._log.tell()
+        self.log_records = replayed
+        return state
+
+    def persist_batch(self, mutations: Sequence[Mutation]) -> None:
+        data = "".join(
+            json.dumps(m.to_record(), separators=(",", ":")) + "\n"
+            for m in mutations
+        ).encode("utf-8")
+        with self._lock:
+            self._append(data, len(mutations))
+            self._maybe_compact()
+
+    def compact(self) -> None:
+        """Fold the current log into the snapshot and wait for it."""
+        self._wait_for_compaction()
+        with self._lock:
+            self._start_compaction()
+        self._wait_for_compaction()
+
+    def close(self) -> None:
+        self._wait_for_compaction()
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    def _append(self, data: bytes, records: int) -> None:
+        self._log.write(data)
+        self._log.flush()
+        if self.fsync:
+            os.fsync(self._log.fileno())
+        self.log_bytes += len(data)
+        self.log_records += records
+
+    def _maybe_compact(self) -> None:
+        if (
+            self.log_bytes >= self.compact_max_bytes
+            or self.log_records >= self.compact_max_records
+        ):
+            self._start_compaction()
+
+    def _start_compaction(self) -> None:
+        """
+        Rotate the log and snapshot the state on a background thread.
+
+        Must be called with self._lock held. The snapshot is taken after
+        the rotation, so every mutation in the rotated log is in it and
+        any later one is in the new log; replaying a mutation twice is
+        harmless, so snapshot plus new log reproduces the live state.
+        Does nothing while a previous compaction is still running; its
+        snapshot thread may be waiting on a writer that waits on us.
+        """
+        if (
+            self._compaction_thread is not None
+            and self._compaction_thread.is_alive()
+        ):
+            return
+        self._log.close()
+        if os.path.exists(self.compacting_file):
+            # a failed compaction's records are in no snapshot yet; keep
+            # them for this one instead of overwriting them
+            with open(self.log_file, "rb") as log, open(
+                self.compacting_file, "ab"
+            ) as compacting:
+                shutil.copyfileobj(log, compacting)
+                compacting.flush()
+                if self.fsync:
+                    os.fsync(compacting.fileno())
+            os.remove(self.log_file)
+        else:
+            os.replace(self.log_file, self.compacting_file)
+        self._log = open(self.log_file, "ab")
+        self.log_bytes = 0
+        self.log_records = 0
+        self._compaction_thread = threading.Thread(
+            target=self._write_snapshot,
+            name="wal-compaction",
+            daemon=True,
+        )
+        self._compaction_thread.start()
+
+    def _write_snapshot(self) -> None:
+        try:
+            started = time.perf_counter()
+            state = self._snapshot()
+            self.save_snapshot(self.snapshot_file, state)
+            os.remove(self.compacting_file)
+            self.compactions += 1
+            self.snapshot_stats.record(state.version, started)
+            logger.debug(
+                "Compacted log into snapshot: %s",
+                self.snapshot_file,
+            )
+        except Exception as e:
+            logger.error(
+                "Error compacting log into %s: %s",
+                self.snapshot_file,
+                e,
+            )
+
+    def _wait_for_compaction(self) -> None:
+        thread = self._compaction_thread
+        if thread is not None:
+            thread.join()
+
+    @staticmethod
+    def _replay(path: str, state: FeatureState) -> int:
+        """Apply every complete record in a log file to state."""
+        count = 0
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        # torn by a crash mid-write
+                        break
+                    try:
+                        mutation = Mutation.from_record(json.loads(line))
+                    except (ValueError, KeyError, TypeError):
+                        logger.warning(
+                            "Skipping unreadable record in log %s",
+                            path,
+                        )
+                        continue
+                    apply_mutation(state, mutation)
+                    count += 1
+        except FileNotFoundError:
+            pass
+        return count
+
+    @staticmethod
+    def _truncate_torn_tail(path: str) -> None:
+        """Cut a log file back to the end of its last complete record."""
+        try:
+            with open(path, "rb+") as f:
+                end = f.seek(0, os.SEEK_END)
+                position = end
+                while position > 0:
+                    start = max(0, position - 65536)
+                    f.seek(start)
+                    newline = f.read(position - start).rfind(b"\n")
+                    if newline != -1:
+                        position = start + newline + 1
+                        break
+                    position = start
+                if position != end:
+                    logger.warning(
+                        "Dropping %d bytes of a torn record from log %s",
+                        end - position,
+                        path,
+                    )
+                    f.truncate(position)
+        except FileNotFoundError:
+            pass
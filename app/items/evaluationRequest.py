@@ -0,0 +1,13 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+
+class EvaluationRequest(BaseModel):
+    user_id: str = Field(
+        ..., min_length=1,
+        description="The user ID to evaluate the features for"
+    )
+    feature_names: List[str] = Field(
+        ..., min_length=1, max_length=1000,
+        description="The names of the feature flags to evaluate"
+    )
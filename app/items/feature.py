@@ -2,6 +2,8 @@ from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional
 
+from .rollout import Rollout
+
 
 class Feature(BaseModel):
     feature_name: str = Field(
@@ -19,3 +21,14 @@ class Feature(BaseModel):
         default=None,
         description="The timestamp when this configuration was created"
     )
+    rollout: Optional[Rollout] = Field(
+        default=None,
+        description="Optional percentage rollout of other values, by "
+                    "hashing each user ID; users it leaves out get value"
+    )
+
+    def rollout_value(self, user_id: str) -> Optional[str]:
+        """Return the rollout variant a user gets, None if left out."""
+        if self.rollout is None:
+            return None
+        return self.rollout.value_for(self.feature_name, user_id)
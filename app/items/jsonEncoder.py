@@ -0,0 +1,106 @@
+import json
+from datetime import date, datetime, time
+from operator import attrgetter
+from typing import Any, Callable, Dict, Tuple, Type, get_args
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+AUTO = "auto"
+ORJSON = "orjson"
+STDLIB = "json"
+# FastAPI's own path: model_dump(), jsonable_encoder, then json.dumps
+FASTAPI = "fastapi"
+
+# (field names, getter returning their values as a tuple, names of the
+# fields that may hold models)
+Layout = Tuple[
+    Tuple[str, ...], Callable[[BaseModel], tuple], Tuple[str, ...]
+]
+
+
+def _holds_model(annotation: Any) -> bool:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return True
+    return any(_holds_model(arg) for arg in get_args(annotation))
+
+
+class JsonEncoder:
+    """
+    Encodes response bodies byte for byte as FastAPI would, only faster.
+
+    FastAPI dumps each model to a dict, walks the result again with
+    jsonable_encoder and then calls json.dumps. Here a model's fields
+    are read straight off it through a layout computed once per class,
+    and the dict goes to orjson in one call, or json.dumps when orjson
+    is not installed, with datetimes formatted as jsonable_encoder does.
+    The FASTAPI backend keeps the original path, for comparison.
+    """
+
+    def __init__(self, backend: str = AUTO):
+        if backend == AUTO:
+            backend = STDLIB if orjson is None else ORJSON
+        if backend == ORJSON and orjson is None:
+            raise ValueError("The orjson backend needs orjson installed")
+        if backend not in (ORJSON, STDLIB, FASTAPI):
+            raise ValueError(f"Unknown JSON encoder {backend}")
+        self.backend = backend
+        self._layouts: Dict[Type[BaseModel], Layout] = {}
+
+    def dump_item(self, model: BaseModel) -> Dict[str, Any]:
+        """Return a model's fields as a dict, like model_dump()."""
+        if self.backend == FASTAPI:
+            return model.model_dump()
+        layout = self._layouts.get(type(model))
+        if layout is None:
+            layout = self._layouts[type(model)] = self._layout(type(model))
+        names, getter, nested = layout
+        fields = dict(zip(names, getter(model)))
+        for name in nested:
+            if fields[name] is not None:
+                # e.g. a feature's rollout; few have one
+                fields[name] = model.model_dump(include={name})[name]
+        return fields
+
+    @staticmethod
+    def _layout(model_class: Type[BaseModel]) -> Layout:
+        names = tuple(model_class.model_fields)
+        getter = attrgetter(*names)
+        if len(names) == 1:
+            # attrgetter of one name returns the bare value
+            def getter(model, _get=getter):
+                return (_get(model),)
+        nested = tuple(
+            name
+            for name, field in model_class.model_fields.items()
+            if _holds_model(field.annotation)
+        )
+        return names, getter, nested
+
+    def dumps(self, content: Any) -> bytes:
+        """Encode content exactly as FastAPI encodes a returned dict."""
+        if self.backend == ORJSON:
+            return orjson.dumps(content, default=self._default)
+        if self.backend == STDLIB:
+            return json.dumps(
+                content,
+                ensure_ascii=False,
+                allow_nan=False,
+                indent=None,
+                separators=(",", ":"),
+                default=self._default,
+            ).encode("utf-8")
+        return JSONResponse(jsonable_encoder(content)).body
+
+    def _default(self, value: Any) -> Any:
+        if isinstance(value, (datetime, date, time)):
+            return value.isoformat()
+        # anything else, models included, takes FastAPI's rules; routes
+        # pass dump_item() dicts instead, which format datetimes as above
+        return jsonable_encoder(value)
@@ -0,0 +1,32 @@
+from pydantic import BaseModel, Field, model_validator
+from datetime import datetime
+from typing import Optional
+
+
+class OverrideChange(BaseModel):
+    user_id: str = Field(
+        ..., min_length=1,
+        description="The user ID whose override changes"
+    )
+    value: Optional[str] = Field(
+        default=None, min_length=1,
+        description="The override value; required unless deleting"
+    )
+    justification: Optional[str] = Field(
+        default=None, min_length=1,
+        description="Optional override justification"
+    )
+    delete: bool = Field(
+        default=False,
+        description="Remove the user's override instead of setting it"
+    )
+    timestamp: Optional[datetime] = Field(
+        default=None,
+        description="The timestamp when this configuration was created"
+    )
+
+    @model_validator(mode="after")
+    def check_value(self) -> "OverrideChange":
+        if self.value is None and not self.delete:
+            raise ValueError("value is required unless delete is true")
+        return self
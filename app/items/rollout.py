@@ -0,0 +1,71 @@
+from bisect import bisect_right
+from functools import cached_property
+from hashlib import blake2b
+from typing import List, Optional, Tuple
+
+from pydantic import BaseModel, Field, model_validator
+
+# Users are hashed into this many buckets, so percentages resolve to
+# hundredths of a percent
+BUCKETS = 10_000
+
+
+class RolloutVariant(BaseModel):
+    value: str = Field(
+        ..., min_length=1, description="The value this share of users gets"
+    )
+    percentage: float = Field(
+        ..., ge=0, le=100, description="The share of users, 0 to 100"
+    )
+
+
+class Rollout(BaseModel):
+    variants: List[RolloutVariant] = Field(
+        ..., min_length=1,
+        description="Variants in bucket order; users past them all get "
+                    "the feature's value"
+    )
+    salt: str = Field(
+        default="",
+        description="Changing it reassigns which users get each variant"
+    )
+
+    @cached_property
+    def _plan(self) -> Tuple[Tuple[int, ...], Tuple[str, ...]]:
+        """Each variant's last bucket + 1, and the values, to bisect."""
+        cutoffs = []
+        total = 0.0
+        for variant in self.variants:
+            total += variant.percentage
+            cutoffs.append(round(total * BUCKETS / 100))
+        return tuple(cutoffs), tuple(v.value for v in self.variants)
+
+    @model_validator(mode="after")
+    def _check_total(self) -> "Rollout":
+        total = sum(variant.percentage for variant in self.variants)
+        # with room for float rounding, e.g. 33.33 + 33.33 + 33.34
+        if total > 100 + 1e-9:
+            raise ValueError("Rollout percentages add up to more than 100")
+        return self
+
+    def value_for(self, feature_name: str, user_id: str) -> Optional[str]:
+        """Return the variant user_id falls into, None if past them all."""
+        cutoffs, values = self._plan
+        index = bisect_right(
+            cutoffs, rollout_bucket(feature_name, user_id, self.salt)
+        )
+        return values[index] if index < len(values) else None
+
+
+def rollout_bucket(feature_name: str, user_id: str, salt: str = "") -> int:
+    """
+    Hash a user into one of BUCKETS buckets for a feature.
+
+    Deterministic across processes and restarts, unlike hash(), and
+    independent between features and salts, so the users in one
+    feature's first 10% are not those of another's.
+    """
+    digest = blake2b(
+        f"{feature_name}\0{salt}\0{user_id}".encode(), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "big") % BUCKETS
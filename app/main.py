@@ -1,29 +1,386 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from starlette.requests import ClientDisconnect
+import json
 import logging
 import os
-
-from .activity.configureFeature import (
-    configure_feature as configure_feature_activity,
+import zlib
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
 )
+
+from .activity.configureFeature import configure_feature_async
 from .activity.configureFeatureForUser import (
-    configure_feature_for_user as configure_feature_for_user_activity,
+    configure_feature_for_user_async,
+)
+from .activity.getFeature import get_feature_async
+from .activity.getFeatureForUser import get_feature_for_user_async
+from .activity.evaluateFeatures import evaluate_features_async
+from .activity.evaluateFeatureForUsers import (
+    Evaluation,
+    evaluate_feature_for_users_async,
 )
-from .activity.getFeature import get_feature as get_feature_activity
-from .activity.getFeatureForUser import (
-    get_feature_for_user as get_feature_for_user_activity,
+from .activity.deleteFeatureForUser import delete_feature_for_user_async
+from .activity.exportStore import export_store_async
+from .activity.getChanges import (
+    ChangeSet,
+    get_changes_async,
+    watch_changes_async,
 )
-from .activity.deleteFeatureForUser import (
-    delete_feature_for_user as delete_feature_for_user_activity,
+from .activity.importOverrides import apply_overrides_async
+from .activity.listFeatures import (
+    InvalidCursor,
+    list_features_async,
+    list_overrides_async,
 )
+from .db.asyncDaoAdapter import as_async_dao
+from .db.asyncFeatureConfigDao import AsyncFeatureConfigDao
 from .db.cachedFeatureConfigDao import CachedFeatureConfigDao
+from .db.changeLog import ChangeLog, ResyncRequired
+from .db.binarySnapshot import (
+    BinarySnapshotPersistence,
+    load_binary_snapshot,
+    save_binary_snapshot,
+)
+from .db.featurePersistence import (
+    JsonSnapshotPersistence,
+    load_json_snapshot,
+    save_json_snapshot,
+)
+from .db.groupCommitPersistence import GroupCommitPersistence, SYNC
 from .db.inMemoryFeatureConfigDao import InMemoryFeatureConfigDao
+from .db.invalidationBus import UnixSocketInvalidationBus
+from .db.responseCache import ResponseCache
+from .db.shardedPersistence import ShardedSnapshotPersistence
+from .db.sharedCache import SqliteSharedCache
+from .db.sharedMemoryFeatureConfigDao import (
+    SharedMemoryFeatureConfigDao,
+    SharedMemoryWriteServer,
+    acquire_ownership,
+)
+from .db.sharedMemoryTable import SharedMemoryPersistence, SharedMemoryTable
+from .db.sqliteFeatureConfigDao import SqliteFeatureConfigDao
+from .db.writeAheadLog import WriteAheadLogPersistence
+from .items.evaluationRequest import EvaluationRequest
 from .items.feature import Feature
+from .items.jsonEncoder import JsonEncoder
 from .items.featureOverride import FeatureOverride
+from .items.overrideChange import OverrideChange
+
+
+FEATURE_DAO = os.getenv("FEATURE_DAO", "memory").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "/tmp/features.db")
+SNAPSHOT_FORMAT = os.getenv("SNAPSHOT_FORMAT", "json").lower()
+CACHE_FILE = os.getenv(
+    "CACHE_FILE",
+    "/tmp/features.bin" if SNAPSHOT_FORMAT == "binary"
+    else "/tmp/features.json",
+)
+PERSISTENCE_MODE = os.getenv("PERSISTENCE_MODE", "snapshot").lower()
+PERSISTENCE_DURABILITY = os.getenv(
+    "PERSISTENCE_DURABILITY", SYNC
+).lower()
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", 300))
+CACHE_NEGATIVE_TTL_SECONDS = float(
+    os.getenv("CACHE_NEGATIVE_TTL_SECONDS", 30)
+)
+CACHE_STALE_SECONDS = float(os.getenv("CACHE_STALE_SECONDS", 0))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 100_000))
+CACHE_MAX_BYTES = os.getenv("CACHE_MAX_BYTES")
+INVALIDATION_SOCKET_DIR = os.getenv("INVALIDATION_SOCKET_DIR")
+SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH")
+SHARED_CACHE_MAX_ENTRIES = int(
+    os.getenv("SHARED_CACHE_MAX_ENTRIES", 1_000_000)
+)
+IMPORT_MAX_OVERRIDES = int(os.getenv("IMPORT_MAX_OVERRIDES", 1_000_000))
+BODY_MAX_LINE_BYTES = int(os.getenv("BODY_MAX_LINE_BYTES", 1 << 20))
+# invalid lines an import reports before it stops reading
+IMPORT_MAX_ERRORS = 100
+RESPONSE_CACHE_MAX_ENTRIES = int(
+    os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 100_000)
+)
+CHANGE_LOG_MAX_ENTRIES = int(os.getenv("CHANGE_LOG_MAX_ENTRIES", 10_000))
+JSON_ENCODER = os.getenv("JSON_ENCODER", "auto").lower()
+SHARED_MEMORY_NAME = os.getenv("SHARED_MEMORY_NAME", "featureflags")
+SHARED_MEMORY_SOCKET = os.getenv(
+    "SHARED_MEMORY_SOCKET", "/tmp/featureflags.sock"
+)
+
+
+def build_persistence(
+    mode: str, durability: str, cache_file: str, snapshot_format: str
+):
+    """Select how the in-memory store is made durable."""
+    if snapshot_format == "json":
+        snapshot_cls = JsonSnapshotPersistence
+        load_snapshot, save_snapshot = load_json_snapshot, save_json_snapshot
+    elif snapshot_format == "binary":
+        snapshot_cls = BinarySnapshotPersistence
+        load_snapshot = load_binary_snapshot
+        save_snapshot = save_binary_snapshot
+    else:
+        raise ValueError(f"Unknown snapshot format {snapshot_format}")
+    if mode == "snapshot":
+        persistence = snapshot_cls(cache_file)
+    elif mode == "wal":
+        persistence = WriteAheadLogPersistence(
+            cache_file,
+            compact_max_bytes=int(
+                os.getenv("WAL_COMPACT_MAX_BYTES", 64 * 1024 * 1024)
+            ),
+            compact_max_records=int(
+                os.getenv("WAL_COMPACT_MAX_RECORDS", 100_000)
+            ),
+            load_snapshot=load_snapshot,
+            save_snapshot=save_snapshot,
+        )
+    elif mode == "sharded":
+        persistence = ShardedSnapshotPersistence(
+            os.getenv("SHARD_DIR", f"{cache_file}.shards"),
+            shard_count=int(os.getenv("SHARD_COUNT", 64)),
+            load_workers=int(os.getenv("SHARD_LOAD_WORKERS", 8)),
+            suffix=".bin" if snapshot_format == "binary" else ".json",
+            load_snapshot=load_snapshot,
+            save_snapshot=save_snapshot,
+        )
+    else:
+        raise ValueError(f"Unknown persistence mode {mode}")
+    if durability == SYNC:
+        return persistence
+    return GroupCommitPersistence(
+        persistence,
+        durability=durability,
+        flush_interval_seconds=float(
+            os.getenv("PERSISTENCE_FLUSH_INTERVAL_MS", 5)
+        ) / 1000,
+        max_batch_size=int(os.getenv("PERSISTENCE_FLUSH_MAX_WRITES", 1000)),
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    if write_server is not None:
+        write_server.close()
+    # drain write-behind queues before the process exits
+    await async_dao().close()
+
+
+def build_base_dao(kind: str):
+    """Select the backing store behind the cache."""
+    global shared_memory_lock
+    if kind in ("memory", "shared"):
+        persistence = build_persistence(
+            PERSISTENCE_MODE,
+            PERSISTENCE_DURABILITY,
+            CACHE_FILE,
+            SNAPSHOT_FORMAT,
+        )
+        if kind == "shared":
+            # the first worker to take the lock owns writes; the others
+            # read the table it publishes
+            shared_memory_lock = acquire_ownership(
+                f"{SHARED_MEMORY_SOCKET}.lock"
+            )
+            if shared_memory_lock is None:
+                return SharedMemoryFeatureConfigDao(
+                    SHARED_MEMORY_NAME, SHARED_MEMORY_SOCKET
+                )
+            persistence = SharedMemoryPersistence(
+                persistence, SharedMemoryTable(SHARED_MEMORY_NAME)
+            )
+        return InMemoryFeatureConfigDao(CACHE_FILE, persistence)
+    if kind == "sqlite":
+        return SqliteFeatureConfigDao(SQLITE_PATH)
+    raise ValueError(f"Unknown feature DAO {kind}")
+
+
+app = FastAPI(lifespan=lifespan)
+shared_memory_lock = None
+base_dao = build_base_dao(FEATURE_DAO)
+if isinstance(base_dao, SharedMemoryFeatureConfigDao):
+    # a private cache would hide writes made through other workers
+    dao = base_dao
+else:
+    dao = CachedFeatureConfigDao(
+        base_dao,
+        ttl_seconds=CACHE_TTL_SECONDS,
+        invalidation_bus=(
+            UnixSocketInvalidationBus(INVALIDATION_SOCKET_DIR)
+            if INVALIDATION_SOCKET_DIR
+            else None
+        ),
+        max_entries=CACHE_MAX_ENTRIES,
+        max_bytes=int(CACHE_MAX_BYTES) if CACHE_MAX_BYTES else None,
+        negative_ttl_seconds=CACHE_NEGATIVE_TTL_SECONDS,
+        stale_while_revalidate_seconds=CACHE_STALE_SECONDS,
+        shared_cache=(
+            SqliteSharedCache(
+                SHARED_CACHE_PATH, max_entries=SHARED_CACHE_MAX_ENTRIES
+            )
+            if SHARED_CACHE_PATH
+            else None
+        ),
+    )
+write_server = None
+if shared_memory_lock is not None:
+    write_server = SharedMemoryWriteServer(
+        dao, base_dao, SHARED_MEMORY_SOCKET
+    )
+_async_dao: Optional[Tuple[object, AsyncFeatureConfigDao]] = None
+_response_cache: Optional[Tuple[object, Optional[ResponseCache]]] = None
+_change_log: Optional[Tuple[object, Optional[ChangeLog]]] = None
+json_encoder = JsonEncoder(JSON_ENCODER)
+
+
+def async_dao() -> AsyncFeatureConfigDao:
+    """Return the async view of dao, rebuilt if dao was replaced."""
+    global _async_dao
+    if _async_dao is None or _async_dao[0] is not dao:
+        _async_dao = (dao, as_async_dao(dao))
+    return _async_dao[1]
+
+
+def response_cache() -> Optional[ResponseCache]:
+    """
+    Return the response cache following dao, rebuilt if dao was replaced.
+
+    Only a CachedFeatureConfigDao reports the invalidations that keep
+    encoded responses current, so other DAOs get no response cache.
+    """
+    global _response_cache
+    if _response_cache is None or _response_cache[0] is not dao:
+        responses = None
+        if (
+            isinstance(dao, CachedFeatureConfigDao)
+            and RESPONSE_CACHE_MAX_ENTRIES > 0
+        ):
+            responses = ResponseCache(
+                RESPONSE_CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS
+            )
+            dao.add_invalidation_listener(responses.invalidate)
+        _response_cache = (dao, responses)
+    return _response_cache[1]
+
+
+def change_log() -> Optional[ChangeLog]:
+    """
+    Return the change log following dao, rebuilt if dao was replaced.
+
+    Like the response cache, it is fed by a CachedFeatureConfigDao's
+    invalidations, which include those of writes made through peers.
+    """
+    global _change_log
+    if _change_log is None or _change_log[0] is not dao:
+        changes = None
+        if isinstance(dao, CachedFeatureConfigDao):
+            changes = ChangeLog(CHANGE_LOG_MAX_ENTRIES)
+            dao.add_invalidation_listener(changes.record)
+        _change_log = (dao, changes)
+    return _change_log[1]
+
+
+def encode_json(content) -> bytes:
+    """Encode content exactly as FastAPI encodes a returned dict."""
+    return json_encoder.dumps(content)
 
 
-app = FastAPI()
-base_dao = InMemoryFeatureConfigDao()
-dao = CachedFeatureConfigDao(base_dao, ttl_seconds=300)
+def json_response(content) -> Response:
+    """
+    Respond with content encoded by json_encoder.
+
+    Routes return this rather than the dict, which FastAPI would walk
+    with jsonable_encoder before encoding it; the bytes are the same.
+    """
+    return Response(encode_json(content), media_type="application/json")
+
+
+def dump(model) -> dict:
+    """Return a model's fields, for json_response, like model_dump()."""
+    return json_encoder.dump_item(model)
+
+
+def version_etag(
+    feature_name: str, user_id: Optional[str] = None
+) -> Optional[str]:
+    """
+    Return the ETag of a feature's or a user's value, if writes are tagged.
+
+    Made from the change log's version of the last write the value
+    depends on, so it costs a dict lookup rather than hashing the body;
+    the log_id keeps tags of different logs from ever matching.
+
+    A 304 is sent without reading the store, so tags are only used when
+    every write reaches this process's log: the store is this process's
+    own memory, or an invalidation bus relays peers' writes. A store
+    shared without a bus, e.g. sqlite with several workers, gets none,
+    since a write through another worker would never change the tag.
+    """
+    changes = change_log()
+    if changes is None or not (
+        isinstance(dao.base_dao, InMemoryFeatureConfigDao)
+        or dao.invalidation_bus is not None
+    ):
+        return None
+    return f'"{changes.log_id}.{changes.tag(feature_name, user_id)}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Tell whether an If-None-Match header lists etag.
+
+    "*" is not honoured: it matches only when the resource exists, which
+    is not known before rendering, and a 304 for a 404 would be wrong.
+    """
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        if tag.strip().removeprefix("W/") == etag:
+            return True
+    return False
+
+
+async def respond_cached(
+    key: Hashable,
+    render: Callable[[], Awaitable[dict]],
+    etag: Optional[str] = None,
+):
+    """
+    Serve key's encoded response from the response cache.
+
+    On a miss, render() builds the response, which is encoded once and
+    kept until a write invalidates it. Errors render() raises, such as
+    404s, are not cached, and neither are bodies that may hold a value
+    the DAO served stale while refreshing it, which would otherwise
+    outlive the refresh by a whole TTL. etag must be read before
+    render() runs, so it is never newer than the body it is sent with.
+    """
+    headers = None if etag is None else {"ETag": etag}
+    responses = response_cache()
+    if responses is None:
+        return Response(
+            encode_json(await render()),
+            media_type="application/json",
+            headers=headers,
+        )
+    body = responses.get(key)
+    if body is None:
+        seen = responses.invalidations
+        stale_hits = dao.stale_hits
+        body = encode_json(await render())
+        if dao.stale_hits == stale_hits:
+            responses.put(key, body, seen)
+    return Response(body, media_type="application/json", headers=headers)
+
 
 log_level = os.getenv("LOG_LEVEL", "INFO").upper()
 logging.basicConfig(level=log_level)
@@ -34,75 +391,515 @@ PORT = int(os.getenv("PORT", 8080))
 
 
 @app.post("/feature")
-def configure_feature(feature: Feature):
+async def configure_feature(feature: Feature):
     logger.info("Configuring feature %s", feature.feature_name)
-    configuredFeat = configure_feature_activity(feature, dao)
-    return {"status": "accepted", "feature": configuredFeat.model_dump()}
+    configuredFeat = await configure_feature_async(feature, async_dao())
+    return json_response(
+        {"status": "accepted", "feature": dump(configuredFeat)}
+    )
 
 
 @app.post("/feature/{feature_name}")
-def configure_feature_for_user(
+async def configure_feature_for_user(
     feature_name: str, config: FeatureOverride
 ):
     logger.info(
         "Configuring feature %s for user %s", feature_name, config.user_id
     )
-    if dao.get_feature(feature_name) is None:
+    try:
+        configuredFeat = await configure_feature_for_user_async(
+            feature_name, config, async_dao())
+    except ValueError:
         raise HTTPException(
             status_code=404,
             detail="Feature not found",
         )
-    configuredFeat = configure_feature_for_user_activity(
-        feature_name, config, dao)
-    return {
+    return json_response({
         "status": "accepted",
         "feature": feature_name,
-        "override": configuredFeat.model_dump(),
+        "override": dump(configuredFeat),
+    })
+
+
+@app.get("/features")
+async def list_features(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+):
+    try:
+        page = await list_features_async(cursor, limit, async_dao())
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return json_response({
+        "status": "ok",
+        "features": [dump(feature) for feature in page.items],
+        "next_cursor": page.next_cursor,
+    })
+
+
+@app.get("/feature/{feature_name}/overrides")
+async def list_overrides(
+    feature_name: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+):
+    try:
+        page = await list_overrides_async(
+            feature_name, cursor, limit, async_dao()
+        )
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    return json_response({
+        "status": "ok",
+        "feature": feature_name,
+        "overrides": [dump(override) for override in page.items],
+        "next_cursor": page.next_cursor,
+    })
+
+
+@app.get("/export")
+async def export(request: Request):
+    """
+    Stream every feature and override as NDJSON.
+
+    Each line is {"feature": ...} or {"override": ...}, every feature
+    followed by its overrides. The store is read page by page while the
+    response streams, and gzip-compressed when the client accepts it.
+    """
+    logger.info("Exporting the feature store")
+    compress = "gzip" in request.headers.get("accept-encoding", "")
+
+    async def chunks():
+        dumps = json.dumps
+        gzip = zlib.compressobj(wbits=31) if compress else None
+        async for items in export_store_async(async_dao()):
+            kind = "feature" if isinstance(items[0], Feature) else "override"
+            data = "".join(
+                dumps({kind: item.model_dump(mode="json")}) + "\n"
+                for item in items
+            ).encode("utf-8")
+            if gzip is None:
+                yield data
+            else:
+                data = gzip.compress(data)
+                if data:
+                    yield data
+        if gzip is not None:
+            yield gzip.flush()
+
+    headers = {"Vary": "Accept-Encoding"}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        chunks(), media_type="application/x-ndjson", headers=headers
+    )
+
+
+def change_set_json(changes: ChangeSet, log_id: str) -> dict:
+    return {
+        "log_id": log_id,
+        "version": changes.version,
+        "features": {
+            name: None if feature is None else dump(feature)
+            for name, feature in changes.features.items()
+        },
+        "overrides": {
+            feature_name: {
+                user_id: None if override is None else dump(override)
+                for user_id, override in overrides.items()
+            }
+            for feature_name, overrides in changes.overrides.items()
+        },
+        "reload": changes.reload,
     }
 
 
-@app.get("/feature/{feature_name}")
-def get_feature(feature_name: str):
-    logger.info("Retrieving feature %s", feature_name)
+def require_change_log() -> ChangeLog:
+    changes = change_log()
+    if changes is None:
+        raise HTTPException(
+            status_code=501,
+            detail="The change feed needs the caching DAO",
+        )
+    return changes
+
+
+def resync_required(changes: ChangeLog, exc: ResyncRequired):
+    return HTTPException(
+        status_code=410,
+        detail={
+            "error": str(exc),
+            "log_id": changes.log_id,
+            "version": changes.version,
+        },
+    )
+
+
+@app.get("/changes")
+async def get_changes(
+    since: Optional[int] = Query(None, ge=0),
+    log_id: Optional[str] = None,
+    wait: float = Query(0, ge=0, le=60),
+):
+    """
+    Report what changed after version since, with current values.
+
+    Without since, reports only the current version, to start from after
+    a full load. With wait, a long poll: an empty answer is held back up
+    to wait seconds for a write. A 410 means the change log no longer
+    covers since, and the client must reload everything.
+    """
+    changes = require_change_log()
+    if since is None:
+        return {
+            "status": "ok",
+            "log_id": changes.log_id,
+            "version": changes.version,
+        }
+    try:
+        changed = await get_changes_async(
+            since, changes, async_dao(), log_id, wait
+        )
+    except ResyncRequired as exc:
+        raise resync_required(changes, exc)
+    return json_response(
+        {"status": "ok", **change_set_json(changed, changes.log_id)}
+    )
+
+
+@app.get("/changes/stream")
+async def stream_changes(
+    request: Request,
+    since: Optional[int] = Query(None, ge=0),
+    log_id: Optional[str] = None,
+):
+    """
+    Push changes as Server-Sent Events.
+
+    Each "changes" event carries what GET /changes would return, and its
+    id, "<log_id>:<version>", resumes the stream after a reconnect via
+    Last-Event-ID. A "resync" event ends the stream when the log no
+    longer covers the client's version.
+    """
+    changes = require_change_log()
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id and ":" in last_event_id:
+        log_id, _, version = last_event_id.rpartition(":")
+        if version.isdigit():
+            since = int(version)
+
+    async def events():
+        dumps = json.dumps
+        try:
+            async for changed in watch_changes_async(
+                since, changes, async_dao(), log_id
+            ):
+                if changed is None:
+                    yield ": keepalive\n\n"
+                    continue
+                yield (
+                    f"id: {changes.log_id}:{changed.version}\n"
+                    "event: changes\n"
+                    "data: "
+                    + dumps(
+                        jsonable_encoder(
+                            change_set_json(changed, changes.log_id)
+                        )
+                    )
+                    + "\n\n"
+                )
+        except ResyncRequired as exc:
+            yield (
+                "event: resync\ndata: "
+                + dumps(resync_required(changes, exc).detail)
+                + "\n\n"
+            )
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@app.post("/feature/{feature_name}/overrides")
+async def import_overrides(feature_name: str, request: Request):
+    """
+    Set or delete many users' overrides of a feature at once.
+
+    The body is NDJSON, one change per line: {"user_id", "value",
+    "justification"?} to set an override or {"user_id", "delete": true}
+    to remove it. It is validated line by line as it streams in; any
+    invalid line rejects the whole batch, and a valid one is applied
+    atomically, persisted in one write and invalidates the feature's
+    cache once. The parsed changes are all held in memory until then,
+    up to IMPORT_MAX_OVERRIDES of them.
+    """
+    # before the body, which may hold a million changes
     try:
-        feature = get_feature_activity(feature_name, dao)
-        return {"status": "ok", "feature": feature.model_dump()}
+        await get_feature_async(feature_name, async_dao())
     except ValueError:
         raise HTTPException(
             status_code=404,
-            detail=f"Feature {feature_name} not found",
+            detail="Feature not found",
         )
+    changes = []
+    errors = []
+    number = 0
+    async for lines in body_lines(request):
+        for line in lines:
+            number += 1
+            if not line.strip():
+                continue
+            try:
+                changes.append(OverrideChange.model_validate_json(line))
+            except ValidationError as exc:
+                errors.append({
+                    "line": number,
+                    "errors": exc.errors(
+                        include_url=False,
+                        include_context=False,
+                        include_input=False,
+                    ),
+                })
+                # report the first few; the batch is rejected either way
+                if len(errors) >= IMPORT_MAX_ERRORS:
+                    break
+            if len(changes) > IMPORT_MAX_OVERRIDES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"More than {IMPORT_MAX_OVERRIDES} changes",
+                )
+        if len(errors) >= IMPORT_MAX_ERRORS:
+            break
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+    logger.info(
+        "Importing %d override changes for feature %s",
+        len(changes),
+        feature_name,
+    )
+    # the feature was found before the body was read
+    written, deleted = await apply_overrides_async(
+        feature_name, changes, async_dao()
+    )
+    return {
+        "status": "accepted",
+        "feature": feature_name,
+        "written": written,
+        "deleted": deleted,
+    }
+
+
+@app.get("/feature/{feature_name}")
+async def get_feature(feature_name: str, request: Request):
+    logger.info("Retrieving feature %s", feature_name)
+    etag = version_etag(feature_name)
+    if etag is not None and etag_matches(
+        request.headers.get("if-none-match"), etag
+    ):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    async def render():
+        try:
+            feature = await get_feature_async(feature_name, async_dao())
+            return {"status": "ok", "feature": dump(feature)}
+        except ValueError:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Feature {feature_name} not found",
+            )
+
+    return await respond_cached(feature_name, render, etag)
 
 
 @app.get("/feature/{feature_name}/user/{user_id}")
-def get_feature_for_user(feature_name: str, user_id: str):
+async def get_feature_for_user(
+    feature_name: str, user_id: str, request: Request
+):
     logger.info(
         "Retrieving feature %s for user %s", feature_name, user_id
     )
+    etag = version_etag(feature_name, user_id)
+    if etag is not None and etag_matches(
+        request.headers.get("if-none-match"), etag
+    ):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    async def render():
+        try:
+            override = await get_feature_for_user_async(
+                feature_name, user_id, async_dao()
+            )
+            return {"status": "ok", "override": dump(override)}
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=404,
+                detail=str(exc),
+            )
+
+    return await respond_cached((feature_name, user_id), render, etag)
+
+
+@app.post("/evaluate")
+async def evaluate(request: EvaluationRequest):
+    logger.info(
+        "Evaluating %d features for user %s",
+        len(request.feature_names),
+        request.user_id,
+    )
+    results = await evaluate_features_async(
+        request.feature_names, request.user_id, async_dao()
+    )
+    return json_response({
+        "status": "ok",
+        "user_id": request.user_id,
+        "features": {
+            name: dump(override)
+            for name, override in results.items()
+            if override is not None
+        },
+        "missing": [
+            name for name, override in results.items() if override is None
+        ],
+    })
+
+
+class RequestStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose content reads the request body as it goes.
+
+    StreamingResponse otherwise watches for a client disconnect by
+    calling receive() alongside the content, which would take request
+    body chunks from under it. Here a disconnect surfaces through the
+    request stream, or as an OSError from send, instead.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
+
+
+async def body_lines(request: Request) -> AsyncIterator[List[bytes]]:
+    """
+    Split a streamed body into its lines, in one list per chunk.
+
+    Raises:
+        HTTPException: 413 once a line passes BODY_MAX_LINE_BYTES, so a
+            body without newlines is not buffered whole
+    """
+    pending = b""
+    async for chunk in request.stream():
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        if len(pending) > BODY_MAX_LINE_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"A line is longer than {BODY_MAX_LINE_BYTES} bytes",
+            )
+        if lines:
+            yield lines
+    if pending:
+        yield [pending]
+
+
+def parse_user_id(line: bytes) -> Optional[str]:
+    """
+    Read a user ID from a bare, JSON string or {"user_id": ...} line.
+
+    Returns None for blank lines and lines holding no user ID.
+    """
+    try:
+        text = line.strip().decode("utf-8")
+        if not text.startswith(("{", '"')):
+            return text or None
+        parsed = json.loads(text)
+    except ValueError:
+        parsed = None
+    user_id = parsed.get("user_id") if isinstance(parsed, dict) else parsed
+    if isinstance(user_id, str) and user_id:
+        return user_id
+    logger.warning("Skipping line without a user ID: %r", line)
+    return None
+
+
+async def user_id_batches(request: Request) -> AsyncIterator[List[str]]:
+    """
+    Split a streamed body into batches of user IDs, one per line.
+
+    Each chunk of the body becomes one batch, so only a chunk's worth of
+    user IDs is held at a time.
+    """
+    async for lines in body_lines(request):
+        batch = [
+            user_id for user_id in map(parse_user_id, lines)
+            if user_id is not None
+        ]
+        if batch:
+            yield batch
+
+
+@app.post("/feature/{feature_name}/evaluate")
+async def evaluate_feature_for_users(feature_name: str, request: Request):
+    """
+    Stream one feature's value for every user ID in the request body.
+
+    The body holds one user ID per line, bare or as NDJSON; the response
+    is NDJSON with one {"user_id", "value", "isDefault"} object per user,
+    streamed as the body is read.
+    """
+    logger.info("Evaluating feature %s for streamed users", feature_name)
     try:
-        override = get_feature_for_user_activity(
-            feature_name, user_id, dao
+        batches = await evaluate_feature_for_users_async(
+            feature_name, user_id_batches(request), async_dao()
         )
-        return {"status": "ok", "override": override.model_dump()}
     except ValueError as exc:
         raise HTTPException(
             status_code=404,
             detail=str(exc),
         )
+    # read up to the first batch before responding, so a body that is
+    # one overlong line gets a 413; a later one can only cut the stream
+    first = await anext(batches, None)
+
+    def encode(batch: List[Evaluation]) -> str:
+        dumps = json.dumps
+        return "".join(
+            f'{{"user_id":{dumps(user_id)},"value":{dumps(value)},'
+            f'"isDefault":{"true" if is_default else "false"}}}\n'
+            for user_id, value, is_default in batch
+        )
+
+    async def lines():
+        if first is None:
+            return
+        yield encode(first)
+        async for batch in batches:
+            yield encode(batch)
+
+    return RequestStreamingResponse(
+        lines(), media_type="application/x-ndjson"
+    )
 
 
 @app.delete("/feature/{feature_name}/user/{user_id}")
-def delete_feature_for_user(feature_name: str, user_id: str):
+async def delete_feature_for_user(feature_name: str, user_id: str):
     logger.info(
         "Deleting feature override %s for user %s",
         feature_name,
         user_id,
     )
     try:
-        deleted = delete_feature_for_user_activity(
-            feature_name, user_id, dao
+        deleted = await delete_feature_for_user_async(
+            feature_name, user_id, async_dao()
         )
-        return {"status": "ok", "override": deleted.model_dump()}
+        return json_response({"status": "ok", "override": dump(deleted)})
     except ValueError as exc:
         raise HTTPException(
             status_code=404,
@@ -111,10 +908,22 @@ def delete_feature_for_user(feature_name: str, user_id: str):
 
 
 @app.get("/health")
-def health():
+async def health():
     return {"status": "ok"}
 
 
+@app.get("/stats")
+async def stats():
+    stats = async_dao().stats()
+    responses = response_cache()
+    if responses is not None:
+        stats = {**stats, "responses": responses.stats()}
+    changes = change_log()
+    if changes is not None:
+        stats = {**stats, "changes": changes.stats()}
+    return {"status": "ok", "stats": stats}
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
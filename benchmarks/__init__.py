@@ -0,0 +1 @@
+"""Benchmarks for the feature flag API. Run modules with python -m."""
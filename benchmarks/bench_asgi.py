@@ -0,0 +1,162 @@
+"""
+In-process ASGI load test of the read endpoints.
+
+Drives the FastAPI app directly through its ASGI interface (no sockets)
+from --concurrency concurrent clients and reports requests per second and
+latency percentiles. "sync" serves the same routes as plain def handlers
+over the sync DAO, so every request hops onto the threadpool, as the app
+did before its routes became async; "async" is app.main.app, and
+"304" sends it each value's current ETag in If-None-Match. The
+encoder rows ("fastapi", "json", "orjson") turn the response cache off,
+so every request encodes its body, and serve it with each JSON_ENCODER
+backend; "cpu us" is process CPU time per request.
+
+    python -m benchmarks.bench_asgi [--requests 20000] [--concurrency 64]
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi import FastAPI, HTTPException
+
+import app.main
+from app.activity.getFeatureForUser import get_feature_for_user
+from app.db.cachedFeatureConfigDao import CachedFeatureConfigDao
+from app.db.inMemoryFeatureConfigDao import InMemoryFeatureConfigDao
+from app.items.jsonEncoder import (
+    FASTAPI,
+    ORJSON,
+    STDLIB,
+    JsonEncoder,
+    orjson,
+)
+
+from .bench_persistence import FEATURES, seed_snapshot
+
+OVERRIDES = 10_000
+
+
+def build_sync_app(dao) -> FastAPI:
+    sync_app = FastAPI()
+
+    @sync_app.get("/feature/{feature_name}/user/{user_id}")
+    def get_feature_for_user_route(feature_name: str, user_id: str):
+        try:
+            override = get_feature_for_user(feature_name, user_id, dao)
+            return {"status": "ok", "override": override.model_dump()}
+        except ValueError as exc:
+            raise HTTPException(status_code=404, detail=str(exc))
+
+    return sync_app
+
+
+async def call(asgi_app, path: str, headers=()) -> int:
+    """Send one GET through the ASGI interface and return its status."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [(b"host", b"bench"), *headers],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await asyncio.wait_for(asgi_app(scope, receive, send), 10)
+    return status
+
+
+async def load(asgi_app, paths, concurrency: int, status: int = 200):
+    """Return (requests/s, latencies in ms, CPU us per request)."""
+    latencies = []
+    queue = iter(paths)
+
+    async def client():
+        for path, headers in queue:
+            start = time.perf_counter()
+            assert await call(asgi_app, path, headers) == status
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    cpu = (time.process_time() - cpu_start) * 1e6 / len(latencies)
+    return len(latencies) / (time.perf_counter() - start), latencies, cpu
+
+
+def use_encoder(backend: str) -> None:
+    """Serve with backend and no response cache."""
+    app.main.RESPONSE_CACHE_MAX_ENTRIES = 0
+    app.main._response_cache = None
+    app.main.json_encoder = JsonEncoder(backend)
+
+
+def run(requests: int, concurrency: int):
+    per_feature = OVERRIDES // FEATURES
+    names = ["bench"] + [f"bench_{f}" for f in range(1, FEATURES)]
+    keys = [
+        (names[i % FEATURES], f"user_{i * 7919 % per_feature}")
+        for i in range(requests)
+    ]
+    paths = [(f"/feature/{name}/user/{user}", ()) for name, user in keys]
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = str(Path(tmp) / "features.json")
+        seed_snapshot(cache_file, OVERRIDES)
+        dao = CachedFeatureConfigDao(InMemoryFeatureConfigDao(cache_file))
+        app.main.dao = dao
+        print(
+            f"{'routes':>8} {'req/s':>10} {'p50 ms':>8} "
+            f"{'p99 ms':>8} {'cpu us':>8}"
+        )
+        conditional = [
+            (path, [(b"if-none-match", app.main.version_etag(*key).encode())])
+            for (path, _), key in zip(paths, keys)
+        ]
+        for label, asgi_app, requested, status in (
+            ("sync", build_sync_app(dao), paths, 200),
+            ("async", app.main.app, paths, 200),
+            ("304", app.main.app, conditional, 304),
+            (FASTAPI, app.main.app, paths, 200),
+            (STDLIB, app.main.app, paths, 200),
+            (ORJSON, app.main.app, paths, 200),
+        ):
+            if label == ORJSON and orjson is None:
+                print(f"{label:>8} skipped: orjson is not installed")
+                continue
+            if label in (FASTAPI, STDLIB, ORJSON):
+                use_encoder(label)
+            asyncio.run(
+                load(asgi_app, requested[:1000], concurrency, status)
+            )
+            rps, latencies, cpu = asyncio.run(
+                load(asgi_app, requested, concurrency, status)
+            )
+            cuts = statistics.quantiles(latencies, n=100)
+            print(
+                f"{label:>8} {rps:>10,.0f} {cuts[49]:>8.2f} "
+                f"{cuts[98]:>8.2f} {cpu:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+    run(args.requests, args.concurrency)
@@ -0,0 +1,122 @@
+"""
+Throughput of streamed bulk evaluation of one feature for many users.
+
+Streams --users user IDs through POST /feature/{name}/evaluate in
+--chunk-kb body chunks, generated on the fly, driving the ASGI app
+directly (no sockets). One in --override-every users has an override.
+Reports users evaluated per second and the peak memory allocated while
+streaming, which should stay flat as --users grows.
+
+    python -m benchmarks.bench_bulk_evaluation [--users 1000000]
+"""
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import app.main
+from app.db.cachedFeatureConfigDao import CachedFeatureConfigDao
+from app.db.featurePersistence import FeatureState, save_json_snapshot
+from app.db.inMemoryFeatureConfigDao import InMemoryFeatureConfigDao
+from app.items.feature import Feature
+from app.items.featureOverride import FeatureOverride
+
+
+def body_chunks(users: int, chunk_bytes: int):
+    chunk = []
+    size = 0
+    for i in range(users):
+        line = f"user_{i}\n"
+        chunk.append(line)
+        size += len(line)
+        if size >= chunk_bytes:
+            yield "".join(chunk).encode()
+            chunk, size = [], 0
+    if chunk:
+        yield "".join(chunk).encode()
+
+
+async def stream(asgi_app, users: int, chunk_bytes: int):
+    """Return (lines received, seconds)."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/feature/bench/evaluate",
+        "raw_path": b"/feature/bench/evaluate",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+    chunks = body_chunks(users, chunk_bytes)
+    lines = 0
+
+    async def receive():
+        chunk = next(chunks, None)
+        return {
+            "type": "http.request",
+            "body": chunk or b"",
+            "more_body": chunk is not None,
+        }
+
+    async def send(message):
+        nonlocal lines
+        if message["type"] == "http.response.body":
+            lines += message["body"].count(b"\n")
+
+    start = time.perf_counter()
+    await asgi_app(scope, receive, send)
+    return lines, time.perf_counter() - start
+
+
+def run(users: int, override_every: int, chunk_kb: int):
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = str(Path(tmp) / "features.json")
+        save_json_snapshot(
+            cache_file,
+            FeatureState(
+                {"bench": Feature(feature_name="bench", value="on")},
+                {
+                    "bench": {
+                        f"user_{i}": FeatureOverride(
+                            feature_name="bench",
+                            user_id=f"user_{i}",
+                            value="off",
+                        )
+                        for i in range(0, users, override_every)
+                    }
+                },
+            ),
+        )
+        app.main.dao = CachedFeatureConfigDao(
+            InMemoryFeatureConfigDao(cache_file)
+        )
+        print(f"{'users':>10} {'users/s':>12} {'seconds':>8} {'peak MB':>8}")
+        for count in (users // 10, users):
+            tracemalloc.start()
+            lines, seconds = asyncio.run(
+                stream(app.main.app, count, chunk_kb * 1024)
+            )
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            assert lines == count
+            print(
+                f"{count:>10,} {count / seconds:>12,.0f} {seconds:>8.2f} "
+                f"{peak / 1e6:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--override-every", type=int, default=10)
+    parser.add_argument("--chunk-kb", type=int, default=64)
+    args = parser.parse_args()
+    run(args.users, args.override_every, args.chunk_kb)
@@ -0,0 +1,96 @@
+"""
+Measure read latency across cache expiries of a hot key.
+
+Reader threads hammer one feature whose base DAO lookup takes
+--lookup-ms (standing in for disk or network) while its cache entry
+expires every --ttl-ms. Reports latency percentiles and how many
+lookups reached the base DAO; stalls counts reads that waited on a
+lookup. Runs with single-flight alone and with
+stale-while-revalidate.
+
+    python -m benchmarks.bench_cache_expiry [--threads 4]
+"""
+import argparse
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from app.db.cachedFeatureConfigDao import CachedFeatureConfigDao
+from app.db.inMemoryFeatureConfigDao import InMemoryFeatureConfigDao
+from app.items.feature import Feature
+
+
+class SlowDao(InMemoryFeatureConfigDao):
+    def __init__(self, cache_file: str, delay: float):
+        super().__init__(cache_file)
+        self.delay = delay
+        self.lookups = 0
+
+    def get_feature(self, feature_name):
+        self.lookups += 1
+        time.sleep(self.delay)
+        return super().get_feature(feature_name)
+
+
+def run(threads: int, seconds: float, ttl: float, lookup: float):
+    print(
+        f"{'mode':>22} {'p50 us':>8} {'p99 us':>8} {'stalls':>8} "
+        f"{'max ms':>8} {'lookups':>8}"
+    )
+    for label, stale in (("single-flight", 0), ("stale-while-revalidate", 60)):
+        with tempfile.TemporaryDirectory() as tmp:
+            base = SlowDao(str(Path(tmp) / "features.json"), lookup)
+            base.create_feature(Feature(feature_name="hot", value="on"))
+            dao = CachedFeatureConfigDao(
+                base,
+                ttl_seconds=ttl,
+                stale_while_revalidate_seconds=stale,
+            )
+            stop = threading.Event()
+            latencies = [[] for _ in range(threads)]
+
+            def read(slot: int):
+                record = latencies[slot].append
+                while not stop.is_set():
+                    start = time.perf_counter()
+                    dao.get_feature("hot")
+                    record(time.perf_counter() - start)
+                    # pace requests so threads are not just fighting
+                    # over the GIL
+                    time.sleep(0.0002)
+
+            workers = [
+                threading.Thread(target=read, args=(i,))
+                for i in range(threads)
+            ]
+            for worker in workers:
+                worker.start()
+            time.sleep(seconds)
+            stop.set()
+            for worker in workers:
+                worker.join()
+            dao.close()
+        merged = [x for slot in latencies for x in slot]
+        cuts = statistics.quantiles(merged, n=100)
+        stalls = sum(1 for x in merged if x > lookup / 2)
+        print(
+            f"{label:>22} {cuts[49] * 1e6:>8.1f} {cuts[98] * 1e6:>8.1f} "
+            f"{stalls:>8} {max(merged) * 1e3:>8.2f} {base.lookups:>8}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--ttl-ms", type=float, default=50)
+    parser.add_argument("--lookup-ms", type=float, default=20)
+    args = parser.parse_args()
+    run(
+        args.threads,
+        args.seconds,
+        args.ttl_ms / 1000,
+        args.lookup_ms / 1000,
+    )
@@ -0,0 +1,108 @@
+"""
+Local flag evaluation with FeatureFlagClient versus asking the service.
+
+Serves app.main.app with uvicorn on a loopback port, seeded with
+bench_persistence's store, and evaluates the same (feature, user) keys
+three ways: FeatureFlagClient.get_value, its get_feature_for_user, and
+GET /feature/{name}/user/{id} over one keep-alive HTTP connection.
+Reports the mean and percentiles of each call.
+
+    python -m benchmarks.bench_client [--calls 20000] [--overrides 10000]
+"""
+import argparse
+import logging
+import socket
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import uvicorn
+
+import app.main
+from app.db.cachedFeatureConfigDao import CachedFeatureConfigDao
+from app.db.inMemoryFeatureConfigDao import InMemoryFeatureConfigDao
+from client.featureFlagClient import FeatureFlagClient
+
+from .bench_persistence import FEATURES, seed_snapshot
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure(label: str, call, keys):
+    """Time call(feature, user) per key and print a result row."""
+    latencies = []
+    for name, user in keys:
+        start = time.perf_counter_ns()
+        call(name, user)
+        latencies.append(time.perf_counter_ns() - start)
+    cuts = statistics.quantiles(latencies, n=100)
+    print(
+        f"{label:>22} {statistics.fmean(latencies) / 1000:>10.2f} "
+        f"{cuts[49] / 1000:>10.2f} {cuts[98] / 1000:>10.2f}"
+    )
+
+
+def run(calls: int, overrides: int):
+    logging.disable(logging.WARNING)
+    per_feature = overrides // FEATURES
+    names = ["bench"] + [f"bench_{f}" for f in range(1, FEATURES)]
+    # half the users have no override and get the feature's default
+    keys = [
+        (names[i % FEATURES], f"user_{i * 7919 % (2 * per_feature)}")
+        for i in range(calls)
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = str(Path(tmp) / "features.json")
+        seed_snapshot(cache_file, overrides)
+        app.main.dao = CachedFeatureConfigDao(
+            InMemoryFeatureConfigDao(cache_file)
+        )
+        port = free_port()
+        server = uvicorn.Server(
+            uvicorn.Config(
+                app.main.app, port=port, log_level="warning", access_log=False
+            )
+        )
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.01)
+        base_url = f"http://127.0.0.1:{port}"
+        try:
+            # short polls, so the server is not kept waiting at exit
+            with FeatureFlagClient(
+                base_url, poll_seconds=1
+            ) as client, httpx.Client(
+                base_url=base_url
+            ) as http:
+
+                def over_http(name, user):
+                    http.get(f"/feature/{name}/user/{user}").json()
+
+                print(
+                    f"{'evaluation':>22} {'mean us':>10} {'p50 us':>10} "
+                    f"{'p99 us':>10}"
+                )
+                measure("local get_value", client.get_value, keys)
+                measure(
+                    "local get_feature", client.get_feature_for_user, keys
+                )
+                measure("HTTP GET", over_http, keys)
+        finally:
+            server.should_exit = True
+            thread.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--overrides", type=int, default=10_000)
+    args = parser.parse_args()
+    run(args.calls, args.overrides)
@@ -0,0 +1,96 @@
+"""
+Measure DAO throughput with concurrent readers and writers.
+
+Runs reader threads doing get_override and writer threads doing
+create_override against the cached in-memory DAO for a fixed duration,
+and reports operations per second for each side. Readers take no lock;
+writers serialize only with writers of the same feature's stripe.
+
+    python -m benchmarks.bench_concurrency [--readers 8] [--writers 2]
+"""
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from app.db.cachedFeatureConfigDao import CachedFeatureConfigDao
+from app.db.groupCommitPersistence import GroupCommitPersistence
+from app.db.inMemoryFeatureConfigDao import InMemoryFeatureConfigDao
+from app.db.writeAheadLog import WriteAheadLogPersistence
+from app.items.featureOverride import FeatureOverride
+
+from .bench_persistence import FEATURES, seed_snapshot
+
+OVERRIDES = 10_000
+NAMES = ["bench"] + [f"bench_{f}" for f in range(1, FEATURES)]
+
+
+def run(readers: int, writers: int, seconds: float, stripes: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = str(Path(tmp) / "features.json")
+        seed_snapshot(cache_file, OVERRIDES)
+        persistence = GroupCommitPersistence(
+            WriteAheadLogPersistence(cache_file), durability="async"
+        )
+        dao = CachedFeatureConfigDao(
+            InMemoryFeatureConfigDao(cache_file, persistence, stripes)
+        )
+        per_feature = OVERRIDES // FEATURES
+        stop = threading.Event()
+        reads = [0] * readers
+        writes = [0] * writers
+
+        def read(slot: int):
+            i = slot
+            while not stop.is_set():
+                dao.get_override(
+                    NAMES[i % FEATURES],
+                    f"user_{i * 7919 % per_feature}",
+                )
+                i += 1
+                reads[slot] += 1
+
+        def write(slot: int):
+            i = 0
+            while not stop.is_set():
+                name = NAMES[(slot + i * writers) % FEATURES]
+                dao.create_override(
+                    name,
+                    FeatureOverride(
+                        feature_name=name, user_id=f"w{slot}_{i}", value="on"
+                    ),
+                )
+                i += 1
+                writes[slot] += 1
+
+        threads = [
+            threading.Thread(target=read, args=(i,)) for i in range(readers)
+        ] + [
+            threading.Thread(target=write, args=(i,)) for i in range(writers)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        dao.close()
+    print(
+        f"{readers:>8} {writers:>8} {stripes:>8} "
+        f"{sum(reads) / seconds:>12,.0f} {sum(writes) / seconds:>12,.0f}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+    print(
+        f"{'readers':>8} {'writers':>8} {'stripes':>8} "
+        f"{'reads/s':>12} {'writes/s':>12}"
+    )
+    for stripes in (1, 64):
+        run(args.readers, args.writers, args.seconds, stripes)
@@ -0,0 +1,167 @@
+"""
+Measure override write latency as the dataset grows.
+
+Compares the JSON snapshot persistence (full rewrite per write), the
+write-ahead log persistence (one appended record per write) and the
+sharded persistence (rewrite of one of 64 shard files per write), then
+replays a burst of concurrent override writes against each durability
+level to count how many disk writes group commit saves.
+
+    python -m benchmarks.bench_persistence [--sizes 1000,10000,100000]
+"""
+import argparse
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from app.db.featurePersistence import (
+    FeatureState,
+    JsonSnapshotPersistence,
+    save_json_snapshot,
+)
+from app.db.groupCommitPersistence import (
+    DURABILITY_LEVELS,
+    SYNC,
+    GroupCommitPersistence,
+)
+from app.db.inMemoryFeatureConfigDao import InMemoryFeatureConfigDao
+from app.db.shardedPersistence import ShardedSnapshotPersistence, shard_for
+from app.db.writeAheadLog import WriteAheadLogPersistence
+from app.items.feature import Feature
+from app.items.featureOverride import FeatureOverride
+
+WRITES = 20
+FEATURES = 64
+BURST_WRITES = 500
+BURST_THREADS = 16
+BURST_SIZE = 1000
+
+
+def seed_state(overrides: int) -> FeatureState:
+    """Build FEATURES features sharing the given number of overrides."""
+    per_feature = overrides // FEATURES
+    names = ["bench"] + [f"bench_{f}" for f in range(1, FEATURES)]
+    return FeatureState(
+        {name: Feature(feature_name=name, value="enabled") for name in names},
+        {
+            name: {
+                f"user_{i}": FeatureOverride(
+                    feature_name=name, user_id=f"user_{i}", value="on"
+                )
+                for i in range(per_feature)
+            }
+            for name in names
+        },
+    )
+
+
+def seed_snapshot(path: str, overrides: int) -> None:
+    save_json_snapshot(path, seed_state(overrides))
+
+
+def seed_shards(directory: str, overrides: int) -> None:
+    state = seed_state(overrides)
+    persistence = ShardedSnapshotPersistence(directory)
+    Path(directory).mkdir()
+    for shard in range(persistence.shard_count):
+        names = [
+            name for name in state.features
+            if shard_for(name, persistence.shard_count) == shard
+        ]
+        save_json_snapshot(
+            persistence.shard_path(shard),
+            FeatureState(
+                {name: state.features[name] for name in names},
+                {name: state.overrides[name] for name in names},
+            ),
+        )
+
+
+def time_writes(dao: InMemoryFeatureConfigDao) -> float:
+    """Return the mean create_override latency in milliseconds."""
+    start = time.perf_counter()
+    for i in range(WRITES):
+        dao.create_override(
+            "bench",
+            FeatureOverride(
+                feature_name="bench", user_id=f"new_{i}", value="off"
+            ),
+        )
+    return (time.perf_counter() - start) * 1000 / WRITES
+
+
+def run(sizes):
+    print(
+        f"{'overrides':>10} {'snapshot ms':>12} {'wal ms':>8} "
+        f"{'sharded ms':>11}"
+    )
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "features.json")
+            seed_snapshot(path, size)
+            dao = InMemoryFeatureConfigDao(
+                path, JsonSnapshotPersistence(path)
+            )
+            snapshot_ms = time_writes(dao)
+            dao.close()
+
+            seed_snapshot(path, size)
+            dao = InMemoryFeatureConfigDao(
+                path, WriteAheadLogPersistence(path)
+            )
+            wal_ms = time_writes(dao)
+            dao.close()
+
+            shards = str(Path(tmp) / "shards")
+            seed_shards(shards, size)
+            dao = InMemoryFeatureConfigDao(
+                path, ShardedSnapshotPersistence(shards)
+            )
+            sharded_ms = time_writes(dao)
+            dao.close()
+        print(
+            f"{size:>10} {snapshot_ms:>12.3f} {wal_ms:>8.3f} "
+            f"{sharded_ms:>11.3f}"
+        )
+
+
+def run_burst():
+    print(
+        f"\n{BURST_WRITES} overrides from {BURST_THREADS} threads "
+        f"on a {BURST_SIZE}-override snapshot"
+    )
+    print(f"{'durability':>10} {'seconds':>8} {'disk writes':>12}")
+    for durability in DURABILITY_LEVELS:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "features.json")
+            seed_snapshot(path, BURST_SIZE)
+            persistence = GroupCommitPersistence(
+                JsonSnapshotPersistence(path), durability=durability
+            )
+            dao = InMemoryFeatureConfigDao(path, persistence)
+            start = time.perf_counter()
+            with ThreadPoolExecutor(BURST_THREADS) as pool:
+                pool.map(
+                    lambda i: dao.create_override(
+                        "bench",
+                        FeatureOverride(
+                            feature_name="bench",
+                            user_id=f"burst_{i}",
+                            value="off",
+                        ),
+                    ),
+                    range(BURST_WRITES),
+                )
+            dao.close()
+            elapsed = time.perf_counter() - start
+        writes = BURST_WRITES if durability == SYNC else persistence.flushes
+        print(f"{durability:>10} {elapsed:>8.2f} {writes:>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    args = parser.parse_args()
+    run([int(s) for s in args.sizes.split(",")])
+    run_burst()
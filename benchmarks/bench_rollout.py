@@ -0,0 +1,88 @@
+"""
+Cost of deciding a user's value of a feature with a percentage rollout.
+
+Times, per call over --users distinct user IDs: hashing a user into a
+bucket, picking the rollout variant, resolve_feature_for_user without
+and with a rollout (which builds the returned FeatureOverride), and
+FeatureFlagClient.get_value's path, which builds nothing. Also prints
+each variant's share of the users, against its configured percentage.
+
+    python -m benchmarks.bench_rollout [--users 200000]
+"""
+import argparse
+import time
+from collections import Counter
+
+from app.activity.getFeatureForUser import resolve_feature_for_user
+from app.items.feature import Feature
+from app.items.rollout import rollout_bucket
+
+ROLLOUT = {
+    "variants": [
+        {"value": "blue", "percentage": 10},
+        {"value": "green", "percentage": 25},
+    ],
+    "salt": "bench",
+}
+
+
+def measure(label: str, call, user_ids):
+    start = time.perf_counter_ns()
+    for user_id in user_ids:
+        call(user_id)
+    elapsed = time.perf_counter_ns() - start
+    print(f"{label:>28} {elapsed / len(user_ids):>10.0f}")
+
+
+def run(users: int):
+    user_ids = [f"user_{i}" for i in range(users)]
+    plain = Feature(feature_name="bench", value="off")
+    rolled = Feature(feature_name="bench", value="off", rollout=ROLLOUT)
+    rollout = rolled.rollout
+
+    def get_value(user_id):
+        # FeatureFlagClient.get_value for a user without an override
+        variant = rolled.rollout.value_for("bench", user_id)
+        return rolled.value if variant is None else variant
+
+    print(f"{'evaluation':>28} {'ns/call':>10}")
+    measure(
+        "rollout_bucket",
+        lambda user_id: rollout_bucket("bench", user_id, "bench"),
+        user_ids,
+    )
+    measure(
+        "Rollout.value_for",
+        lambda user_id: rollout.value_for("bench", user_id),
+        user_ids,
+    )
+    measure("client get_value", get_value, user_ids)
+    measure(
+        "resolve, no rollout",
+        lambda user_id: resolve_feature_for_user(
+            "bench", user_id, None, plain
+        ),
+        user_ids,
+    )
+    measure(
+        "resolve, rollout",
+        lambda user_id: resolve_feature_for_user(
+            "bench", user_id, None, rolled
+        ),
+        user_ids,
+    )
+
+    shares = Counter(rollout.value_for("bench", u) for u in user_ids)
+    print()
+    for variant in rollout.variants:
+        print(
+            f"{variant.value:>10} {variant.percentage:>6.2f}% configured "
+            f"{100 * shares[variant.value] / users:>6.2f}% measured"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=200_000)
+    args = parser.parse_args()
+    run(args.users)
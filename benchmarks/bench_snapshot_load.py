@@ -0,0 +1,130 @@
+"""
+Measure startup time and peak memory for JSON vs binary snapshots.
+
+Each measurement runs in a fresh interpreter so peak RSS is meaningful.
+Overrides are spread over 100 features; "first access" is the time to
+decode one feature's overrides from the memory-mapped binary snapshot.
+
+    python -m benchmarks.bench_snapshot_load [--sizes 100000,1000000]
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from datetime import datetime
+from pathlib import Path
+
+from app.db.binarySnapshot import encode_binary_snapshot, load_binary_snapshot
+from app.db.featurePersistence import load_json_snapshot
+
+FEATURES = 100
+Row = namedtuple(
+    "Row",
+    "feature_name user_id value justification isDefault timestamp",
+)
+TIMESTAMP = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def write_binary(path: str, overrides: int) -> None:
+    per_feature = overrides // FEATURES
+
+    def groups():
+        for f in range(FEATURES):
+            name = f"feature_{f}"
+            yield name, None, (
+                Row(name, f"user_{i}", "on", None, None, TIMESTAMP)
+                for i in range(per_feature)
+            )
+
+    with open(path, "wb") as out:
+        encode_binary_snapshot(groups(), out)
+
+
+def write_json(path: str, overrides: int) -> None:
+    per_feature = overrides // FEATURES
+    stamp = TIMESTAMP.isoformat()
+    with open(path, "w") as out:
+        out.write('{"features": {}, "overrides": {')
+        for f in range(FEATURES):
+            name = f"feature_{f}"
+            group = {
+                f"user_{i}": {
+                    "feature_name": name,
+                    "user_id": f"user_{i}",
+                    "value": "on",
+                    "justification": None,
+                    "isDefault": None,
+                    "timestamp": stamp,
+                }
+                for i in range(per_feature)
+            }
+            out.write(("," if f else "") + json.dumps(name) + ":")
+            json.dump(group, out)
+        out.write("}}")
+
+
+def measure(kind: str, path: str) -> None:
+    """Print load seconds, first-access seconds and peak RSS in MB."""
+    start = time.perf_counter()
+    if kind == "json":
+        state = load_json_snapshot(path)
+    else:
+        state = load_binary_snapshot(path)
+    loaded = time.perf_counter() - start
+    start = time.perf_counter()
+    state.overrides["feature_0"].get("user_0")
+    first_access = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps([loaded, first_access, peak]))
+
+
+def run_measure(kind: str, path: str):
+    output = subprocess.run(
+        [sys.executable, "-m", __spec__.name, "--measure", kind, path],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def run(sizes, json_max):
+    print(
+        f"{'overrides':>10} {'format':>7} {'load s':>8} "
+        f"{'1st access s':>13} {'peak MB':>8} {'file MB':>8}"
+    )
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            formats = [("binary", write_binary)]
+            if size <= json_max:
+                formats.insert(0, ("json", write_json))
+            for kind, write in formats:
+                path = str(Path(tmp) / f"features.{kind}")
+                write(path, size)
+                loaded, first_access, peak = run_measure(kind, path)
+                file_mb = Path(path).stat().st_size / 1e6
+                print(
+                    f"{size:>10} {kind:>7} {loaded:>8.3f} "
+                    f"{first_access:>13.4f} {peak:>8.0f} {file_mb:>8.0f}"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="100000,1000000,10000000")
+    parser.add_argument(
+        "--json-max",
+        type=int,
+        default=1_000_000,
+        help="largest size also measured with the JSON format",
+    )
+    parser.add_argument("--measure", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        measure(*args.measure)
+    else:
+        run([int(s) for s in args.sizes.split(",")], args.json_max)
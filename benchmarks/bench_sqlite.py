@@ -0,0 +1,98 @@
+"""
+Compare the SQLite DAO with the JSON-file in-memory DAO.
+
+Reports mean create_override and get_override latency as the dataset
+grows. The JSON-file DAO rewrites its whole snapshot on each write; the
+SQLite DAO writes one row through its primary key.
+
+    python -m benchmarks.bench_sqlite [--sizes 1000,10000,100000]
+"""
+import argparse
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from app.db.featurePersistence import JsonSnapshotPersistence
+from app.db.inMemoryFeatureConfigDao import InMemoryFeatureConfigDao
+from app.db.sqliteFeatureConfigDao import SqliteFeatureConfigDao
+from app.items.featureOverride import FeatureOverride
+
+from .bench_persistence import FEATURES, seed_snapshot, seed_state
+
+WRITES = 20
+READS = 10_000
+
+
+def seed_sqlite(path: str, overrides: int) -> None:
+    """Load the same dataset seed_snapshot writes, in one transaction."""
+    state = seed_state(overrides)
+    SqliteFeatureConfigDao(path).close()
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executemany(
+            "INSERT INTO features (feature_name, value) VALUES (?, ?)",
+            ((f.feature_name, f.value) for f in state.features.values()),
+        )
+        conn.executemany(
+            "INSERT INTO overrides (feature_name, user_id, value) "
+            "VALUES (?, ?, ?)",
+            (
+                (name, o.user_id, o.value)
+                for name, group in state.overrides.items()
+                for o in group.values()
+            ),
+        )
+    conn.close()
+
+
+def time_dao(dao, size: int):
+    """Return (mean write ms, mean read us)."""
+    start = time.perf_counter()
+    for i in range(WRITES):
+        dao.create_override(
+            "bench",
+            FeatureOverride(
+                feature_name="bench", user_id=f"new_{i}", value="off"
+            ),
+        )
+    write_ms = (time.perf_counter() - start) * 1000 / WRITES
+    start = time.perf_counter()
+    per_feature = max(size // FEATURES, 1)
+    for i in range(READS):
+        dao.get_override("bench", f"user_{i * 7919 % per_feature}")
+    read_us = (time.perf_counter() - start) * 1e6 / READS
+    return write_ms, read_us
+
+
+def run(sizes):
+    print(
+        f"{'overrides':>10} {'json write ms':>14} {'sqlite write ms':>16} "
+        f"{'json read us':>13} {'sqlite read us':>15}"
+    )
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = str(Path(tmp) / "features.json")
+            seed_snapshot(json_path, size)
+            dao = InMemoryFeatureConfigDao(
+                json_path, JsonSnapshotPersistence(json_path)
+            )
+            json_write, json_read = time_dao(dao, size)
+            dao.close()
+
+            db_path = str(Path(tmp) / "features.db")
+            seed_sqlite(db_path, size)
+            dao = SqliteFeatureConfigDao(db_path)
+            sqlite_write, sqlite_read = time_dao(dao, size)
+            dao.close()
+        print(
+            f"{size:>10} {json_write:>14.3f} {sqlite_write:>16.3f} "
+            f"{json_read:>13.2f} {sqlite_read:>15.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    args = parser.parse_args()
+    run([int(s) for s in args.sizes.split(",")])
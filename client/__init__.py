@@ -0,0 +1,5 @@
+"""Client evaluating feature flags locally; needs only the HTTP API."""
+from .featureFlagClient import FeatureFlagClient
+from .models import Feature, FeatureOverride
+
+__all__ = ["Feature", "FeatureFlagClient", "FeatureOverride"]
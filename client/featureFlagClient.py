@@ -0,0 +1,301 @@
+import json
+import logging
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import quote
+
+import httpx
+
+from .models import Feature, FeatureOverride
+
+logger = logging.getLogger(__name__)
+
+# Change feed answers: everything missed must be reloaded, and no change
+# feed on this server
+RESYNC = 410
+NO_CHANGE_FEED = 501
+# longest wait between full reloads from a server without a change feed
+MAX_RELOAD_SECONDS = 600
+
+
+class FeatureFlagClient:
+    """
+    Evaluates feature flags locally from a copy of the whole store.
+
+    The copy is loaded from GET /export when the client starts, then
+    kept current by a background thread long-polling GET /changes, so a
+    write reaches the copy within one round trip of being made. When the
+    server asks for a resync, or has no change feed, the copy is
+    reloaded in full instead; without a change feed, e.g. from a
+    FEATURE_DAO=shared reader worker, reloads back off up to
+    MAX_RELOAD_SECONDS apart, and stats() reports "change_feed": False.
+
+    Lookups are dict reads on the copy, with no network call and no
+    lock; values resolve exactly as GET /feature/{name}/user/{id} does.
+    Only the service's HTTP API is used, so the client does not need
+    the service's code installed.
+    If the server becomes unreachable, the last copy keeps being served
+    while the thread retries with backoff.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        poll_seconds: float = 30,
+        http: Optional[httpx.Client] = None,
+        background: bool = True,
+    ):
+        """
+        Load the store and, if background, start keeping it current.
+
+        Args:
+            base_url: The feature flag service's URL
+            poll_seconds: How long each long poll waits for a change, at
+                most 60; also the reload interval without a change feed
+            http: Client to make requests with, e.g. one with custom
+                auth or transport; base_url is ignored when given
+            background: Whether to start the sync thread; without it,
+                call sync() to catch up
+
+        Raises:
+            httpx.HTTPError: If the initial load fails
+        """
+        self.poll_seconds = poll_seconds
+        self.http = http or httpx.Client(
+            base_url=base_url, timeout=poll_seconds + 10
+        )
+        self.log_id: Optional[str] = None
+        self.version: Optional[int] = None
+        self.last_sync = 0.0
+        self.reloads = 0
+        self.reload_seconds = poll_seconds
+        self._warned_no_change_feed = False
+        self._features: Dict[str, Feature] = {}
+        self._overrides: Dict[str, Dict[str, FeatureOverride]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.load()
+        if background:
+            self._thread = threading.Thread(
+                target=self._run, name="feature-flag-sync", daemon=True
+            )
+            self._thread.start()
+
+    def get_feature_for_user(
+        self, feature_name: str, user_id: str
+    ) -> FeatureOverride:
+        """
+        Return a user's value of a feature, as the service would.
+
+        Raises:
+            ValueError: If the feature is not found
+        """
+        # the service's rule: an override wins, then the rollout variant,
+        # otherwise the feature's value, the only one reported isDefault
+        override = self._overrides.get(feature_name, {}).get(user_id)
+        if override is not None:
+            return override
+        feature = self._features.get(feature_name)
+        if feature is None:
+            raise ValueError(f"Feature {feature_name} not found")
+        variant = None if feature.rollout is None else (
+            feature.rollout.value_for(feature_name, user_id)
+        )
+        return FeatureOverride(
+            feature_name=feature_name,
+            user_id=user_id,
+            value=feature.value if variant is None else variant,
+            isDefault=variant is None,
+        )
+
+    def get_value(
+        self,
+        feature_name: str,
+        user_id: str,
+        default: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Return just a user's value of a feature, or default if missing.
+
+        Builds no FeatureOverride, for hot paths.
+        """
+        # same rule as get_feature_for_user
+        override = self._overrides.get(feature_name, {}).get(user_id)
+        if override is not None:
+            return override.value
+        feature = self._features.get(feature_name)
+        if feature is None:
+            return default
+        if feature.rollout is not None:
+            variant = feature.rollout.value_for(feature_name, user_id)
+            if variant is not None:
+                return variant
+        return feature.value
+
+    def load(self) -> None:
+        """Replace the copy with a fresh one of the whole store."""
+        response = self.http.get("/changes")
+        if response.status_code == NO_CHANGE_FEED:
+            log_id = version = None
+            if not self._warned_no_change_feed:
+                self._warned_no_change_feed = True
+                logger.warning(
+                    "Server has no change feed; reloading all flags up to "
+                    "every %ss instead",
+                    MAX_RELOAD_SECONDS,
+                )
+        else:
+            response.raise_for_status()
+            # read first: changes made during the export are replayed
+            head = response.json()
+            log_id, version = head["log_id"], head["version"]
+        features = {}
+        overrides: Dict[str, Dict[str, FeatureOverride]] = {}
+        with self.http.stream("GET", "/export") as export:
+            export.raise_for_status()
+            for line in export.iter_lines():
+                if not line:
+                    continue
+                item = json.loads(line)
+                if "feature" in item:
+                    feature = Feature.model_validate(item["feature"])
+                    features[feature.feature_name] = feature
+                else:
+                    override = _override(item["override"])
+                    overrides.setdefault(override.feature_name, {})[
+                        override.user_id
+                    ] = override
+        self._features, self._overrides = features, overrides
+        self.log_id, self.version = log_id, version
+        self.reloads += 1
+        self.last_sync = time.time()
+        logger.info(
+            "Loaded %d features at version %s", len(features), version
+        )
+
+    def sync(self, wait: float = 0) -> None:
+        """
+        Apply the changes made since the copy's version.
+
+        Args:
+            wait: How long to wait for a change when there is none yet
+        """
+        if self.version is None:
+            if wait:
+                self._stop.wait(max(wait, self.reload_seconds))
+            self.load()
+            if self.version is None:
+                # each full reload waits twice as long as the last
+                self.reload_seconds = min(
+                    self.reload_seconds * 2, MAX_RELOAD_SECONDS
+                )
+            else:
+                self.reload_seconds = self.poll_seconds
+            return
+        response = self.http.get(
+            "/changes",
+            params={
+                "since": self.version,
+                "log_id": self.log_id,
+                "wait": wait,
+            },
+        )
+        if response.status_code in (RESYNC, NO_CHANGE_FEED):
+            logger.info("Reloading flags: %s", response.text)
+            self.load()
+            return
+        response.raise_for_status()
+        changes = response.json()
+        for name, feature in changes["features"].items():
+            if feature is None:
+                self._features.pop(name, None)
+            else:
+                self._features[name] = Feature.model_validate(feature)
+        for name, users in changes["overrides"].items():
+            overrides = self._overrides.setdefault(name, {})
+            for user_id, override in users.items():
+                if override is None:
+                    overrides.pop(user_id, None)
+                else:
+                    overrides[user_id] = _override(override)
+        for name in changes["reload"]:
+            self._overrides[name] = self._load_overrides(name)
+        self.version = changes["version"]
+        self.last_sync = time.time()
+
+    def close(self) -> None:
+        """
+        Stop syncing; the copy can still be read.
+
+        Does not wait for a long poll in progress: the sync thread
+        finishes it, then exits and closes the HTTP client.
+        """
+        self._stop.set()
+        if self._thread is None:
+            self.http.close()
+
+    def stats(self) -> dict:
+        return {
+            "features": len(self._features),
+            # copied in one step, as sync may add features meanwhile
+            "overrides": sum(map(len, list(self._overrides.values()))),
+            "log_id": self.log_id,
+            "version": self.version,
+            "reloads": self.reloads,
+            "change_feed": self.version is not None,
+            "seconds_since_sync": time.time() - self.last_sync,
+        }
+
+    def __enter__(self) -> "FeatureFlagClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _load_overrides(
+        self, feature_name: str
+    ) -> Dict[str, FeatureOverride]:
+        overrides = {}
+        cursor = None
+        while True:
+            params = {"limit": 1000}
+            if cursor is not None:
+                params["cursor"] = cursor
+            response = self.http.get(
+                f"/feature/{quote(feature_name, safe='')}/overrides",
+                params=params,
+            )
+            if response.status_code == 404:
+                return {}
+            response.raise_for_status()
+            page = response.json()
+            for data in page["overrides"]:
+                override = _override(data)
+                overrides[override.user_id] = override
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return overrides
+
+    def _run(self) -> None:
+        backoff = 0.0
+        while not self._stop.wait(backoff):
+            try:
+                self.sync(min(self.poll_seconds, 60))
+                backoff = 0.0
+            except Exception as e:
+                # keep serving the last copy
+                backoff = min(max(backoff * 2, 1.0), 60.0)
+                logger.warning(
+                    "Flag sync failed, retrying in %.0fs: %s", backoff, e
+                )
+        self.http.close()
+
+
+def _override(data: dict) -> FeatureOverride:
+    override = FeatureOverride.model_validate(data)
+    # stored as get_feature_for_user returns it, so it is not copied on
+    # every lookup
+    if override.isDefault is None:
+        override.isDefault = False
+    return override
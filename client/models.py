@@ -0,0 +1,70 @@
+"""
+The service's JSON, as FeatureFlagClient reads it.
+
+These mirror the service's own models field for field, so a dump is
+the JSON the service sends, but check nothing the service has already
+validated. rollout_bucket must hash users exactly as the service does.
+"""
+from bisect import bisect_right
+from datetime import datetime
+from functools import cached_property
+from hashlib import blake2b
+from typing import List, Optional, Tuple
+
+from pydantic import BaseModel
+
+# Users are hashed into this many buckets, as by the service
+BUCKETS = 10_000
+
+
+class RolloutVariant(BaseModel):
+    value: str
+    percentage: float
+
+
+class Rollout(BaseModel):
+    variants: List[RolloutVariant]
+    salt: str = ""
+
+    @cached_property
+    def _plan(self) -> Tuple[Tuple[int, ...], Tuple[str, ...]]:
+        """Each variant's last bucket + 1, and the values, to bisect."""
+        cutoffs = []
+        total = 0.0
+        for variant in self.variants:
+            total += variant.percentage
+            cutoffs.append(round(total * BUCKETS / 100))
+        return tuple(cutoffs), tuple(v.value for v in self.variants)
+
+    def value_for(self, feature_name: str, user_id: str) -> Optional[str]:
+        """Return the variant user_id falls into, None if past them all."""
+        cutoffs, values = self._plan
+        index = bisect_right(
+            cutoffs, rollout_bucket(feature_name, user_id, self.salt)
+        )
+        return values[index] if index < len(values) else None
+
+
+class Feature(BaseModel):
+    feature_name: str
+    value: str
+    feature_description: Optional[str] = None
+    timestamp: Optional[datetime] = None
+    rollout: Optional[Rollout] = None
+
+
+class FeatureOverride(BaseModel):
+    feature_name: str
+    user_id: str
+    value: str
+    justification: Optional[str] = None
+    isDefault: Optional[bool] = None
+    timestamp: Optional[datetime] = None
+
+
+def rollout_bucket(feature_name: str, user_id: str, salt: str = "") -> int:
+    """Hash a user into one of BUCKETS buckets for a feature."""
+    digest = blake2b(
+        f"{feature_name}\0{salt}\0{user_id}".encode(), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "big") % BUCKETS
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from app.activity.evaluateFeatureForUsers import (
+    evaluate_feature_for_users,
+    evaluate_feature_for_users_async,
+)
+from app.activity.getFeatureForUser import get_feature_for_user
+from app.db.asyncDaoAdapter import as_async_dao
+from app.db.inMemoryFeatureConfigDao import InMemoryFeatureConfigDao
+from app.items.feature import Feature
+from app.items.featureOverride import FeatureOverride
+
+
+def _dao(tmp_path):
+    dao = InMemoryFeatureConfigDao(cache_file=str(tmp_path / "f.json"))
+    dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+    dao.create_override(
+        "dummy",
+        FeatureOverride(feature_name="dummy", user_id="user_2", value="off"),
+    )
+    return dao
+
+
+def test_evaluate_feature_for_users_streams_batches(tmp_path):
+    dao = _dao(tmp_path)
+    batches = evaluate_feature_for_users(
+        "dummy", iter([["user_1", "user_2"], ["user_3"]]), dao
+    )
+    assert list(batches) == [
+        [("user_1", "enabled", True), ("user_2", "off", False)],
+        [("user_3", "enabled", True)],
+    ]
+
+
+def test_evaluate_feature_for_users_missing_feature(tmp_path):
+    dao = _dao(tmp_path)
+    with pytest.raises(ValueError, match="Feature missing not found"):
+        evaluate_feature_for_users("missing", iter([["user_1"]]), dao)
+
+
+def test_evaluate_feature_for_users_async(tmp_path):
+    dao = as_async_dao(_dao(tmp_path))
+
+    async def batches():
+        yield ["user_2"]
+        yield ["user_1"]
+
+    async def collect():
+        results = await evaluate_feature_for_users_async(
+            "dummy", batches(), dao
+        )
+        return [batch async for batch in results]
+
+    assert asyncio.run(collect()) == [
+        [("user_2", "off", False)],
+        [("user_1", "enabled", True)],
+    ]
+
+
+def test_evaluate_feature_for_users_applies_rollout(tmp_path):
+    dao = _dao(tmp_path)
+    dao.create_feature(
+        Feature(
+            feature_name="dummy",
+            value="enabled",
+            rollout={"variants": [{"value": "beta", "percentage": 50}]},
+        )
+    )
+    user_ids = [f"user_{i}" for i in range(100)]
+
+    (batch,) = evaluate_feature_for_users("dummy", iter([user_ids]), dao)
+
+    assert batch == [
+        (user_id, resolved.value, resolved.isDefault)
+        for user_id in user_ids
+        for resolved in [get_feature_for_user("dummy", user_id, dao)]
+    ]
+    assert ("user_2", "off", False) in batch
+    assert {value for _, value, _ in batch} == {"enabled", "beta", "off"}
+
+
+def test_evaluate_feature_for_users_keeps_stored_is_default(tmp_path):
+    dao = _dao(tmp_path)
+    dao.create_override(
+        "dummy",
+        FeatureOverride(
+            feature_name="dummy",
+            user_id="user_3",
+            value="enabled",
+            isDefault=True,
+        ),
+    )
+    user_ids = ["user_1", "user_2", "user_3"]
+
+    (batch,) = evaluate_feature_for_users("dummy", iter([user_ids]), dao)
+
+    assert batch == [
+        (user_id, resolved.value, resolved.isDefault)
+        for user_id in user_ids
+        for resolved in [get_feature_for_user("dummy", user_id, dao)]
+    ]
+    assert batch[2] == ("user_3", "enabled", True)
@@ -0,0 +1,53 @@
+import asyncio
+
+from app.activity.evaluateFeatures import (
+    evaluate_features,
+    evaluate_features_async,
+)
+from app.db.asyncDaoAdapter import as_async_dao
+from app.db.cachedFeatureConfigDao import CachedFeatureConfigDao
+from app.db.inMemoryFeatureConfigDao import InMemoryFeatureConfigDao
+from app.items.feature import Feature
+from app.items.featureOverride import FeatureOverride
+
+
+def _seed(dao):
+    dao.create_feature(Feature(feature_name="a", value="enabled"))
+    dao.create_feature(Feature(feature_name="b", value="enabled"))
+    dao.create_override(
+        "b",
+        FeatureOverride(feature_name="b", user_id="user_1", value="off"),
+    )
+
+
+def test_evaluate_features_resolves_each_name(tmp_path):
+    dao = InMemoryFeatureConfigDao(cache_file=str(tmp_path / "f.json"))
+    _seed(dao)
+
+    results = evaluate_features(["b", "missing", "a", "b"], "user_1", dao)
+    assert list(results) == ["b", "missing", "a"]
+    assert results["a"].value == "enabled"
+    assert results["a"].isDefault is True
+    assert results["b"].value == "off"
+    assert results["b"].isDefault is False
+    assert results["missing"] is None
+
+
+def test_evaluate_features_async_reads_through_cache(tmp_path):
+    base_dao = InMemoryFeatureConfigDao(cache_file=str(tmp_path / "f.json"))
+    _seed(base_dao)
+    dao = CachedFeatureConfigDao(base_dao)
+
+    for _ in range(2):
+        results = asyncio.run(
+            evaluate_features_async(
+                ["a", "b", "missing"], "user_1", as_async_dao(dao)
+            )
+        )
+        assert results["a"].value == "enabled"
+        assert results["b"].value == "off"
+        assert results["missing"] is None
+    stats = dao.stats()["cache"]
+    # overrides of a, b and missing, then features a and missing
+    assert stats["misses"] == 5
+    assert stats["positive_hits"] + stats["negative_hits"] == 5
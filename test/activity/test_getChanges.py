@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from app.activity.getChanges import (
+    get_changes,
+    watch_changes_async,
+)
+from app.db.asyncDaoAdapter import as_async_dao
+from app.db.cachedFeatureConfigDao import CachedFeatureConfigDao
+from app.db.changeLog import ChangeLog, ResyncRequired
+from app.db.inMemoryFeatureConfigDao import InMemoryFeatureConfigDao
+from app.items.feature import Feature
+from app.items.featureOverride import FeatureOverride
+
+
+def _dao(tmp_path, max_entries=100):
+    dao = CachedFeatureConfigDao(
+        InMemoryFeatureConfigDao(cache_file=str(tmp_path / "f.json"))
+    )
+    log = ChangeLog(max_entries)
+    dao.add_invalidation_listener(log.record)
+    return dao, log
+
+
+def _override(user_id, value="off"):
+    return FeatureOverride(feature_name="dummy", user_id=user_id, value=value)
+
+
+def test_changes_collapse_to_current_values(tmp_path):
+    dao, log = _dao(tmp_path)
+    dao.create_feature(Feature(feature_name="dummy", value="on"))
+    dao.create_override("dummy", _override("user_1"))
+    dao.create_override("dummy", _override("user_1", "later"))
+    dao.create_override("dummy", _override("user_2"))
+    dao.delete_override("dummy", "user_2")
+
+    changes = get_changes(0, log, dao)
+    assert changes.version == 5
+    assert changes.features["dummy"].value == "on"
+    assert changes.overrides["dummy"]["user_1"].value == "later"
+    assert changes.overrides["dummy"]["user_2"] is None
+    assert changes.reload == []
+    assert get_changes(5, log, dao).overrides == {}
+
+
+def test_bulk_write_asks_for_a_reload(tmp_path):
+    dao, log = _dao(tmp_path)
+    dao.create_feature(Feature(feature_name="dummy", value="on"))
+    dao.create_override("dummy", _override("user_1"))
+    dao.bulk_write_overrides("dummy", {"user_2": _override("user_2")})
+
+    changes = get_changes(0, log, dao)
+    assert changes.reload == ["dummy"]
+    assert changes.overrides == {}
+    with pytest.raises(ResyncRequired):
+        get_changes(changes.version, ChangeLog(), dao)
+
+
+def test_watch_pushes_writes_and_heartbeats(tmp_path):
+    dao, log = _dao(tmp_path)
+    dao.create_feature(Feature(feature_name="dummy", value="on"))
+
+    async def scenario():
+        watch = watch_changes_async(
+            None, log, as_async_dao(dao), heartbeat_seconds=0.05
+        )
+        first = await watch.__anext__()
+        assert (first.version, first.features) == (1, {})
+        assert await watch.__anext__() is None
+        pending = asyncio.ensure_future(watch.__anext__())
+        await asyncio.sleep(0.01)
+        dao.create_override("dummy", _override("user_1"))
+        changes = await pending
+        await watch.aclose()
+        return changes
+
+    changes = asyncio.run(scenario())
+    assert changes.version == 2
+    assert changes.overrides["dummy"]["user_1"].value == "off"
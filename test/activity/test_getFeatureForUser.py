@@ -1,4 +1,10 @@
-from app.activity.getFeatureForUser import get_feature_for_user
+import asyncio
+
+from app.activity.getFeatureForUser import (
+    get_feature_for_user,
+    get_feature_for_user_async,
+)
+from app.db.asyncDaoAdapter import as_async_dao
 from app.db.inMemoryFeatureConfigDao import InMemoryFeatureConfigDao
 from app.items.feature import Feature
 from app.items.featureOverride import FeatureOverride
@@ -55,3 +61,43 @@ def test_get_feature_for_user_missing_feature_raises_error(tmp_path):
         assert str(exc) == "Feature dummy not found"
     else:
         assert False, "Expected ValueError when feature is missing"
+
+
+def test_get_feature_for_user_async_returns_default(tmp_path):
+    cache_file = tmp_path / "features.json"
+    dao = InMemoryFeatureConfigDao(cache_file=str(cache_file))
+    dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+
+    retrieved = asyncio.run(
+        get_feature_for_user_async("dummy", "user_1", as_async_dao(dao))
+    )
+    assert retrieved.value == "enabled"
+    assert retrieved.isDefault is True
+
+
+def test_get_feature_for_user_rollout_then_override(tmp_path):
+    cache_file = tmp_path / "features.json"
+    dao = InMemoryFeatureConfigDao(cache_file=str(cache_file))
+    dao.create_feature(
+        Feature(
+            feature_name="dummy",
+            value="enabled",
+            rollout={"variants": [{"value": "beta", "percentage": 50}]},
+        )
+    )
+
+    values = [
+        get_feature_for_user("dummy", f"user_{i}", dao) for i in range(200)
+    ]
+    reached = [v for v in values if v.value == "beta"]
+    assert 0 < len(reached) < 200
+    assert all(v.isDefault is False for v in reached)
+    assert all(v.isDefault is True for v in values if v not in reached)
+
+    # an override wins over the rollout
+    user_id = reached[0].user_id
+    dao.create_override(
+        "dummy",
+        FeatureOverride(feature_name="dummy", user_id=user_id, value="off"),
+    )
+    assert get_feature_for_user("dummy", user_id, dao).value == "off"
@@ -0,0 +1,47 @@
+import pytest
+
+from app.activity.importOverrides import import_overrides
+from app.db.inMemoryFeatureConfigDao import InMemoryFeatureConfigDao
+from app.items.feature import Feature
+from app.items.featureOverride import FeatureOverride
+from app.items.overrideChange import OverrideChange
+
+
+def test_import_overrides_sets_and_deletes(tmp_path):
+    dao = InMemoryFeatureConfigDao(cache_file=str(tmp_path / "f.json"))
+    dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+    dao.create_override(
+        "dummy",
+        FeatureOverride(feature_name="dummy", user_id="user_1", value="off"),
+    )
+    version = dao.version
+
+    written, deleted = import_overrides(
+        "dummy",
+        [
+            OverrideChange(user_id="user_1", delete=True),
+            OverrideChange(user_id="user_2", value="a"),
+            OverrideChange(user_id="user_3", value="b"),
+            OverrideChange(user_id="user_3", value="c"),
+            OverrideChange(user_id="user_4", delete=True),
+        ],
+        dao,
+    )
+    assert (written, deleted) == (2, 1)
+    assert dao.get_override("dummy", "user_1") is None
+    assert dao.get_override("dummy", "user_2").value == "a"
+    assert dao.get_override("dummy", "user_3").value == "c"
+    assert dao.get_override("dummy", "user_3").timestamp is not None
+    # one atomic write
+    assert dao.version == version + 1
+
+    reopened = InMemoryFeatureConfigDao(cache_file=str(tmp_path / "f.json"))
+    assert reopened.get_override("dummy", "user_3").value == "c"
+
+
+def test_import_overrides_missing_feature(tmp_path):
+    dao = InMemoryFeatureConfigDao(cache_file=str(tmp_path / "f.json"))
+    with pytest.raises(ValueError, match="Feature not found"):
+        import_overrides(
+            "missing", [OverrideChange(user_id="user_1", value="a")], dao
+        )
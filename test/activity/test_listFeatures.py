@@ -0,0 +1,49 @@
+import pytest
+
+from app.activity.listFeatures import (
+    InvalidCursor,
+    list_features,
+    list_overrides,
+)
+from app.db.inMemoryFeatureConfigDao import InMemoryFeatureConfigDao
+from app.items.feature import Feature
+from app.items.featureOverride import FeatureOverride
+
+
+def test_list_features_pages_with_cursors(tmp_path):
+    dao = InMemoryFeatureConfigDao(cache_file=str(tmp_path / "f.json"))
+    for i in range(5):
+        dao.create_feature(Feature(feature_name=f"f{i}", value="on"))
+
+    names = []
+    cursor = None
+    pages = 0
+    while True:
+        page = list_features(cursor, 2, dao)
+        names += [feature.feature_name for feature in page.items]
+        pages += 1
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert names == ["f0", "f1", "f2", "f3", "f4"]
+    assert pages == 3
+
+
+def test_list_overrides_last_page_has_no_cursor(tmp_path):
+    dao = InMemoryFeatureConfigDao(cache_file=str(tmp_path / "f.json"))
+    dao.create_feature(Feature(feature_name="dummy", value="on"))
+    for user_id in ("user_1", "user_2"):
+        dao.create_override(
+            "dummy",
+            FeatureOverride(
+                feature_name="dummy", user_id=user_id, value="off"
+            ),
+        )
+
+    page = list_overrides("dummy", None, 2, dao)
+    assert [o.user_id for o in page.items] == ["user_1", "user_2"]
+    assert page.next_cursor is None
+    with pytest.raises(ValueError, match="Feature missing not found"):
+        list_overrides("missing", None, 2, dao)
+    with pytest.raises(InvalidCursor):
+        list_overrides("dummy", "not a cursor!", 2, dao)
@@ -0,0 +1,143 @@
+import subprocess
+import sys
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.db.cachedFeatureConfigDao import CachedFeatureConfigDao
+from app.db.inMemoryFeatureConfigDao import InMemoryFeatureConfigDao
+from app.items.feature import Feature
+from app.items.featureOverride import FeatureOverride
+from client.featureFlagClient import FeatureFlagClient
+
+
+def _override(user_id, value="off"):
+    return FeatureOverride(feature_name="dummy", user_id=user_id, value=value)
+
+
+@pytest.fixture
+def dao(tmp_path, monkeypatch):
+    dao = CachedFeatureConfigDao(
+        InMemoryFeatureConfigDao(cache_file=str(tmp_path / "f.json"))
+    )
+    monkeypatch.setattr("app.main.dao", dao)
+    dao.create_feature(Feature(feature_name="dummy", value="on"))
+    dao.create_override("dummy", _override("user_1"))
+    return dao
+
+
+def test_local_evaluation_matches_the_service(dao):
+    http = TestClient(app)
+    client = FeatureFlagClient("", http=http, background=False)
+
+    for user_id in ("user_1", "user_2"):
+        served = http.get(f"/feature/dummy/user/{user_id}").json()
+        local = client.get_feature_for_user("dummy", user_id)
+        assert local.model_dump(mode="json") == served["override"]
+    assert client.get_value("dummy", "user_1") == "off"
+    assert client.get_value("missing", "user_1", "fallback") == "fallback"
+    with pytest.raises(ValueError, match="Feature missing not found"):
+        client.get_feature_for_user("missing", "user_1")
+
+
+def test_local_rollouts_match_the_service(dao):
+    dao.create_feature(
+        Feature(
+            feature_name="dummy",
+            value="on",
+            rollout={"variants": [{"value": "beta", "percentage": 30}]},
+        )
+    )
+    http = TestClient(app)
+    client = FeatureFlagClient("", http=http, background=False)
+
+    values = set()
+    for i in range(50):
+        served = http.get(f"/feature/dummy/user/user_{i}").json()
+        local = client.get_feature_for_user("dummy", f"user_{i}")
+        assert local.model_dump(mode="json") == served["override"]
+        assert client.get_value("dummy", f"user_{i}") == local.value
+        values.add(local.value)
+    assert values == {"on", "off", "beta"}
+
+
+def test_sync_applies_changes_and_reloads(dao):
+    client = FeatureFlagClient("", http=TestClient(app), background=False)
+    dao.create_feature(Feature(feature_name="other", value="on"))
+    dao.create_override("dummy", _override("user_2"))
+    dao.delete_override("dummy", "user_1")
+
+    client.sync()
+    assert client.get_value("other", "user_1") == "on"
+    assert client.get_value("dummy", "user_2") == "off"
+    assert client.get_value("dummy", "user_1") == "on"
+    assert client.reloads == 1
+
+    dao.bulk_write_overrides("dummy", {"user_3": _override("user_3")})
+    client.sync()
+    assert client.get_value("dummy", "user_3") == "off"
+
+    # the change log no longer covers the client's version
+    client.version += 1
+    client.sync()
+    assert client.reloads == 2
+    assert client.stats()["overrides"] == 2
+
+
+def test_reload_quotes_feature_names(dao):
+    dao.create_feature(Feature(feature_name="a b?c", value="on"))
+    client = FeatureFlagClient("", http=TestClient(app), background=False)
+    override = FeatureOverride(feature_name="a b?c", user_id="u", value="x")
+    dao.bulk_write_overrides("a b?c", {"u": override})
+
+    client.sync()
+    assert client.get_value("a b?c", "u") == "x"
+
+
+def test_client_needs_only_the_http_api():
+    imported = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, client; "
+            "print(any(m.split('.')[0] == 'app' for m in sys.modules))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert imported.stdout.strip() == "False"
+
+
+def test_background_sync_picks_up_writes(dao):
+    with FeatureFlagClient(
+        "", poll_seconds=0.05, http=TestClient(app)
+    ) as client:
+        dao.create_override("dummy", _override("user_1", "later"))
+        deadline = time.monotonic() + 5
+        while client.get_value("dummy", "user_1") != "later":
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+
+def test_reloads_without_a_change_feed(tmp_path, monkeypatch, caplog):
+    dao = InMemoryFeatureConfigDao(cache_file=str(tmp_path / "f.json"))
+    monkeypatch.setattr("app.main.dao", dao)
+    client = FeatureFlagClient(
+        "", poll_seconds=10, http=TestClient(app), background=False
+    )
+    assert client.version is None
+    assert client.stats()["change_feed"] is False
+    dao.create_feature(Feature(feature_name="dummy", value="on"))
+
+    client.sync()
+    client.sync()
+    assert client.get_value("dummy", "user_1") == "on"
+    # reloads back off, and the degradation is reported once
+    assert client.reload_seconds == 40
+    warnings = [
+        r for r in caplog.records if "no change feed" in r.getMessage()
+    ]
+    assert len(warnings) == 1
@@ -0,0 +1,80 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from app.db.asyncDaoAdapter import AsyncDaoAdapter, as_async_dao
+from app.db.cachedFeatureConfigDao import CachedFeatureConfigDao
+from app.db.groupCommitPersistence import GroupCommitPersistence
+from app.db.inMemoryFeatureConfigDao import InMemoryFeatureConfigDao
+from app.db.sqliteFeatureConfigDao import SqliteFeatureConfigDao
+from app.db.writeAheadLog import WriteAheadLogPersistence
+from app.items.feature import Feature
+from app.items.featureOverride import FeatureOverride
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.submitted = 0
+
+    def submit(self, fn, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(fn, *args, **kwargs)
+
+
+async def _exercise(adapter):
+    await adapter.create_feature(Feature(feature_name="dummy", value="on"))
+    await adapter.create_override(
+        "dummy",
+        FeatureOverride(feature_name="dummy", user_id="user_1", value="off"),
+    )
+    feature = await adapter.get_feature("dummy")
+    override = await adapter.get_override("dummy", "user_1")
+    deleted = await adapter.delete_override("dummy", "user_1")
+    return feature, override, deleted
+
+
+def test_in_memory_reads_stay_on_the_loop(tmp_path):
+    executor = CountingExecutor()
+    dao = InMemoryFeatureConfigDao(str(tmp_path / "features.json"))
+    adapter = AsyncDaoAdapter(CachedFeatureConfigDao(dao), executor)
+
+    feature, override, deleted = asyncio.run(_exercise(adapter))
+
+    assert feature.value == "on"
+    assert override.value == "off"
+    assert deleted.user_id == "user_1"
+    # only the three snapshot-writing calls left the loop
+    assert executor.submitted == 3
+    executor.shutdown()
+
+
+def test_async_durability_writes_stay_on_the_loop(tmp_path):
+    executor = CountingExecutor()
+    cache_file = str(tmp_path / "features.json")
+    dao = InMemoryFeatureConfigDao(
+        cache_file,
+        GroupCommitPersistence(
+            WriteAheadLogPersistence(cache_file), durability="async"
+        ),
+    )
+    adapter = AsyncDaoAdapter(dao, executor)
+
+    asyncio.run(_exercise(adapter))
+    assert executor.submitted == 0
+
+    asyncio.run(adapter.close())
+    assert executor.submitted == 1
+    executor.shutdown()
+
+
+def test_sqlite_calls_run_on_the_executor(tmp_path):
+    executor = CountingExecutor()
+    adapter = as_async_dao(SqliteFeatureConfigDao(str(tmp_path / "f.db")))
+    adapter.executor = executor
+
+    feature, override, deleted = asyncio.run(_exercise(adapter))
+
+    assert override.value == "off"
+    assert executor.submitted == 5
+    assert as_async_dao(adapter) is adapter
+    executor.shutdown()
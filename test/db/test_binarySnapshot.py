@@ -0,0 +1,211 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.db.binarySnapshot import (
+    GROUP,
+    GROUP_V1,
+    HEADER,
+    BinarySnapshotPersistence,
+    load_binary_snapshot,
+    main,
+    save_binary_snapshot,
+)
+from app.db.featurePersistence import (
+    FeatureState,
+    LazyOverrideGroup,
+    load_json_snapshot,
+    save_json_snapshot,
+)
+from app.db.inMemoryFeatureConfigDao import InMemoryFeatureConfigDao
+from app.db.writeAheadLog import WriteAheadLogPersistence
+from app.items.feature import Feature
+from app.items.featureOverride import FeatureOverride
+
+
+def _state():
+    feature = Feature(
+        feature_name="dummy",
+        value="enabled",
+        feature_description="Enable new UI",
+        timestamp=datetime(2024, 1, 1, 12, 0, 0, 123456),
+        rollout={
+            "variants": [{"value": "beta", "percentage": 12.5}],
+            "salt": "v2",
+        },
+    )
+    overrides = {
+        "user_1": FeatureOverride(
+            feature_name="dummy",
+            user_id="user_1",
+            value="disabled",
+            justification="A/B test",
+            timestamp=datetime(
+                2024, 1, 2, 9, 30, tzinfo=timezone(timedelta(hours=2))
+            ),
+        ),
+        "üser_2": FeatureOverride(
+            feature_name="dummy",
+            user_id="üser_2",
+            value="enabled",
+            isDefault=False,
+        ),
+    }
+    orphan = {
+        "user_3": FeatureOverride(
+            feature_name="orphan", user_id="user_3", value="on"
+        )
+    }
+    return FeatureState(
+        {"dummy": feature}, {"dummy": overrides, "orphan": orphan}
+    )
+
+
+def test_round_trip_preserves_every_field(tmp_path):
+    path = str(tmp_path / "features.bin")
+    state = _state()
+
+    save_binary_snapshot(path, state)
+    loaded = load_binary_snapshot(path)
+
+    assert loaded.features == state.features
+    assert {k: dict(v) for k, v in loaded.overrides.items()} == (
+        state.overrides
+    )
+    assert (
+        loaded.overrides["dummy"]["user_1"].model_dump(mode="json")
+        == state.overrides["dummy"]["user_1"].model_dump(mode="json")
+    )
+
+
+def test_overrides_are_decoded_on_first_access(tmp_path):
+    path = str(tmp_path / "features.bin")
+    save_binary_snapshot(path, _state())
+
+    loaded = load_binary_snapshot(path)
+    group = loaded.overrides["dummy"]
+
+    assert isinstance(group, LazyOverrideGroup)
+    assert len(group) == 2
+    assert not group.loaded
+    assert group.get("user_1").value == "disabled"
+    assert group.loaded
+    assert not loaded.overrides["orphan"].loaded
+
+
+def test_dao_writes_to_lazy_group_and_persists(tmp_path):
+    path = str(tmp_path / "features.bin")
+    save_binary_snapshot(path, _state())
+    dao = InMemoryFeatureConfigDao(path, BinarySnapshotPersistence(path))
+
+    dao.create_override(
+        "dummy",
+        FeatureOverride(feature_name="dummy", user_id="new", value="on"),
+    )
+    dao.delete_override("dummy", "user_1")
+
+    reloaded = InMemoryFeatureConfigDao(
+        path, BinarySnapshotPersistence(path)
+    )
+    assert reloaded.get_override("dummy", "new").value == "on"
+    assert reloaded.get_override("dummy", "user_1") is None
+    assert reloaded.get_override("dummy", "üser_2") is not None
+    assert reloaded.get_override("orphan", "user_3") is not None
+
+
+def test_wal_replays_on_top_of_binary_snapshot(tmp_path):
+    path = str(tmp_path / "features.bin")
+    save_binary_snapshot(path, _state())
+
+    def wal():
+        return WriteAheadLogPersistence(
+            path,
+            load_snapshot=load_binary_snapshot,
+            save_snapshot=save_binary_snapshot,
+        )
+
+    dao = InMemoryFeatureConfigDao(path, wal())
+    dao.delete_override("dummy", "user_1")
+    dao.persistence.compact()
+    dao.create_override(
+        "orphan",
+        FeatureOverride(feature_name="orphan", user_id="new", value="on"),
+    )
+    dao.close()
+
+    reloaded = InMemoryFeatureConfigDao(path, wal())
+    assert reloaded.get_override("dummy", "user_1") is None
+    assert reloaded.get_override("dummy", "üser_2") is not None
+    assert reloaded.get_override("orphan", "new") is not None
+
+
+def test_corrupted_snapshot_is_ignored(tmp_path):
+    path = tmp_path / "features.bin"
+    path.write_bytes(b"not a snapshot at all, clearly")
+
+    state = load_binary_snapshot(str(path))
+
+    assert state.features == {}
+    assert state.overrides == {}
+
+
+def test_converter_round_trips_json(tmp_path):
+    json_file = str(tmp_path / "features.json")
+    binary_file = str(tmp_path / "features.bin")
+    back_file = str(tmp_path / "back.json")
+    save_json_snapshot(json_file, _state())
+
+    main(["to-binary", json_file, binary_file])
+    main(["to-json", binary_file, back_file])
+
+    original = load_json_snapshot(json_file)
+    converted = load_json_snapshot(back_file)
+    assert converted.features == original.features
+    assert converted.overrides == original.overrides
+
+
+def test_reads_version_1_snapshots(tmp_path):
+    path = tmp_path / "features.bin"
+    state = _state()
+    state.features["dummy"] = state.features["dummy"].model_copy(
+        update={"rollout": None}
+    )
+    save_binary_snapshot(str(path), state)
+    # rewrite as version 1: the same, but group entries have no rollout
+    data = bytearray(path.read_bytes())
+    header = list(HEADER.unpack_from(data, 0))
+    header[1] = 1
+    HEADER.pack_into(data, 0, *header)
+    group_index_off = header[-1]
+    entries = [
+        GROUP.unpack_from(data, group_index_off + i * GROUP.size)[:-1]
+        for i in range(header[2])
+    ]
+    del data[group_index_off:]
+    for entry in entries:
+        data += GROUP_V1.pack(*entry)
+    path.write_bytes(bytes(data))
+
+    loaded = load_binary_snapshot(str(path))
+
+    assert loaded.features == state.features
+    assert loaded.overrides["dummy"].get("user_1").value == "disabled"
+
+
+def test_converter_refuses_missing_or_corrupted_source(tmp_path, capsys):
+    destination = tmp_path / "features.bin"
+    save_binary_snapshot(str(destination), _state())
+    good = destination.read_bytes()
+    corrupted = tmp_path / "corrupted.json"
+    corrupted.write_text('{"features": {"dummy": ')
+
+    for source in (tmp_path / "missing.json", corrupted):
+        with pytest.raises(SystemExit) as exc_info:
+            main(["to-binary", str(source), str(destination)])
+        assert exc_info.value.code == 1
+        assert f"Cannot convert {source}" in capsys.readouterr().err
+    with pytest.raises(SystemExit):
+        main(["to-json", str(tmp_path / "missing.bin"), str(corrupted)])
+
+    assert destination.read_bytes() == good
+    assert corrupted.read_text() == '{"features": {"dummy": '
@@ -1,8 +1,10 @@
+import threading
 import time
 from datetime import datetime
 
 from app.db.cachedFeatureConfigDao import CachedFeatureConfigDao
 from app.db.inMemoryFeatureConfigDao import InMemoryFeatureConfigDao
+from app.db.sharedCache import SqliteSharedCache
 from app.items.feature import Feature
 from app.items.featureOverride import FeatureOverride
 
@@ -164,3 +166,217 @@ def test_cache_invalidates_on_delete_override(tmp_path):
 
     result = cached_dao.get_override("dummy", "user_1")
     assert result is None
+
+
+def test_writes_that_change_nothing_invalidate_nothing(tmp_path):
+    """Test a no-op delete or bulk write leaves caches and peers alone."""
+    base_dao = InMemoryFeatureConfigDao(
+        cache_file=str(tmp_path / "features.json")
+    )
+    cached_dao = CachedFeatureConfigDao(base_dao, ttl_seconds=300)
+    invalidations = []
+    cached_dao.add_invalidation_listener(
+        lambda *args: invalidations.append(args)
+    )
+    base_dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+    cached_dao.get_feature("dummy")
+
+    assert cached_dao.delete_override("dummy", "user_1") is None
+    counts = cached_dao.bulk_write_overrides("dummy", {"user_1": None})
+    assert counts == (0, 0)
+    assert invalidations == []
+    hits = cached_dao.positive_hits
+    cached_dao.get_feature("dummy")
+    assert cached_dao.positive_hits == hits + 1
+
+
+def test_cache_is_bounded(tmp_path):
+    """Test that distinct lookups past max_entries evict older entries."""
+    cache_file = tmp_path / "features.json"
+    base_dao = InMemoryFeatureConfigDao(cache_file=str(cache_file))
+    cached_dao = CachedFeatureConfigDao(
+        base_dao, ttl_seconds=300, max_entries=50, max_bytes=20_000
+    )
+    base_dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+    for i in range(500):
+        base_dao.create_override(
+            "dummy",
+            FeatureOverride(
+                feature_name="dummy", user_id=f"user_{i}", value="on"
+            ),
+        )
+        assert cached_dao.get_override("dummy", f"user_{i}").value == "on"
+
+    stats = cached_dao.stats()["cache"]
+    assert stats["entries"] <= 50
+    assert 0 < stats["bytes"] <= 20_000
+
+
+def test_cache_remembers_missing_overrides(tmp_path):
+    """Test that absent overrides are cached until an override is created."""
+    cache_file = tmp_path / "features.json"
+    base_dao = InMemoryFeatureConfigDao(cache_file=str(cache_file))
+    cached_dao = CachedFeatureConfigDao(base_dao, ttl_seconds=300)
+    base_dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+
+    assert cached_dao.get_override("dummy", "user_1") is None
+    # found absent in the cache, not in the base DAO
+    base_dao.overrides["dummy"] = {
+        "user_1": FeatureOverride(
+            feature_name="dummy", user_id="user_1", value="stale"
+        )
+    }
+    assert cached_dao.get_override("dummy", "user_1") is None
+
+    cached_dao.create_override(
+        "dummy",
+        FeatureOverride(feature_name="dummy", user_id="user_1", value="on"),
+    )
+    assert cached_dao.get_override("dummy", "user_1").value == "on"
+    assert cached_dao.get_override("dummy", "user_1").value == "on"
+
+    stats = cached_dao.stats()["cache"]
+    assert stats["negative_hits"] == 1
+    assert stats["positive_hits"] == 1
+    assert stats["misses"] == 2
+
+
+def test_negative_entries_expire_on_their_own_ttl(tmp_path):
+    """Test that absent entries use negative_ttl_seconds."""
+    cache_file = tmp_path / "features.json"
+    base_dao = InMemoryFeatureConfigDao(cache_file=str(cache_file))
+    cached_dao = CachedFeatureConfigDao(
+        base_dao, ttl_seconds=300, negative_ttl_seconds=0.05
+    )
+
+    assert cached_dao.get_feature("dummy") is None
+    base_dao.features["dummy"] = Feature(feature_name="dummy", value="on")
+    assert cached_dao.get_feature("dummy") is None
+    time.sleep(0.06)
+    assert cached_dao.get_feature("dummy").value == "on"
+
+
+def test_invalidate_feature_drops_all_its_entries(tmp_path):
+    """Test that invalidate_feature drops present and absent overrides."""
+    cache_file = tmp_path / "features.json"
+    base_dao = InMemoryFeatureConfigDao(cache_file=str(cache_file))
+    cached_dao = CachedFeatureConfigDao(base_dao, ttl_seconds=300)
+    base_dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+    base_dao.create_feature(Feature(feature_name="other", value="enabled"))
+    base_dao.create_override(
+        "dummy",
+        FeatureOverride(feature_name="dummy", user_id="user_1", value="a"),
+    )
+
+    assert cached_dao.get_override("dummy", "user_1").value == "a"
+    assert cached_dao.get_override("dummy", "user_2") is None
+    assert cached_dao.get_feature("other").value == "enabled"
+    for user_id, value in (("user_1", "b"), ("user_2", "c")):
+        base_dao.create_override(
+            "dummy",
+            FeatureOverride(
+                feature_name="dummy", user_id=user_id, value=value
+            ),
+        )
+    base_dao.create_feature(Feature(feature_name="other", value="off"))
+
+    cached_dao.invalidate_feature("dummy")
+    assert cached_dao.get_override("dummy", "user_1").value == "b"
+    assert cached_dao.get_override("dummy", "user_2").value == "c"
+    # other features keep their entries
+    assert cached_dao.get_feature("other").value == "enabled"
+
+
+class SlowCountingDao(InMemoryFeatureConfigDao):
+    """Base DAO whose lookups are slow and counted."""
+
+    def __init__(self, cache_file, delay):
+        super().__init__(cache_file=cache_file)
+        self.delay = delay
+        self.feature_reads = 0
+
+    def get_feature(self, feature_name):
+        self.feature_reads += 1
+        time.sleep(self.delay)
+        return super().get_feature(feature_name)
+
+
+def test_concurrent_misses_share_one_lookup(tmp_path):
+    """Test that concurrent misses on one key hit the base DAO once."""
+    base_dao = SlowCountingDao(str(tmp_path / "features.json"), 0.1)
+    base_dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+    cached_dao = CachedFeatureConfigDao(base_dao, ttl_seconds=300)
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(cached_dao.get_feature("dummy"))
+        )
+        for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [r.value for r in results] == ["enabled"] * 10
+    assert base_dao.feature_reads == 1
+    assert cached_dao.stats()["cache"]["coalesced"] == 9
+
+
+def test_stale_entry_is_served_while_refreshing(tmp_path):
+    """Test that an expired entry is served while it is reloaded."""
+    base_dao = SlowCountingDao(str(tmp_path / "features.json"), 0.2)
+    base_dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+    cached_dao = CachedFeatureConfigDao(
+        base_dao, ttl_seconds=0.05, stale_while_revalidate_seconds=60
+    )
+    assert cached_dao.get_feature("dummy").value == "enabled"
+    base_dao.features["dummy"] = Feature(feature_name="dummy", value="new")
+    time.sleep(0.06)
+
+    start = time.monotonic()
+    for _ in range(5):
+        assert cached_dao.get_feature("dummy").value == "enabled"
+    assert time.monotonic() - start < 0.1
+
+    time.sleep(0.3)
+    assert cached_dao.get_feature("dummy").value == "new"
+    assert base_dao.feature_reads == 2
+    cached_dao.close()
+
+
+def test_workers_share_the_second_tier(tmp_path):
+    """Test one worker's fills are shared hits for another."""
+    base_dao = InMemoryFeatureConfigDao(
+        cache_file=str(tmp_path / "features.json")
+    )
+    base_dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+    first, second = (
+        CachedFeatureConfigDao(
+            base_dao,
+            shared_cache=SqliteSharedCache(str(tmp_path / "cache.db")),
+        )
+        for _ in range(2)
+    )
+
+    assert first.get_feature("dummy").value == "enabled"
+    assert first.get_override("dummy", "user_1") is None
+    assert second.get_feature("dummy").value == "enabled"
+    assert second.get_override("dummy", "user_1") is None
+    assert first.stats()["shared_cache"]["misses"] == 2
+
+    first.create_override(
+        "dummy",
+        FeatureOverride(feature_name="dummy", user_id="user_1", value="on"),
+    )
+    # the second worker's own cache still holds the absent override
+    # (without an invalidation bus), but not the shared tier
+    second.cache.clear()
+    assert second.get_override("dummy", "user_1").value == "on"
+
+    stats = second.stats()["shared_cache"]
+    assert stats["hits"] == 2
+    assert stats["hit_ratio"] == 2 / 3
+    first.shared_cache.close()
+    second.shared_cache.close()
@@ -0,0 +1,71 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.db.changeLog import Change, ChangeLog, ResyncRequired
+
+
+def test_since_returns_changes_after_a_version():
+    log = ChangeLog(max_entries=10)
+    log.record("dummy")
+    log.record("dummy", "user_1")
+    log.record("other", whole_feature=True)
+
+    assert log.since(1) == (
+        3,
+        [
+            Change(2, "dummy", "user_1", False),
+            Change(3, "other", None, True),
+        ],
+    )
+    assert log.since(3) == (3, [])
+
+
+def test_resync_when_changes_were_dropped_or_unknown():
+    log = ChangeLog(max_entries=2)
+    for _ in range(3):
+        log.record("dummy")
+
+    assert log.since(1, log.log_id)[0] == 3
+    with pytest.raises(ResyncRequired):
+        log.since(0)
+    # a version this log never reached, e.g. from before a restart
+    with pytest.raises(ResyncRequired):
+        log.since(4)
+    with pytest.raises(ResyncRequired):
+        log.since(3, "another-log")
+
+
+def test_wait_wakes_on_a_write_from_another_thread():
+    log = ChangeLog()
+
+    async def scenario():
+        assert await log.wait(0, 0.01) == 0
+        waiting = asyncio.create_task(log.wait(0, 5))
+        await asyncio.sleep(0.01)
+        threading.Thread(target=log.record, args=("dummy",)).start()
+        return await waiting
+
+    assert asyncio.run(scenario()) == 1
+    assert log.stats()["waiters"] == 0
+
+
+def test_tags_follow_the_writes_a_value_depends_on():
+    log = ChangeLog(max_tagged_overrides=2)
+    log.record("dummy")
+    log.record("dummy", "user_1")
+    log.record("other", "user_1")
+
+    assert log.tag("dummy") == 1
+    assert log.tag("dummy", "user_1") == 2
+    # no override: the feature's default
+    assert log.tag("dummy", "user_2") == 1
+    log.record("dummy", whole_feature=True)
+    assert log.tag("dummy", "user_1") == 4
+    assert log.tag("other", "user_1") == 3
+
+    # past the bound every tag moves up, none goes back
+    log.record("other", "user_2")
+    assert log.tag("other", "user_1") == 5
+    assert log.tag("missing") == 5
@@ -0,0 +1,118 @@
+"""Stress the DAO stack from many threads, as FastAPI's threadpool does."""
+import threading
+
+from app.db.cachedFeatureConfigDao import CachedFeatureConfigDao
+from app.db.groupCommitPersistence import GroupCommitPersistence
+from app.db.inMemoryFeatureConfigDao import InMemoryFeatureConfigDao
+from app.db.writeAheadLog import WriteAheadLogPersistence
+from app.items.feature import Feature
+from app.items.featureOverride import FeatureOverride
+
+WRITERS = 4
+READERS = 4
+FEATURES = 8
+ROUNDS = 150
+
+
+def _override(feature_name, user_id, round_):
+    return FeatureOverride(
+        feature_name=feature_name, user_id=user_id, value=str(round_)
+    )
+
+
+def _hammer(dao):
+    """
+    Each writer owns one user and writes increasing values to every
+    feature, deleting every third round; readers check that the values
+    they see for a (feature, user) never go backwards.
+    """
+    errors = []
+    done = threading.Event()
+
+    def write(user_id):
+        try:
+            for round_ in range(1, ROUNDS + 1):
+                for f in range(FEATURES):
+                    name = f"feature_{f}"
+                    dao.create_override(name, _override(name, user_id, round_))
+                    if round_ % 3 == 0:
+                        dao.delete_override(name, user_id)
+                        dao.create_override(
+                            name, _override(name, user_id, round_)
+                        )
+        except Exception as e:
+            errors.append(e)
+
+    def read():
+        latest = {}
+        try:
+            while not done.is_set():
+                for f in range(FEATURES):
+                    name = f"feature_{f}"
+                    assert dao.get_feature(name) is not None
+                    for w in range(WRITERS):
+                        found = dao.get_override(name, f"user_{w}")
+                        if found is None:
+                            continue
+                        key = (name, w)
+                        value = int(found.value)
+                        assert value >= latest.get(key, 0), key
+                        latest[key] = value
+        except Exception as e:
+            errors.append(e)
+
+    for f in range(FEATURES):
+        dao.create_feature(Feature(feature_name=f"feature_{f}", value="on"))
+    writers = [
+        threading.Thread(target=write, args=(f"user_{w}",))
+        for w in range(WRITERS)
+    ]
+    readers = [threading.Thread(target=read) for _ in range(READERS)]
+    for thread in writers + readers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    done.set()
+    for thread in readers:
+        thread.join()
+    assert errors == []
+
+
+def test_in_memory_dao_under_concurrent_reads_and_writes(tmp_path):
+    cache_file = str(tmp_path / "features.json")
+    persistence = GroupCommitPersistence(
+        WriteAheadLogPersistence(cache_file, compact_max_records=500),
+        durability="async",
+    )
+    dao = InMemoryFeatureConfigDao(cache_file, persistence, stripe_count=4)
+
+    _hammer(dao)
+    dao.close()
+
+    reloaded = InMemoryFeatureConfigDao(
+        cache_file, WriteAheadLogPersistence(cache_file)
+    )
+    for f in range(FEATURES):
+        for w in range(WRITERS):
+            override = reloaded.get_override(f"feature_{f}", f"user_{w}")
+            assert override.value == str(ROUNDS)
+    assert persistence.snapshot_stats.count >= 1
+
+
+def test_cached_dao_under_concurrent_reads_and_writes(tmp_path):
+    cache_file = str(tmp_path / "features.json")
+    base_dao = InMemoryFeatureConfigDao(
+        cache_file,
+        GroupCommitPersistence(
+            WriteAheadLogPersistence(cache_file), durability="async"
+        ),
+    )
+    dao = CachedFeatureConfigDao(base_dao, ttl_seconds=300)
+
+    _hammer(dao)
+
+    for f in range(FEATURES):
+        for w in range(WRITERS):
+            override = dao.get_override(f"feature_{f}", f"user_{w}")
+            assert override.value == str(ROUNDS)
+    dao.close()
@@ -0,0 +1,124 @@
+import threading
+
+import pytest
+
+from app.db.featurePersistence import (
+    FeaturePersistence,
+    FeatureState,
+    JsonSnapshotPersistence,
+)
+from app.db.groupCommitPersistence import GroupCommitPersistence
+from app.db.inMemoryFeatureConfigDao import InMemoryFeatureConfigDao
+from app.db.writeAheadLog import WriteAheadLogPersistence
+from app.items.feature import Feature
+from app.items.featureOverride import FeatureOverride
+
+
+def _override(user_id):
+    return FeatureOverride(
+        feature_name="dummy", user_id=user_id, value="disabled"
+    )
+
+
+def test_unknown_durability_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        GroupCommitPersistence(
+            JsonSnapshotPersistence(str(tmp_path / "features.json")),
+            durability="eventually",
+        )
+
+
+def test_batched_write_is_on_disk_when_acknowledged(tmp_path):
+    cache_file = str(tmp_path / "features.json")
+    dao = InMemoryFeatureConfigDao(
+        cache_file,
+        GroupCommitPersistence(
+            JsonSnapshotPersistence(cache_file), durability="batched"
+        ),
+    )
+
+    dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+
+    assert load_fresh(cache_file).get_feature("dummy") is not None
+    dao.close()
+
+
+def test_concurrent_writes_are_group_committed(tmp_path):
+    cache_file = str(tmp_path / "features.json")
+    persistence = GroupCommitPersistence(
+        WriteAheadLogPersistence(cache_file),
+        durability="batched",
+        flush_interval_seconds=0.5,
+    )
+    dao = InMemoryFeatureConfigDao(cache_file, persistence)
+    dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+    flushes = persistence.flushes
+    start = threading.Barrier(20)
+
+    def write(user_id):
+        start.wait()
+        dao.create_override("dummy", _override(user_id))
+
+    threads = [
+        threading.Thread(target=write, args=(f"u{i}",)) for i in range(20)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    dao.close()
+
+    # all 20 writes start within one 0.5s window; allow one straggler
+    # batch for a thread scheduled late
+    assert persistence.flushes - flushes <= 2
+    assert len(load_fresh(cache_file).overrides["dummy"]) == 20
+
+
+def test_async_close_drains_queue(tmp_path):
+    cache_file = str(tmp_path / "features.json")
+    persistence = GroupCommitPersistence(
+        JsonSnapshotPersistence(cache_file),
+        durability="async",
+        flush_interval_seconds=10,
+    )
+    dao = InMemoryFeatureConfigDao(cache_file, persistence)
+    dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+    for i in range(100):
+        dao.create_override("dummy", _override(f"u{i}"))
+
+    dao.close()
+
+    assert persistence.flushes == 1
+    assert len(load_fresh(cache_file).overrides["dummy"]) == 100
+
+
+class FailingPersistence(FeaturePersistence):
+    def open(self, snapshot):
+        return FeatureState({}, {})
+
+    def persist_batch(self, mutations):
+        raise OSError("disk full")
+
+
+def test_failed_flush_is_not_acknowledged(tmp_path):
+    cache_file = str(tmp_path / "features.json")
+    persistence = GroupCommitPersistence(
+        FailingPersistence(), durability="batched"
+    )
+    dao = InMemoryFeatureConfigDao(cache_file, persistence)
+
+    with pytest.raises(OSError, match="disk full"):
+        dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+    with pytest.raises(OSError, match="disk full"):
+        dao.bulk_write_overrides("dummy", {"u1": _override("u1")})
+    assert persistence.flushes == 0
+    dao.close()
+
+
+def load_fresh(cache_file):
+    """Load what is on disk into a new DAO, closed once loaded."""
+    dao = InMemoryFeatureConfigDao(
+        cache_file, WriteAheadLogPersistence(cache_file)
+    )
+    dao.close()
+    return dao
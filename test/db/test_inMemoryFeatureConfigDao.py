@@ -88,3 +88,126 @@ def test_corrupted_cache_file_is_ignored(tmp_path):
 
     assert dao.get_feature("dummy") is None
     assert dao.get_override("dummy", "user") is None
+
+
+def test_snapshot_is_point_in_time_while_writes_continue(tmp_path):
+    cache_file = tmp_path / "features.json"
+    dao = InMemoryFeatureConfigDao(cache_file=str(cache_file))
+    dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+    dao.create_override(
+        "dummy",
+        FeatureOverride(feature_name="dummy", user_id="u1", value="off"),
+    )
+
+    snapshot = dao.snapshot_state()
+    dao.create_override(
+        "dummy",
+        FeatureOverride(feature_name="dummy", user_id="u2", value="off"),
+    )
+    dao.delete_override("dummy", "u1")
+    dao.create_feature(Feature(feature_name="other", value="enabled"))
+
+    assert snapshot.version == 2
+    assert set(snapshot.overrides["dummy"]) == {"u1"}
+    assert set(snapshot.features) == {"dummy"}
+    assert set(dao.overrides["dummy"]) == {"u2"}
+    assert dao.version == 5
+
+
+def test_snapshot_shares_override_dicts_until_written(tmp_path):
+    cache_file = tmp_path / "features.json"
+    dao = InMemoryFeatureConfigDao(cache_file=str(cache_file))
+    for name in ("a", "b"):
+        dao.create_override(
+            name,
+            FeatureOverride(feature_name=name, user_id="u", value="off"),
+        )
+
+    snapshot = dao.snapshot_state()
+    dao.delete_override("a", "u")
+
+    assert snapshot.overrides["b"] is dao.overrides["b"]
+    assert snapshot.overrides["a"] is not dao.overrides["a"]
+
+
+def test_stats_report_snapshot_version_and_duration(tmp_path):
+    cache_file = tmp_path / "features.json"
+    dao = InMemoryFeatureConfigDao(cache_file=str(cache_file))
+
+    dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+
+    stats = dao.stats()
+    assert stats["version"] == 1
+    assert stats["snapshots"]["count"] == 1
+    assert stats["snapshots"]["last_version"] == 1
+    assert stats["snapshots"]["last_duration_seconds"] >= 0
+
+
+def test_list_pages_are_stable_under_writes(tmp_path):
+    cache_file = tmp_path / "features.json"
+    dao = InMemoryFeatureConfigDao(cache_file=str(cache_file))
+    for name in ("d", "b", "a", "c"):
+        dao.create_feature(Feature(feature_name=name, value="on"))
+        dao.create_override(
+            "a", FeatureOverride(feature_name="a", user_id=name, value="x")
+        )
+
+    first = dao.list_features(limit=2)
+    assert [f.feature_name for f in first] == ["a", "b"]
+    # written behind and ahead of the cursor
+    dao.create_feature(Feature(feature_name="aa", value="on"))
+    dao.create_feature(Feature(feature_name="e", value="on"))
+    rest = dao.list_features(after="b", limit=10)
+    assert [f.feature_name for f in rest] == ["c", "d", "e"]
+
+    users = dao.list_overrides("a", after="b", limit=2)
+    assert [o.user_id for o in users] == ["c", "d"]
+    assert dao.list_overrides("missing") == []
+
+
+def test_list_pages_keep_sorted_keys_current(tmp_path):
+    dao = InMemoryFeatureConfigDao(cache_file=str(tmp_path / "f.json"))
+    dao.create_feature(Feature(feature_name="a", value="on"))
+    dao.bulk_write_overrides(
+        "a",
+        {
+            f"u{i:03d}": FeatureOverride(
+                feature_name="a", user_id=f"u{i:03d}", value="x"
+            )
+            for i in range(100)
+        },
+    )
+
+    first = dao.list_overrides("a", limit=10)
+    keys = dao._keys._sorted["a"]
+    dao.create_override(
+        "a", FeatureOverride(feature_name="a", user_id="u005", value="y")
+    )
+    second = dao.list_overrides("a", after=first[-1].user_id, limit=10)
+    assert [o.user_id for o in second] == [f"u{i:03d}" for i in range(10, 20)]
+    assert dao.list_overrides("a", after="u004", limit=1)[0].value == "y"
+
+    # new and removed keys update the sorted list in place, not re-sort it
+    dao.delete_override("a", "u011")
+    dao.create_override(
+        "a", FeatureOverride(feature_name="a", user_id="u0105", value="z")
+    )
+    page = dao.list_overrides("a", after="u009", limit=3)
+    assert [o.user_id for o in page] == ["u010", "u0105", "u012"]
+    assert dao._keys._sorted["a"] is keys
+
+    dao.bulk_write_overrides(
+        "a",
+        {
+            "u000": None,
+            "u0005": FeatureOverride(
+                feature_name="a", user_id="u0005", value="w"
+            ),
+            "u001": FeatureOverride(
+                feature_name="a", user_id="u001", value="w"
+            ),
+        },
+    )
+    assert dao._keys._sorted["a"] == sorted(dao.overrides["a"])
+    page = dao.list_overrides("a", limit=3)
+    assert [o.user_id for o in page] == ["u0005", "u001", "u002"]
@@ -0,0 +1,95 @@
+import os
+import socket
+import time
+
+from app.db.cachedFeatureConfigDao import CachedFeatureConfigDao
+from app.db.invalidationBus import UnixSocketInvalidationBus
+from app.db.sqliteFeatureConfigDao import SqliteFeatureConfigDao
+from app.items.feature import Feature
+from app.items.featureOverride import FeatureOverride
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_peers_receive_invalidations_but_not_the_sender(tmp_path):
+    directory = str(tmp_path / "bus")
+    seen = {"a": [], "b": []}
+    a = UnixSocketInvalidationBus(directory)
+    b = UnixSocketInvalidationBus(directory)
+    a.start(lambda *key: seen["a"].append(key))
+    b.start(lambda *key: seen["b"].append(key))
+    try:
+        a.publish("dummy", "user_1")
+        a.publish("dummy")
+        a.publish("dummy", whole_feature=True)
+        _wait_for(lambda: len(seen["b"]) == 3)
+        assert seen["b"] == [
+            ("dummy", "user_1", False),
+            ("dummy", None, False),
+            ("dummy", None, True),
+        ]
+        assert seen["a"] == []
+    finally:
+        a.close()
+        b.close()
+    assert os.listdir(directory) == []
+
+
+def test_sockets_of_dead_peers_are_removed(tmp_path):
+    directory = str(tmp_path / "bus")
+    bus = UnixSocketInvalidationBus(directory)
+    bus.start(lambda *key: None)
+    dead = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    dead_path = os.path.join(directory, "dead.sock")
+    dead.bind(dead_path)
+    dead.close()
+    try:
+        bus.publish("dummy")
+        assert not os.path.exists(dead_path)
+    finally:
+        bus.close()
+
+
+def test_cached_daos_sharing_a_store_stay_fresh(tmp_path):
+    db_path = str(tmp_path / "features.db")
+    directory = str(tmp_path / "bus")
+    first = CachedFeatureConfigDao(
+        SqliteFeatureConfigDao(db_path),
+        ttl_seconds=3600,
+        invalidation_bus=UnixSocketInvalidationBus(directory),
+    )
+    second_bus = UnixSocketInvalidationBus(directory)
+    second = CachedFeatureConfigDao(
+        SqliteFeatureConfigDao(db_path),
+        ttl_seconds=3600,
+        invalidation_bus=second_bus,
+    )
+    try:
+        first.create_feature(Feature(feature_name="dummy", value="on"))
+        first.create_override(
+            "dummy",
+            FeatureOverride(
+                feature_name="dummy", user_id="user_1", value="on"
+            ),
+        )
+        _wait_for(lambda: second_bus.received == 2)
+        assert second.get_override("dummy", "user_1").value == "on"
+        assert second.get_feature("dummy").value == "on"
+
+        first.create_override(
+            "dummy",
+            FeatureOverride(
+                feature_name="dummy", user_id="user_1", value="off"
+            ),
+        )
+        _wait_for(lambda: second_bus.received == 3)
+        assert second.get_override("dummy", "user_1").value == "off"
+        assert second.stats()["invalidation_bus"]["received"] == 3
+    finally:
+        first.close()
+        second.close()
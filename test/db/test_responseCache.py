@@ -0,0 +1,29 @@
+from app.db.responseCache import ResponseCache
+
+
+def test_feature_write_drops_every_evaluation():
+    cache = ResponseCache(max_entries=100)
+    for key in ("dummy", ("dummy", "user_1"), ("other", "user_1")):
+        cache.put(key, b"body", cache.invalidations)
+    cache.invalidate("dummy")
+    assert cache.get("dummy") is None
+    assert cache.get(("dummy", "user_1")) is None
+    assert cache.get(("other", "user_1")) == b"body"
+
+
+def test_override_write_drops_only_that_user():
+    cache = ResponseCache(max_entries=100)
+    for key in ("dummy", ("dummy", "user_1"), ("dummy", "user_2")):
+        cache.put(key, b"body", cache.invalidations)
+    cache.invalidate("dummy", "user_1")
+    assert cache.get(("dummy", "user_1")) is None
+    assert cache.get(("dummy", "user_2")) == b"body"
+    assert cache.get("dummy") == b"body"
+
+
+def test_body_rendered_before_a_write_is_not_cached():
+    cache = ResponseCache(max_entries=100)
+    seen = cache.invalidations
+    cache.invalidate("dummy", "user_1")
+    cache.put(("dummy", "user_1"), b"stale", seen)
+    assert cache.get(("dummy", "user_1")) is None
@@ -0,0 +1,126 @@
+import json
+
+from app.db.binarySnapshot import load_binary_snapshot, save_binary_snapshot
+from app.db.featurePersistence import load_json_snapshot, save_json_snapshot
+from app.db.inMemoryFeatureConfigDao import InMemoryFeatureConfigDao
+from app.db.shardedPersistence import ShardedSnapshotPersistence, shard_for
+from app.items.feature import Feature
+from app.items.featureOverride import FeatureOverride
+
+
+def _sharded_dao(tmp_path, shard_count=8, **kwargs):
+    persistence = ShardedSnapshotPersistence(
+        str(tmp_path / "shards"), shard_count=shard_count, **kwargs
+    )
+    dao = InMemoryFeatureConfigDao(
+        str(tmp_path / "features.json"), persistence
+    )
+    return dao, persistence
+
+
+def test_write_only_touches_its_own_shard(tmp_path):
+    dao, persistence = _sharded_dao(tmp_path)
+    names = [f"feature_{i}" for i in range(20)]
+    for name in names:
+        dao.create_feature(Feature(feature_name=name, value="enabled"))
+    shard = shard_for("feature_3", 8)
+    before = {
+        path: path.stat().st_ino
+        for path in (tmp_path / "shards").iterdir()
+    }
+    writes = persistence.shard_writes
+
+    dao.create_override(
+        "feature_3",
+        FeatureOverride(
+            feature_name="feature_3", user_id="user_1", value="off"
+        ),
+    )
+
+    assert persistence.shard_writes == writes + 1
+    changed = [
+        path for path in (tmp_path / "shards").iterdir()
+        if path.stat().st_ino != before[path]
+    ]
+    assert [path.name for path in changed] == [f"shard-{shard:04d}.json"]
+
+
+def test_shards_reload_in_parallel(tmp_path):
+    dao, _ = _sharded_dao(tmp_path)
+    for i in range(20):
+        name = f"feature_{i}"
+        dao.create_feature(Feature(feature_name=name, value="enabled"))
+        dao.create_override(
+            name,
+            FeatureOverride(feature_name=name, user_id="user_1", value="on"),
+        )
+    dao.delete_override("feature_0", "user_1")
+
+    reloaded, _ = _sharded_dao(tmp_path, load_workers=4)
+
+    assert len(reloaded.features) == 20
+    assert reloaded.get_override("feature_0", "user_1") is None
+    assert reloaded.get_override("feature_19", "user_1").value == "on"
+
+
+def test_binary_shards(tmp_path):
+    kwargs = dict(
+        suffix=".bin",
+        load_snapshot=load_binary_snapshot,
+        save_snapshot=save_binary_snapshot,
+    )
+    dao, _ = _sharded_dao(tmp_path, **kwargs)
+    dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+
+    reloaded, _ = _sharded_dao(tmp_path, **kwargs)
+
+    assert reloaded.get_feature("dummy").value == "enabled"
+
+
+def test_reopening_with_another_count_reshards(tmp_path):
+    dao, _ = _sharded_dao(tmp_path)
+    for i in range(40):
+        name = f"feature_{i}"
+        dao.create_feature(Feature(feature_name=name, value="v1"))
+        dao.create_override(
+            name,
+            FeatureOverride(feature_name=name, user_id="user_1", value="on"),
+        )
+    shards = tmp_path / "shards"
+
+    for count in (3, 16):
+        dao, _ = _sharded_dao(tmp_path, shard_count=count)
+        assert len(dao.features) == 40
+        assert dao.get_override("feature_39", "user_1").value == "on"
+        assert sorted(p.name for p in shards.glob("shard-*")) == [
+            f"shard-{i:04d}.json" for i in range(count)
+        ]
+        assert json.loads((shards / "manifest.json").read_text()) == {
+            "shard_count": count
+        }
+        # a write lands in the new layout, and no stale copy outlives it
+        for i in range(40):
+            dao.create_feature(
+                Feature(feature_name=f"feature_{i}", value=f"n{count}")
+            )
+
+    reloaded, _ = _sharded_dao(tmp_path, shard_count=16)
+    assert {f.value for f in reloaded.features.values()} == {"n16"}
+
+
+def test_interrupted_reshard_is_redone(tmp_path):
+    dao, _ = _sharded_dao(tmp_path)
+    for i in range(40):
+        dao.create_feature(Feature(feature_name=f"feature_{i}", value="on"))
+    # as if a re-shard to 4 wrote one new shard, then crashed
+    shard = load_json_snapshot(str(tmp_path / "shards" / "shard-0000.json"))
+    for i in range(40):
+        name = f"feature_{i}"
+        if shard_for(name, 4) == 0:
+            shard.features[name] = dao.get_feature(name)
+    save_json_snapshot(str(tmp_path / "shards" / "shard-0000.json"), shard)
+
+    reloaded, _ = _sharded_dao(tmp_path, shard_count=4)
+
+    assert len(reloaded.features) == 40
+    assert len(list((tmp_path / "shards").glob("shard-*"))) == 4
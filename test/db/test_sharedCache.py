@@ -0,0 +1,67 @@
+from app.db.sharedCache import SqliteSharedCache
+from app.db.sieveCache import MISSING
+from app.items.feature import Feature
+from app.items.featureOverride import FeatureOverride
+
+
+def test_entries_are_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.db")
+    a, b = SqliteSharedCache(path), SqliteSharedCache(path)
+    feature = Feature(feature_name="dummy", value="enabled")
+    a.put("dummy", None, feature, 60, a.generation("dummy"))
+    a.put("dummy", "user_1", None, 60, a.generation("dummy"))
+    assert b.get("dummy") == feature
+    assert b.get("dummy", "user_1") is None
+    assert b.get("dummy", "user_2") is MISSING
+
+    b.invalidate("dummy", "user_1")
+    assert a.get("dummy", "user_1") is MISSING
+    assert a.get("dummy") == feature
+    b.invalidate("dummy", whole_feature=True)
+    assert a.get("dummy") is MISSING
+    a.close()
+    b.close()
+
+
+def test_fill_that_raced_with_a_write_is_dropped(tmp_path):
+    cache = SqliteSharedCache(str(tmp_path / "cache.db"))
+    generation = cache.generation("dummy")
+    cache.invalidate("dummy", "user_1")
+    stale = FeatureOverride(
+        feature_name="dummy", user_id="user_1", value="stale"
+    )
+    cache.put("dummy", "user_1", stale, 60, generation)
+    assert cache.get("dummy", "user_1") is MISSING
+    cache.close()
+
+
+def test_purge_keeps_entry_count_bounded(tmp_path):
+    cache = SqliteSharedCache(
+        str(tmp_path / "cache.db"), max_entries=10, purge_interval=20
+    )
+    for i in range(40):
+        cache.put(f"feature_{i}", None, None, 60, 0)
+    assert cache.stats()["entries"] == 10
+    cache.close()
+
+
+def test_entry_count_follows_writes(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = SqliteSharedCache(path)
+    for user_id in (None, "user_1", "user_2"):
+        cache.put("dummy", user_id, None, 60, 0)
+    # refilling an entry replaces it rather than adding one
+    cache.put("dummy", "user_1", None, 60, 0)
+    assert cache.stats()["entries"] == 3
+    cache.invalidate("dummy", "user_1")
+    assert cache.stats()["entries"] == 2
+    cache.invalidate("dummy", whole_feature=True)
+    assert cache.stats()["entries"] == 0
+    cache.close()
+    # a second process opening the file keeps the count
+    cache = SqliteSharedCache(path)
+    cache.put("dummy", None, None, 60, cache.generation("dummy"))
+    other = SqliteSharedCache(path)
+    assert other.stats()["entries"] == 1
+    other.close()
+    cache.close()
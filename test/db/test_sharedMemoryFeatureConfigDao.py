@@ -0,0 +1,123 @@
+import uuid
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+
+import pytest
+
+from app.db.featurePersistence import JsonSnapshotPersistence
+from app.db.inMemoryFeatureConfigDao import InMemoryFeatureConfigDao
+from app.db.sharedMemoryFeatureConfigDao import (
+    SharedMemoryFeatureConfigDao,
+    SharedMemoryWriteServer,
+    acquire_ownership,
+)
+from app.db.sharedMemoryTable import SharedMemoryPersistence, SharedMemoryTable
+from app.items.feature import Feature
+from app.items.featureOverride import FeatureOverride
+
+
+def _owner(tmp_path):
+    cache_file = str(tmp_path / "features.json")
+    table = SharedMemoryTable(f"fftest-{uuid.uuid4().hex[:8]}")
+    owner = InMemoryFeatureConfigDao(
+        cache_file,
+        SharedMemoryPersistence(JsonSnapshotPersistence(cache_file), table),
+    )
+    address = str(tmp_path / "writes.sock")
+    server = SharedMemoryWriteServer(owner, owner, address)
+    return owner, server, table.name, address
+
+
+def test_reader_forwards_writes_and_reads_them_back(tmp_path):
+    owner, server, name, address = _owner(tmp_path)
+    reader = SharedMemoryFeatureConfigDao(name, address)
+    try:
+        reader.create_feature(Feature(feature_name="dummy", value="on"))
+        reader.create_override(
+            "dummy",
+            FeatureOverride(
+                feature_name="dummy", user_id="user_1", value="off"
+            ),
+        )
+        assert reader.get_feature("dummy").value == "on"
+        assert reader.get_override("dummy", "user_1").value == "off"
+        assert owner.get_override("dummy", "user_1").value == "off"
+
+        deleted = reader.delete_override("dummy", "user_1")
+        assert deleted.user_id == "user_1"
+        assert reader.get_override("dummy", "user_1") is None
+        assert reader.delete_override("dummy", "user_1") is None
+        assert reader.stats()["version"] == owner.version
+    finally:
+        reader.close()
+        server.close()
+        owner.close()
+
+
+def test_owner_errors_keep_their_type(tmp_path, monkeypatch):
+    owner, server, name, address = _owner(tmp_path)
+    reader = SharedMemoryFeatureConfigDao(name, address)
+
+    def missing(feature_name, changes):
+        raise ValueError(f"Feature {feature_name} not found")
+
+    def broken(feature):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(owner, "bulk_write_overrides", missing)
+    monkeypatch.setattr(owner, "create_feature", broken)
+    try:
+        with pytest.raises(ValueError, match="Feature nope not found"):
+            reader.bulk_write_overrides("nope", {})
+        with pytest.raises(RuntimeError, match="disk full"):
+            reader.create_feature(Feature(feature_name="dummy", value="on"))
+    finally:
+        reader.close()
+        server.close()
+        owner.close()
+
+
+def test_owner_rejects_clients_without_its_key(tmp_path):
+    owner, server, name, address = _owner(tmp_path)
+    reader = SharedMemoryFeatureConfigDao(name, address)
+    try:
+        with pytest.raises(AuthenticationError):
+            Client(address, family="AF_UNIX", authkey=b"guess")
+        # a client that skips the handshake is dropped unserved
+        with Client(address, family="AF_UNIX") as conn:
+            conn.send(
+                ("create_feature", (Feature(feature_name="x", value="on"),))
+            )
+            with pytest.raises(EOFError):
+                while True:
+                    conn.recv_bytes()
+        assert owner.get_feature("x") is None
+        reader.create_feature(Feature(feature_name="dummy", value="on"))
+        assert reader.get_feature("dummy").value == "on"
+    finally:
+        reader.close()
+        server.close()
+        owner.close()
+
+
+def test_reader_sees_owner_writes(tmp_path):
+    owner, server, name, address = _owner(tmp_path)
+    reader = SharedMemoryFeatureConfigDao(name, address)
+    try:
+        assert reader.get_feature("dummy") is None
+        owner.create_feature(Feature(feature_name="dummy", value="on"))
+        owner.persistence.flush()
+        assert reader.get_feature("dummy").value == "on"
+    finally:
+        reader.close()
+        server.close()
+        owner.close()
+
+
+def test_only_one_process_owns_the_table(tmp_path):
+    lock_file = str(tmp_path / "writes.lock")
+    first = acquire_ownership(lock_file)
+    assert first is not None
+    assert acquire_ownership(lock_file) is None
+    first.close()
+    assert acquire_ownership(lock_file) is not None
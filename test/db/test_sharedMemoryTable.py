@@ -0,0 +1,96 @@
+import subprocess
+import sys
+import uuid
+
+from app.db.featurePersistence import FeatureState, JsonSnapshotPersistence
+from app.db.inMemoryFeatureConfigDao import InMemoryFeatureConfigDao
+from app.db.sharedMemoryTable import (
+    SharedMemoryPersistence,
+    SharedMemoryTable,
+    SharedMemoryTableReader,
+)
+from app.items.feature import Feature
+from app.items.featureOverride import FeatureOverride
+
+
+def _table_name():
+    return f"fftest-{uuid.uuid4().hex[:8]}"
+
+
+def _state(value, version):
+    return FeatureState(
+        {"dummy": Feature(feature_name="dummy", value=value)},
+        {
+            "dummy": {
+                "user_1": FeatureOverride(
+                    feature_name="dummy", user_id="user_1", value=value
+                )
+            }
+        },
+        version,
+    )
+
+
+def test_reader_follows_published_generations():
+    table = SharedMemoryTable(_table_name())
+    try:
+        reader = SharedMemoryTableReader(table.name)
+        assert reader.current() is None
+
+        table.publish(_state("on", 1))
+        first = reader.current()
+        assert first.features["dummy"].value == "on"
+        assert reader.header() == (1, 1)
+
+        table.publish(_state("off", 2))
+        second = reader.current()
+        assert second.generation == 2
+        assert second.overrides["dummy"]["user_1"].value == "off"
+        # the superseded generation stays readable while referenced
+        assert first.overrides["dummy"]["user_1"].value == "on"
+        reader.close()
+    finally:
+        table.close()
+
+
+def test_other_process_reads_published_table():
+    table = SharedMemoryTable(_table_name())
+    try:
+        table.publish(_state("on", 7))
+        script = (
+            "from app.db.sharedMemoryTable import SharedMemoryTableReader\n"
+            f"reader = SharedMemoryTableReader({table.name!r})\n"
+            "current = reader.current()\n"
+            "print(current.overrides['dummy']['user_1'].value,"
+            " reader.header()[1])\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert output.stdout.split() == ["on", "7"]
+        # the reader exiting must not unlink the owner's segments
+        assert SharedMemoryTableReader(table.name).current() is not None
+    finally:
+        table.close()
+
+
+def test_persistence_publishes_writes(tmp_path):
+    table = SharedMemoryTable(_table_name())
+    cache_file = str(tmp_path / "features.json")
+    dao = InMemoryFeatureConfigDao(
+        cache_file,
+        SharedMemoryPersistence(JsonSnapshotPersistence(cache_file), table),
+    )
+    reader = SharedMemoryTableReader(table.name)
+    dao.create_feature(Feature(feature_name="dummy", value="on"))
+    dao.persistence.flush()
+
+    assert reader.current().features["dummy"].value == "on"
+    assert reader.header()[1] == dao.version
+    dao.close()
+    # a withdrawn table leaves readers on their last generation
+    assert reader.current().features["dummy"].value == "on"
+    reader.close()
@@ -0,0 +1,64 @@
+import time
+
+from app.db.sieveCache import MISSING, SieveCache
+
+
+def test_cache_stays_within_max_entries():
+    cache = SieveCache(max_entries=100)
+    for i in range(1000):
+        cache.put(i, str(i), 60)
+    assert len(cache) == 100
+    assert cache.evictions == 900
+    assert cache.get(999) == "999"
+
+
+def test_visited_entries_survive_a_scan():
+    cache = SieveCache(max_entries=10)
+    for i in range(5):
+        cache.put(("hot", i), i, 60)
+    for round_ in range(20):
+        for i in range(5):
+            assert cache.get(("hot", i)) == i
+        for i in range(10):
+            cache.put(("scan", round_, i), i, 60)
+    for i in range(5):
+        assert cache.get(("hot", i)) == i
+
+
+def test_byte_budget_is_enforced():
+    cache = SieveCache(
+        max_entries=1000, max_bytes=100, sizeof=lambda k, v: len(v)
+    )
+    for i in range(50):
+        cache.put(i, "x" * 10, 60)
+    assert cache.bytes <= 100
+    assert len(cache) == 10
+    cache.put(49, "x" * 30, 60)
+    assert cache.bytes <= 100
+
+
+def test_pop_and_expiry():
+    cache = SieveCache(max_entries=3)
+    cache.put("a", 1, 60)
+    cache.put("b", 2, 0.05)
+    cache.put("c", 3, 60)
+    cache.get("a")
+    cache.put("d", 4, 60)
+    cache.pop("c")
+    assert cache.get("c") is MISSING
+    cache.put("e", 5, 60)
+    assert len(cache) == 3
+    time.sleep(0.06)
+    assert cache.get("b", None) is None
+    assert cache.get("a") == 1
+
+
+def test_tag_mismatch_misses():
+    cache = SieveCache(max_entries=10)
+    cache.put("a", 1, 60, tag=0)
+    assert cache.get("a", tag=0) == 1
+    assert cache.get("a", tag=1) is MISSING
+    assert cache.get_stale("a", 60, tag=1) is MISSING
+    cache.put("a", 2, 60, tag=1)
+    assert cache.get("a", tag=1) == 2
+    assert len(cache) == 1
@@ -0,0 +1,184 @@
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+
+from app.db.cachedFeatureConfigDao import CachedFeatureConfigDao
+from app.db.sqliteFeatureConfigDao import SqliteFeatureConfigDao
+from app.items.feature import Feature
+from app.items.featureOverride import FeatureOverride
+
+
+def test_create_and_get_feature(tmp_path):
+    dao = SqliteFeatureConfigDao(str(tmp_path / "features.db"))
+
+    feature = Feature(
+        feature_name="dummy",
+        value="enabled",
+        feature_description="Enable new UI",
+        timestamp=datetime(2024, 1, 1, 12, 0, 0),
+    )
+    created = dao.create_feature(feature)
+
+    assert dao.get_feature("dummy") == created
+    assert dao.get_feature("missing") is None
+
+
+def test_create_get_and_delete_override(tmp_path):
+    dao = SqliteFeatureConfigDao(str(tmp_path / "features.db"))
+
+    override = FeatureOverride(
+        feature_name="dummy",
+        user_id="user_1",
+        value="disabled",
+        justification="A/B test",
+        isDefault=False,
+        timestamp=datetime(
+            2024, 1, 2, 9, 30, tzinfo=timezone(timedelta(hours=-5))
+        ),
+    )
+    created = dao.create_override("dummy", override)
+
+    assert dao.get_override("dummy", "user_1") == created
+    assert dao.delete_override("dummy", "user_1") == created
+    assert dao.get_override("dummy", "user_1") is None
+    assert dao.delete_override("dummy", "user_1") is None
+
+
+def test_bulk_lookups_span_chunks(tmp_path):
+    dao = SqliteFeatureConfigDao(str(tmp_path / "features.db"))
+    names = [f"feature_{i}" for i in range(1200)]
+    for name in names[::2]:
+        dao.create_feature(Feature(feature_name=name, value="on"))
+        dao.create_override(
+            name,
+            FeatureOverride(feature_name=name, user_id="user_1", value="off"),
+        )
+
+    features = dao.get_features(names)
+    assert list(features) == names
+    assert features["feature_1198"].value == "on"
+    assert features["feature_1199"] is None
+    overrides = dao.get_overrides_for_user(names, "user_1")
+    assert overrides["feature_0"].value == "off"
+    assert overrides["feature_1"] is None
+    assert dao.get_overrides_for_user(names, "user_2")["feature_0"] is None
+    users = dao.get_overrides_for_users("feature_0", ["user_1", "user_2"])
+    assert users["user_1"].value == "off"
+    assert users["user_2"] is None
+
+
+def test_bulk_write_overrides(tmp_path):
+    dao = SqliteFeatureConfigDao(str(tmp_path / "features.db"))
+    dao.create_override(
+        "dummy",
+        FeatureOverride(feature_name="dummy", user_id="user_1", value="on"),
+    )
+
+    written, deleted = dao.bulk_write_overrides(
+        "dummy",
+        {
+            "user_1": None,
+            "user_2": FeatureOverride(
+                feature_name="dummy", user_id="user_2", value="off"
+            ),
+            "user_3": None,
+        },
+    )
+    assert (written, deleted) == (1, 1)
+    assert dao.get_override("dummy", "user_1") is None
+    assert dao.get_override("dummy", "user_2").value == "off"
+
+
+def test_list_features_and_overrides(tmp_path):
+    dao = SqliteFeatureConfigDao(str(tmp_path / "features.db"))
+    for name in ("c", "a", "b"):
+        dao.create_feature(Feature(feature_name=name, value="on"))
+        dao.create_override(
+            "a", FeatureOverride(feature_name="a", user_id=name, value="x")
+        )
+
+    assert [f.feature_name for f in dao.list_features(limit=2)] == [
+        "a", "b"
+    ]
+    assert [f.feature_name for f in dao.list_features("b")] == ["c"]
+    assert [o.user_id for o in dao.list_overrides("a", "a")] == ["b", "c"]
+
+
+def test_data_survives_reopen(tmp_path):
+    db_path = str(tmp_path / "features.db")
+    dao = SqliteFeatureConfigDao(db_path)
+    dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+    dao.create_override(
+        "dummy",
+        FeatureOverride(feature_name="dummy", user_id="u", value="off"),
+    )
+    dao.close()
+
+    reopened = SqliteFeatureConfigDao(db_path)
+
+    assert reopened.get_feature("dummy").value == "enabled"
+    assert reopened.get_override("dummy", "u").value == "off"
+
+
+def test_uses_wal_journal_and_one_connection_per_thread(tmp_path):
+    dao = SqliteFeatureConfigDao(str(tmp_path / "features.db"))
+    mode = dao._connection().execute("PRAGMA journal_mode").fetchone()[0]
+
+    def write(i):
+        dao.create_override(
+            "dummy",
+            FeatureOverride(
+                feature_name="dummy", user_id=f"user_{i}", value="on"
+            ),
+        )
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert mode == "wal"
+    assert len(dao._connections) == 9
+    assert all(
+        dao.get_override("dummy", f"user_{i}") is not None
+        for i in range(8)
+    )
+    dao.close()
+
+
+def test_composes_with_cache(tmp_path):
+    base_dao = SqliteFeatureConfigDao(str(tmp_path / "features.db"))
+    dao = CachedFeatureConfigDao(base_dao, ttl_seconds=300)
+
+    dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+    assert dao.get_feature("dummy").value == "enabled"
+    dao.create_feature(Feature(feature_name="dummy", value="disabled"))
+
+    assert dao.get_feature("dummy").value == "disabled"
+
+
+def test_rollout_round_trips_and_old_databases_migrate(tmp_path):
+    db_path = str(tmp_path / "features.db")
+    with sqlite3.connect(db_path) as conn:
+        # the features table as it was before rollouts
+        conn.execute(
+            "CREATE TABLE features (feature_name TEXT PRIMARY KEY, "
+            "value TEXT NOT NULL, feature_description TEXT, "
+            "timestamp TEXT) WITHOUT ROWID"
+        )
+        conn.execute("INSERT INTO features VALUES ('old', 'on', NULL, NULL)")
+    conn.close()
+
+    dao = SqliteFeatureConfigDao(db_path)
+    assert dao.get_feature("old") == Feature(feature_name="old", value="on")
+    feature = Feature(
+        feature_name="dummy",
+        value="off",
+        rollout={"variants": [{"value": "on", "percentage": 12.5}]},
+    )
+    dao.create_feature(feature)
+
+    reopened = SqliteFeatureConfigDao(db_path)
+    assert reopened.get_feature("dummy") == feature
+    assert reopened.get_features(["dummy", "old"])["dummy"] == feature
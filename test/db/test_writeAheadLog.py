@@ -0,0 +1,149 @@
+from datetime import datetime
+
+from app.db.inMemoryFeatureConfigDao import InMemoryFeatureConfigDao
+from app.db.writeAheadLog import WriteAheadLogPersistence
+from app.items.feature import Feature
+from app.items.featureOverride import FeatureOverride
+
+
+def _wal_dao(tmp_path, **kwargs):
+    cache_file = str(tmp_path / "features.json")
+    persistence = WriteAheadLogPersistence(cache_file, **kwargs)
+    return InMemoryFeatureConfigDao(cache_file, persistence), persistence
+
+
+def test_writes_append_one_record_each(tmp_path):
+    dao, persistence = _wal_dao(tmp_path)
+
+    dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+    dao.create_override(
+        "dummy",
+        FeatureOverride(
+            feature_name="dummy", user_id="user_1", value="disabled"
+        ),
+    )
+    dao.delete_override("dummy", "user_1")
+    dao.close()
+
+    lines = (tmp_path / "features.json.log").read_text().splitlines()
+    assert len(lines) == 3
+    assert not (tmp_path / "features.json").exists()
+
+
+def test_replay_restores_state(tmp_path):
+    dao, _ = _wal_dao(tmp_path)
+    dao.create_feature(
+        Feature(
+            feature_name="dummy",
+            value="enabled",
+            timestamp=datetime(2024, 1, 1, 12, 0, 0),
+        )
+    )
+    for user in ("user_1", "user_2"):
+        dao.create_override(
+            "dummy",
+            FeatureOverride(
+                feature_name="dummy", user_id=user, value="disabled"
+            ),
+        )
+    dao.delete_override("dummy", "user_2")
+    dao.close()
+
+    reloaded, _ = _wal_dao(tmp_path)
+
+    assert reloaded.get_feature("dummy").value == "enabled"
+    assert reloaded.get_override("dummy", "user_1").value == "disabled"
+    assert reloaded.get_override("dummy", "user_2") is None
+
+
+def test_compaction_folds_log_into_snapshot(tmp_path):
+    dao, persistence = _wal_dao(tmp_path, compact_max_records=5)
+    dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+    for i in range(12):
+        dao.create_override(
+            "dummy",
+            FeatureOverride(
+                feature_name="dummy", user_id=f"user_{i}", value="on"
+            ),
+        )
+    dao.close()
+
+    assert persistence.compactions >= 1
+    assert (tmp_path / "features.json").exists()
+    assert len(
+        (tmp_path / "features.json.log").read_text().splitlines()
+    ) < 13
+
+    reloaded, _ = _wal_dao(tmp_path)
+    assert len(reloaded.overrides["dummy"]) == 12
+
+
+def test_interrupted_compaction_is_replayed(tmp_path):
+    dao, persistence = _wal_dao(tmp_path)
+    dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+    dao.close()
+    log_file = tmp_path / "features.json.log"
+    log_file.rename(tmp_path / "features.json.log.compacting")
+
+    reloaded, _ = _wal_dao(tmp_path)
+
+    assert reloaded.get_feature("dummy") is not None
+    assert not (tmp_path / "features.json.log.compacting").exists()
+
+
+def test_truncated_record_is_skipped(tmp_path):
+    dao, _ = _wal_dao(tmp_path)
+    dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+    dao.close()
+    with open(tmp_path / "features.json.log", "a") as f:
+        f.write('{"op": "put_feature", "feat')
+
+    reloaded, _ = _wal_dao(tmp_path)
+
+    assert reloaded.get_feature("dummy") is not None
+
+
+def test_write_after_torn_record_survives(tmp_path):
+    dao, _ = _wal_dao(tmp_path)
+    dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+    dao.close()
+    with open(tmp_path / "features.json.log", "a") as f:
+        f.write('{"op": "put_feature", "feat')
+
+    reloaded, _ = _wal_dao(tmp_path)
+    reloaded.create_feature(Feature(feature_name="after", value="on"))
+    reloaded.close()
+
+    again, _ = _wal_dao(tmp_path)
+    assert again.get_feature("dummy") is not None
+    assert again.get_feature("after").value == "on"
+
+
+def test_failed_compaction_keeps_its_records(tmp_path):
+    def failing_save(path, state):
+        raise OSError("disk full")
+
+    dao, persistence = _wal_dao(tmp_path, save_snapshot=failing_save)
+    dao.create_feature(Feature(feature_name="first", value="on"))
+    persistence.compact()
+    dao.create_feature(Feature(feature_name="second", value="on"))
+    persistence.compact()
+    assert persistence.compactions == 0
+    # crash: the process dies before any compaction succeeds
+
+    reloaded, persistence = _wal_dao(tmp_path)
+    assert reloaded.get_feature("first") is not None
+    assert reloaded.get_feature("second") is not None
+    assert not (tmp_path / "features.json.log.compacting").exists()
+
+
+def test_log_bytes_count_bytes_not_characters(tmp_path):
+    dao, persistence = _wal_dao(tmp_path)
+    dao.create_feature(Feature(feature_name="dummy", value="énabled 🚩"))
+    dao.close()
+    size = (tmp_path / "features.json.log").stat().st_size
+    assert persistence.log_bytes == size
+
+    reopened, persistence = _wal_dao(tmp_path)
+    assert persistence.log_bytes == size
+    reopened.close()
@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.items.feature import Feature
+from app.items.featureOverride import FeatureOverride
+from app.items import jsonEncoder
+from app.items.jsonEncoder import FASTAPI, ORJSON, STDLIB, JsonEncoder
+
+needs_orjson = pytest.mark.skipif(
+    jsonEncoder.orjson is None, reason="orjson is not installed"
+)
+
+ITEMS = [
+    Feature(feature_name="dummy", value="on"),
+    Feature(
+        feature_name="ünï",
+        value='quote " slash \\ / tab \t nl \n ctl \x01 emoji 🚩  ',
+        feature_description="described",
+        timestamp=datetime(2026, 2, 24, 19, 29, 47, 548089),
+    ),
+    Feature(
+        feature_name="rolled",
+        value="off",
+        rollout={
+            "variants": [
+                {"value": "on", "percentage": 12.5},
+                {"value": "üp", "percentage": 50},
+            ],
+            "salt": "v2",
+        },
+    ),
+    FeatureOverride(
+        feature_name="dummy",
+        user_id="user_1",
+        value="off",
+        justification="why",
+        isDefault=False,
+        timestamp=datetime(2026, 2, 24, 19, 29, 47, tzinfo=timezone.utc),
+    ),
+    FeatureOverride.model_construct(
+        value="on",
+        user_id="user_2",
+        feature_name="dummy",
+        justification=None,
+        isDefault=True,
+        timestamp=datetime(
+            2026, 2, 24, 1, 2, 3, 4,
+            tzinfo=timezone(timedelta(hours=-5, minutes=-30)),
+        ),
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "backend", [pytest.param(ORJSON, marks=needs_orjson), STDLIB, FASTAPI]
+)
+def test_bodies_match_fastapi_byte_for_byte(backend):
+    encoder = JsonEncoder(backend)
+    for item in ITEMS:
+        expected = JSONResponse(
+            jsonable_encoder({"status": "ok", "item": item.model_dump()})
+        ).body
+        assert encoder.dumps(
+            {"status": "ok", "item": encoder.dump_item(item)}
+        ) == expected
+        # models left in the content are dumped too
+        assert encoder.dumps([item, None, 1, True]) == JSONResponse(
+            jsonable_encoder([item, None, 1, True])
+        ).body
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="Unknown JSON encoder"):
+        JsonEncoder("yaml")
+    assert JsonEncoder().backend == (
+        STDLIB if jsonEncoder.orjson is None else ORJSON
+    )
+
+
+def test_orjson_is_optional(monkeypatch):
+    monkeypatch.setattr(jsonEncoder, "orjson", None)
+    assert JsonEncoder().backend == STDLIB
+    with pytest.raises(ValueError, match="needs orjson installed"):
+        JsonEncoder(ORJSON)
@@ -1,7 +1,13 @@
+import json
+import time
+
 import pytest
 from fastapi.testclient import TestClient
+import app.main as app_module
 from app.main import app
+from app.db.cachedFeatureConfigDao import CachedFeatureConfigDao
 from app.db.inMemoryFeatureConfigDao import InMemoryFeatureConfigDao
+from app.db.sqliteFeatureConfigDao import SqliteFeatureConfigDao
 from app.items.feature import Feature
 from app.items.featureOverride import FeatureOverride
 
@@ -166,3 +172,378 @@ def test_delete_feature_for_user_returns_404_when_override_missing(
         "Override for feature dummy and user user_1 not found"
         in response.json()["detail"]
     )
+
+
+def test_stats_returns_store_version(client_with_dao):
+    """Test GET /stats reports the DAO statistics."""
+    client, dao = client_with_dao
+    dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+
+    response = client.get("/stats")
+    assert response.status_code == 200
+    assert response.json()["stats"]["version"] == 1
+
+
+def test_read_responses_are_cached_until_a_write(tmp_path, monkeypatch):
+    """Test GET responses are served encoded and invalidated by writes."""
+    base_dao = InMemoryFeatureConfigDao(
+        cache_file=str(tmp_path / "features.json")
+    )
+    monkeypatch.setattr("app.main.dao", CachedFeatureConfigDao(base_dao))
+    client = TestClient(app)
+    client.post(
+        "/feature", json={"feature_name": "dummy", "value": "enabled"}
+    )
+
+    first = client.get("/feature/dummy/user/user_1")
+    assert first.json()["override"]["value"] == "enabled"
+    assert client.get("/feature/dummy/user/user_1").content == first.content
+    assert client.get("/feature/dummy").json()["feature"]["value"] == (
+        "enabled"
+    )
+
+    client.post(
+        "/feature", json={"feature_name": "dummy", "value": "disabled"}
+    )
+    assert client.get("/feature/dummy").json()["feature"]["value"] == (
+        "disabled"
+    )
+    assert client.get("/feature/dummy/user/user_1").json()["override"][
+        "value"
+    ] == "disabled"
+
+    client.post(
+        "/feature/dummy",
+        json={"feature_name": "dummy", "user_id": "user_1", "value": "on"},
+    )
+    assert client.get("/feature/dummy/user/user_1").json()["override"][
+        "value"
+    ] == "on"
+    responses = client.get("/stats").json()["stats"]["responses"]
+    assert responses["hits"] == 1
+
+
+def test_stale_values_are_not_kept_as_responses(tmp_path, monkeypatch):
+    """Test a body rendered from a stale entry is not cached."""
+    base_dao = InMemoryFeatureConfigDao(
+        cache_file=str(tmp_path / "features.json")
+    )
+    dao = CachedFeatureConfigDao(
+        base_dao, ttl_seconds=0.05, stale_while_revalidate_seconds=60
+    )
+    monkeypatch.setattr("app.main.dao", dao)
+    client = TestClient(app)
+    base_dao.create_feature(Feature(feature_name="dummy", value="old"))
+    dao.get_feature("dummy")
+    # a write the cache does not hear about, e.g. from another process
+    base_dao.create_feature(Feature(feature_name="dummy", value="new"))
+    time.sleep(0.1)
+
+    stale = client.get("/feature/dummy")
+    assert stale.json()["feature"]["value"] == "old"
+    deadline = time.monotonic() + 5
+    while dao.get_feature("dummy").value != "new":
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert client.get("/feature/dummy").json()["feature"]["value"] == "new"
+
+
+def test_evaluate_reports_missing_features_per_item(client_with_dao):
+    """Test POST /evaluate resolves many features and lists the missing."""
+    client, dao = client_with_dao
+    dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+    dao.create_override(
+        "dummy",
+        FeatureOverride(feature_name="dummy", user_id="user_1", value="off"),
+    )
+    dao.create_feature(Feature(feature_name="other", value="enabled"))
+
+    response = client.post(
+        "/evaluate",
+        json={
+            "user_id": "user_1",
+            "feature_names": ["dummy", "nonexistent", "other"],
+        },
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["features"]["dummy"]["value"] == "off"
+    assert body["features"]["other"]["isDefault"] is True
+    assert body["missing"] == ["nonexistent"]
+
+    response = client.post(
+        "/evaluate", json={"user_id": "user_1", "feature_names": []}
+    )
+    assert response.status_code == 422
+
+
+def test_evaluate_feature_for_streamed_users(client_with_dao):
+    """Test POST /feature/{name}/evaluate streams one line per user."""
+    client, dao = client_with_dao
+    dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+    dao.create_override(
+        "dummy",
+        FeatureOverride(feature_name="dummy", user_id="user_2", value="off"),
+    )
+
+    def body():
+        yield b'user_1\n{"user_id": "user_2"}\n'
+        yield b'\n"user_'
+        yield b'3"\nuser_4'
+
+    response = client.post("/feature/dummy/evaluate", content=body())
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines == [
+        {"user_id": "user_1", "value": "enabled", "isDefault": True},
+        {"user_id": "user_2", "value": "off", "isDefault": False},
+        {"user_id": "user_3", "value": "enabled", "isDefault": True},
+        {"user_id": "user_4", "value": "enabled", "isDefault": True},
+    ]
+
+    response = client.post("/feature/nonexistent/evaluate", content=b"u\n")
+    assert response.status_code == 404
+
+
+def test_evaluate_rejects_overlong_lines(client_with_dao, monkeypatch):
+    """Test a body without newlines is refused rather than buffered."""
+    client, dao = client_with_dao
+    dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+    monkeypatch.setattr("app.main.BODY_MAX_LINE_BYTES", 100)
+
+    def body():
+        yield b'["user_1", '
+        for _ in range(50):
+            yield b'"user_2", '
+
+    response = client.post("/feature/dummy/evaluate", content=body())
+    assert response.status_code == 413
+
+    response = client.post(
+        "/feature/dummy/evaluate", content=b"user_1\n" + b"u" * 100
+    )
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == 2
+
+
+def test_import_overrides_applies_a_valid_batch(tmp_path, monkeypatch):
+    """Test POST /feature/{name}/overrides applies or rejects a batch."""
+    base_dao = InMemoryFeatureConfigDao(
+        cache_file=str(tmp_path / "features.json")
+    )
+    monkeypatch.setattr("app.main.dao", CachedFeatureConfigDao(base_dao))
+    client = TestClient(app)
+    client.post(
+        "/feature", json={"feature_name": "dummy", "value": "enabled"}
+    )
+    assert client.get("/feature/dummy/user/user_1").json()["override"][
+        "isDefault"
+    ] is True
+
+    response = client.post(
+        "/feature/dummy/overrides",
+        content=b'{"user_id": "user_1", "value": "off"}\n'
+        b'{"user_id": "user_2"}\nnot json\n',
+    )
+    assert response.status_code == 422
+    assert [error["line"] for error in response.json()["detail"]] == [2, 3]
+    assert base_dao.get_override("dummy", "user_1") is None
+
+    response = client.post(
+        "/feature/dummy/overrides",
+        content=b'{"user_id": "user_1", "value": "off"}\n\n'
+        b'{"user_id": "user_2", "delete": true}',
+    )
+    assert response.status_code == 200
+    assert response.json()["written"] == 1
+    assert response.json()["deleted"] == 0
+    assert client.get("/feature/dummy/user/user_1").json()["override"][
+        "value"
+    ] == "off"
+
+    response = client.post(
+        "/feature/nonexistent/overrides",
+        content=b'{"user_id": "user_1", "value": "off"}',
+    )
+    assert response.status_code == 404
+
+
+def test_import_overrides_fails_fast(client_with_dao, monkeypatch):
+    """Test an import stops reading once its outcome is known."""
+    client, dao = client_with_dao
+    dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+    validated = []
+
+    class CountedChange(app_module.OverrideChange):
+        @classmethod
+        def model_validate_json(cls, data, **kwargs):
+            validated.append(data)
+            return super().model_validate_json(data, **kwargs)
+
+    monkeypatch.setattr("app.main.OverrideChange", CountedChange)
+    body = b"not json\n" * 300
+
+    response = client.post("/feature/nonexistent/overrides", content=body)
+    assert response.status_code == 404
+    assert validated == []
+
+    response = client.post("/feature/dummy/overrides", content=body)
+    assert response.status_code == 422
+    assert len(response.json()["detail"]) == 100
+    assert len(validated) == 100
+
+    lookups = []
+    get_feature = dao.get_feature
+
+    def counted_get_feature(feature_name):
+        lookups.append(feature_name)
+        return get_feature(feature_name)
+
+    monkeypatch.setattr(dao, "get_feature", counted_get_feature)
+    response = client.post(
+        "/feature/dummy/overrides",
+        content=b'{"user_id": "user_1", "value": "off"}',
+    )
+    assert response.status_code == 200
+    assert lookups == ["dummy"]
+
+
+def test_list_features_and_overrides_paginate(client_with_dao):
+    """Test GET /features and /feature/{name}/overrides page by cursor."""
+    client, dao = client_with_dao
+    for name in ("a", "b", "c"):
+        dao.create_feature(Feature(feature_name=name, value="on"))
+        dao.create_override(
+            "a", FeatureOverride(feature_name="a", user_id=name, value="x")
+        )
+
+    first = client.get("/features", params={"limit": 2}).json()
+    assert [f["feature_name"] for f in first["features"]] == ["a", "b"]
+    second = client.get(
+        "/features", params={"limit": 2, "cursor": first["next_cursor"]}
+    ).json()
+    assert [f["feature_name"] for f in second["features"]] == ["c"]
+    assert second["next_cursor"] is None
+
+    overrides = client.get("/feature/a/overrides").json()["overrides"]
+    assert [o["user_id"] for o in overrides] == ["a", "b", "c"]
+    assert client.get("/feature/nonexistent/overrides").status_code == 404
+    assert client.get("/features", params={"cursor": "%"}).status_code == 400
+
+
+def test_export_streams_ndjson_with_optional_gzip(client_with_dao):
+    """Test GET /export streams every feature and override."""
+    client, dao = client_with_dao
+    dao.create_feature(Feature(feature_name="dummy", value="enabled"))
+    dao.create_override(
+        "dummy",
+        FeatureOverride(feature_name="dummy", user_id="user_1", value="off"),
+    )
+    dao.create_feature(Feature(feature_name="other", value="enabled"))
+
+    plain = client.get("/export", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    lines = [json.loads(line) for line in plain.text.splitlines()]
+    assert [list(line) for line in lines] == [
+        ["feature"], ["override"], ["feature"]
+    ]
+    assert lines[1]["override"]["user_id"] == "user_1"
+
+    compressed = client.get("/export", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.text == plain.text
+
+
+def test_changes_report_writes_since_a_version(tmp_path, monkeypatch):
+    """Test GET /changes returns deltas and asks lagging clients to resync."""
+    base_dao = InMemoryFeatureConfigDao(
+        cache_file=str(tmp_path / "features.json")
+    )
+    monkeypatch.setattr("app.main.dao", CachedFeatureConfigDao(base_dao))
+    client = TestClient(app)
+
+    start = client.get("/changes").json()
+    assert start["version"] == 0
+    client.post("/feature", json={"feature_name": "dummy", "value": "on"})
+    client.post(
+        "/feature/dummy",
+        json={"feature_name": "dummy", "user_id": "user_1", "value": "off"},
+    )
+
+    changes = client.get(
+        "/changes", params={"since": 0, "log_id": start["log_id"]}
+    ).json()
+    assert changes["version"] == 2
+    assert changes["features"]["dummy"]["value"] == "on"
+    assert changes["overrides"]["dummy"]["user_1"]["value"] == "off"
+    # a long poll with nothing new answers empty once the wait is over
+    idle = client.get("/changes", params={"since": 2, "wait": 0.01}).json()
+    assert (idle["version"], idle["features"]) == (2, {})
+
+    resync = client.get("/changes", params={"since": 3})
+    assert resync.status_code == 410
+    assert resync.json()["detail"]["version"] == 2
+    gone = client.get("/changes", params={"since": 2, "log_id": "old"})
+    assert gone.status_code == 410
+
+
+def test_shared_store_without_a_bus_sends_no_etags(tmp_path, monkeypatch):
+    """Test no ETag is sent when peers' writes may not reach the log."""
+    base_dao = SqliteFeatureConfigDao(str(tmp_path / "features.db"))
+    dao = CachedFeatureConfigDao(base_dao)
+    monkeypatch.setattr("app.main.dao", dao)
+    client = TestClient(app)
+    dao.create_feature(Feature(feature_name="dummy", value="on"))
+    for path in ("/feature/dummy", "/feature/dummy/user/user_1"):
+        response = client.get(path)
+        assert response.status_code == 200
+        assert "etag" not in response.headers
+
+
+def test_changes_need_the_caching_dao(client_with_dao):
+    """Test GET /changes is unavailable without a change log."""
+    client, _ = client_with_dao
+    assert client.get("/changes").status_code == 501
+
+
+def test_conditional_gets_return_304_until_a_write(tmp_path, monkeypatch):
+    """Test read endpoints send ETags and honour If-None-Match."""
+    base_dao = InMemoryFeatureConfigDao(
+        cache_file=str(tmp_path / "features.json")
+    )
+    dao = CachedFeatureConfigDao(base_dao)
+    monkeypatch.setattr("app.main.dao", dao)
+    client = TestClient(app)
+    dao.create_feature(Feature(feature_name="dummy", value="on"))
+
+    for path in ("/feature/dummy", "/feature/dummy/user/user_1"):
+        etag = client.get(path).headers["etag"]
+        unchanged = client.get(path, headers={"If-None-Match": etag})
+        assert unchanged.status_code == 304
+        assert unchanged.headers["etag"] == etag
+        assert unchanged.content == b""
+
+    user_etag = client.get("/feature/dummy/user/user_1").headers["etag"]
+    feature_etag = client.get("/feature/dummy").headers["etag"]
+    client.post(
+        "/feature/dummy",
+        json={"feature_name": "dummy", "user_id": "user_1", "value": "off"},
+    )
+    changed = client.get(
+        "/feature/dummy/user/user_1", headers={"If-None-Match": user_etag}
+    )
+    assert changed.status_code == 200
+    assert changed.json()["override"]["value"] == "off"
+    assert changed.headers["etag"] != user_etag
+    # the feature itself did not change
+    assert client.get(
+        "/feature/dummy", headers={"If-None-Match": f'W/{feature_etag}'}
+    ).status_code == 304
+    # "*" would claim a missing feature exists
+    assert client.get(
+        "/feature/nope", headers={"If-None-Match": "*"}
+    ).status_code == 404
+    assert client.get(
+        "/feature/dummy", headers={"If-None-Match": "*"}
+    ).status_code == 200